@@ -1,9 +1,8 @@
 from __future__ import annotations
 
 from logging.config import fileConfig
-from sqlalchemy import engine_from_config, pool
-from alembic import context
 
+from alembic import context
 from app.db import Base, _engine
 from app.models import *  # noqa
 
@@ -17,7 +16,10 @@ target_metadata = Base.metadata
 def run_migrations_offline() -> None:
     url = str(_engine.url)
     context.configure(
-        url=url, target_metadata=target_metadata, literal_binds=True, dialect_opts={"paramstyle": "named"}
+        url=url,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
     )
 
     with context.begin_transaction():
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-from alembic import op
 import sqlalchemy as sa
 
+from alembic import op
+
 # revision identifiers, used by Alembic.
 revision = "0001_init"
 down_revision = None
@@ -30,20 +31,25 @@ def upgrade() -> None:
         "products",
         ["product_name", "price", "release_date", "product_tag", "series", "created_at"],
     )
-    op.create_index("ix_products_price_value", "products", ["price_value"]) 
-    op.create_index("ix_products_release_date_value", "products", ["release_date_value"]) 
+    op.create_index("ix_products_price_value", "products", ["price_value"])
+    op.create_index("ix_products_release_date_value", "products", ["release_date_value"])
 
     op.create_table(
         "images",
         sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
-        sa.Column("product_id", sa.Integer(), sa.ForeignKey("products.id", ondelete="CASCADE"), nullable=False),
+        sa.Column(
+            "product_id",
+            sa.Integer(),
+            sa.ForeignKey("products.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
         sa.Column("image_filename", sa.Text(), nullable=False),
         sa.Column("image_hash", sa.Text(), nullable=True, unique=True),
         sa.Column("minio_path", sa.Text(), nullable=True),
         sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
         sa.UniqueConstraint("product_id", "image_filename", name="uq_product_image_filename"),
     )
-    op.create_index("ix_images_product_id", "images", ["product_id"]) 
+    op.create_index("ix_images_product_id", "images", ["product_id"])
 
     op.create_table(
         "users",
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-from alembic import op
 import sqlalchemy as sa
 
+from alembic import op
+
 # revision identifiers, used by Alembic.
 revision = "0002_add_is_cover_to_images"
 down_revision = "0001_init"
@@ -19,5 +20,3 @@ def upgrade() -> None:
 
 def downgrade() -> None:
     op.drop_column("images", "is_cover")
-
-
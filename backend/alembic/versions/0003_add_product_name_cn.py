@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-from alembic import op
 import sqlalchemy as sa
 
+from alembic import op
+
 # revision identifiers, used by Alembic.
 revision = "0003_add_product_name_cn"
 down_revision = "0002_add_is_cover_to_images"
@@ -19,4 +20,3 @@ def upgrade() -> None:
 
 def downgrade() -> None:
     op.drop_column("products", "product_name_cn")
-
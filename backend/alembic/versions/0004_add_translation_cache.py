@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0004_add_translation_cache"
+down_revision = "0003_add_product_name_cn"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "translation_cache",
+        sa.Column("source_hash", sa.String(64), nullable=False),
+        sa.Column("source_lang", sa.String(16), nullable=False),
+        sa.Column("target_lang", sa.String(16), nullable=False),
+        sa.Column("model", sa.String(100), nullable=False),
+        sa.Column("source_text", sa.Text(), nullable=False),
+        sa.Column("translated_text", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint("source_hash", "source_lang", "target_lang", "model"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("translation_cache")
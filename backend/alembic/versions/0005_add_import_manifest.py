@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0005_add_import_manifest"
+down_revision = "0004_add_translation_cache"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "import_manifest",
+        sa.Column("url", sa.Text(), primary_key=True),
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("details_hash", sa.String(64), nullable=False),
+        sa.Column("images_fingerprint", sa.String(64), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("import_manifest")
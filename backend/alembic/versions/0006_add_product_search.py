@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0006_add_product_search"
+down_revision = "0005_add_import_manifest"
+branch_labels = None
+depends_on = None
+
+SEARCH_COLUMNS = ("product_name", "product_name_cn", "series")
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        # 外部内容 FTS5 表（不重复存储文本），trigram 分词支持中日文子串匹配；
+        # 由触发器与 products 同步
+        cols = ", ".join(SEARCH_COLUMNS)
+        new_vals = ", ".join(f"new.{c}" for c in SEARCH_COLUMNS)
+        old_vals = ", ".join(f"old.{c}" for c in SEARCH_COLUMNS)
+        op.execute(
+            f"CREATE VIRTUAL TABLE products_fts USING fts5({cols}, "
+            "content='products', content_rowid='id', tokenize='trigram')"
+        )
+        op.execute(
+            "CREATE TRIGGER products_fts_ai AFTER INSERT ON products BEGIN "
+            f"INSERT INTO products_fts(rowid, {cols}) VALUES (new.id, {new_vals}); END"
+        )
+        op.execute(
+            "CREATE TRIGGER products_fts_ad AFTER DELETE ON products BEGIN "
+            f"INSERT INTO products_fts(products_fts, rowid, {cols}) "
+            f"VALUES ('delete', old.id, {old_vals}); END"
+        )
+        op.execute(
+            f"CREATE TRIGGER products_fts_au AFTER UPDATE OF {cols} ON products BEGIN "
+            f"INSERT INTO products_fts(products_fts, rowid, {cols}) "
+            f"VALUES ('delete', old.id, {old_vals}); "
+            f"INSERT INTO products_fts(rowid, {cols}) VALUES (new.id, {new_vals}); END"
+        )
+        op.execute("INSERT INTO products_fts(products_fts) VALUES ('rebuild')")
+    elif dialect == "postgresql":
+        # pg_trgm 的 GIN 索引可直接服务 ILIKE '%term%'，写入时由索引自动维护
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for col in SEARCH_COLUMNS:
+            op.execute(
+                f"CREATE INDEX IF NOT EXISTS ix_products_{col}_trgm "
+                f"ON products USING gin ({col} gin_trgm_ops)"
+            )
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        for trigger in ("products_fts_ai", "products_fts_ad", "products_fts_au"):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS products_fts")
+    elif dialect == "postgresql":
+        for col in SEARCH_COLUMNS:
+            op.execute(f"DROP INDEX IF EXISTS ix_products_{col}_trgm")
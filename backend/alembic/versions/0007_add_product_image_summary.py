@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0007_add_product_image_summary"
+down_revision = "0006_add_product_search"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "products", sa.Column("image_count", sa.Integer(), nullable=False, server_default="0")
+    )
+    op.add_column("products", sa.Column("cover_image_id", sa.Integer(), nullable=True))
+    op.create_index("ix_products_image_count", "products", ["image_count"])
+    # 回填：头像为 is_cover 的图片，没有时取最早的一张
+    op.execute(
+        "UPDATE products SET "
+        "image_count = (SELECT count(*) FROM images WHERE images.product_id = products.id), "
+        "cover_image_id = (SELECT images.id FROM images WHERE images.product_id = products.id "
+        "ORDER BY images.is_cover DESC, images.id LIMIT 1)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_products_image_count", table_name="products")
+    op.drop_column("products", "cover_image_id")
+    op.drop_column("products", "image_count")
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0008_add_change_versions"
+down_revision = "0007_add_product_image_summary"
+branch_labels = None
+depends_on = None
+
+TRACKED_TABLES = ("products", "images")
+EVENTS = {"ai": "INSERT", "au": "UPDATE", "ad": "DELETE"}
+
+
+def upgrade() -> None:
+    op.create_table(
+        "change_versions",
+        sa.Column("table_name", sa.String(64), primary_key=True),
+        sa.Column("version", sa.BigInteger(), nullable=False, server_default="0"),
+    )
+    for table in TRACKED_TABLES:
+        op.execute(f"INSERT INTO change_versions (table_name, version) VALUES ('{table}', 0)")
+
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        for table in TRACKED_TABLES:
+            for suffix, event in EVENTS.items():
+                op.execute(
+                    f"CREATE TRIGGER {table}_version_{suffix} AFTER {event} ON {table} "
+                    "BEGIN UPDATE change_versions SET version = version + 1 "
+                    f"WHERE table_name = '{table}'; END"
+                )
+    elif dialect == "postgresql":
+        # 语句级触发器：一条批量写入语句只加一次，也覆盖 COPY 后的 INSERT ... SELECT
+        op.execute(
+            "CREATE OR REPLACE FUNCTION bump_change_version() RETURNS trigger AS $$ BEGIN "
+            "UPDATE change_versions SET version = version + 1 WHERE table_name = TG_TABLE_NAME; "
+            "RETURN NULL; END $$ LANGUAGE plpgsql"
+        )
+        for table in TRACKED_TABLES:
+            op.execute(
+                f"CREATE TRIGGER {table}_change_version "
+                f"AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table} "
+                "FOR EACH STATEMENT EXECUTE FUNCTION bump_change_version()"
+            )
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        for table in TRACKED_TABLES:
+            for suffix in EVENTS:
+                op.execute(f"DROP TRIGGER IF EXISTS {table}_version_{suffix}")
+    elif dialect == "postgresql":
+        for table in TRACKED_TABLES:
+            op.execute(f"DROP TRIGGER IF EXISTS {table}_change_version ON {table}")
+        op.execute("DROP FUNCTION IF EXISTS bump_change_version()")
+    op.drop_table("change_versions")
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0009_add_query_indexes"
+down_revision = "0008_add_change_versions"
+branch_labels = None
+depends_on = None
+
+# Postgres：可为空的排序列，游标分页按 DESC NULLS LAST 排序时使用
+DESC_NULLS_LAST_COLUMNS = ("price_value", "release_date_value", "product_name")
+
+
+def upgrade() -> None:
+    # 原组合索引以 product_name 开头，列表的任何筛选条件都用不上，只增加写入开销
+    op.drop_index("ix_products_common", table_name="products")
+    op.create_index("ix_products_created_at", "products", ["created_at", "id"])
+    op.create_index("ix_products_product_name", "products", ["product_name"])
+    op.create_index("ix_products_tag_created_at", "products", ["product_tag", "created_at"])
+    # 系列按子串筛选（走 0006 的全文/三元组索引），以 series 开头的等值组合索引用不上，不建
+
+    # 两个新索引都以 product_id 开头，单列索引不再需要
+    op.drop_index("ix_images_product_id", table_name="images")
+    op.create_index("ix_images_product_created_at", "images", ["product_id", "created_at"])
+    op.create_index("ix_images_product_cover", "images", ["product_id", "is_cover"])
+
+    if op.get_bind().dialect.name == "postgresql":
+        for column in DESC_NULLS_LAST_COLUMNS:
+            op.create_index(
+                f"ix_products_{column}_desc",
+                "products",
+                [sa.text(f"{column} DESC NULLS LAST"), sa.text("id DESC")],
+            )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        for column in DESC_NULLS_LAST_COLUMNS:
+            op.drop_index(f"ix_products_{column}_desc", table_name="products")
+    op.drop_index("ix_images_product_cover", table_name="images")
+    op.drop_index("ix_images_product_created_at", table_name="images")
+    op.create_index("ix_images_product_id", "images", ["product_id"])
+    op.drop_index("ix_products_tag_created_at", table_name="products")
+    op.drop_index("ix_products_product_name", table_name="products")
+    op.drop_index("ix_products_created_at", table_name="products")
+    op.create_index(
+        "ix_products_common",
+        "products",
+        ["product_name", "price", "release_date", "product_tag", "series", "created_at"],
+    )
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0010_add_stats_counters"
+down_revision = "0009_add_query_indexes"
+branch_labels = None
+depends_on = None
+
+# 汇总计数随产品写入由触发器增量维护：每行产品计入 total、所属标签、所属系列，
+# 有图片时计入 with_images
+_UPSERT = (
+    "INSERT INTO stats_counters (dimension, name, count) {source} "
+    "ON CONFLICT (dimension, name) DO UPDATE SET count = stats_counters.count + excluded.count"
+)
+
+# 增量表自增主键：SQLite 只有 INTEGER PRIMARY KEY 才自增
+_ID_TYPE = sa.BigInteger().with_variant(sa.Integer(), "sqlite")
+
+# 由实际数据重新计算全部计数（回填用）
+_RECOUNT = (
+    "INSERT INTO stats_counters (dimension, name, count) "
+    "SELECT 'total', '', count(*) FROM products "
+    "UNION ALL SELECT 'tag', COALESCE(product_tag, ''), count(*) FROM products "
+    "GROUP BY COALESCE(product_tag, '') "
+    "UNION ALL SELECT 'series', COALESCE(series, ''), count(*) FROM products "
+    "GROUP BY COALESCE(series, '') "
+    "UNION ALL SELECT 'with_images', '', count(*) FROM products WHERE image_count > 0"
+)
+
+
+def _sqlite_add(dimension: str, name: str, delta: str) -> str:
+    return _UPSERT.format(source=f"VALUES ('{dimension}', {name}, {delta})") + ";"
+
+
+def _sqlite_row(row: str, sign: str) -> str:
+    """一行产品在各维度上的增量（row 为 new 或 old）"""
+    return " ".join(
+        [
+            _sqlite_add("total", "''", f"{sign}1"),
+            _sqlite_add("tag", f"COALESCE({row}.product_tag, '')", f"{sign}1"),
+            _sqlite_add("series", f"COALESCE({row}.series, '')", f"{sign}1"),
+            _sqlite_add("with_images", "''", f"{sign}({row}.image_count > 0)"),
+        ]
+    )
+
+
+def _pg_deltas(source: str, sign: str) -> str:
+    """转换表（new_rows / old_rows）中所有行在各维度上的增量"""
+    return (
+        f"SELECT 'total' AS dimension, '' AS name, {sign}1 AS delta FROM {source} "
+        f"UNION ALL SELECT 'tag', COALESCE(product_tag, ''), {sign}1 FROM {source} "
+        f"UNION ALL SELECT 'series', COALESCE(series, ''), {sign}1 FROM {source} "
+        f"UNION ALL SELECT 'with_images', '', {sign}(CASE WHEN image_count > 0 THEN 1 ELSE 0 END) "
+        f"FROM {source}"
+    )
+
+
+def _pg_apply(deltas: str) -> str:
+    # 按维度聚合后追加到增量表，不更新汇总表的行：并发写入之间没有行锁争用
+    return (
+        "INSERT INTO stats_counter_deltas (dimension, name, delta) "
+        f"SELECT dimension, name, sum(delta) FROM ({deltas}) d GROUP BY dimension, name "
+        "HAVING sum(delta) <> 0"
+    )
+
+
+def upgrade() -> None:
+    op.create_table(
+        "stats_counters",
+        sa.Column("dimension", sa.String(16), primary_key=True),
+        sa.Column("name", sa.Text(), primary_key=True, server_default=""),
+        sa.Column("count", sa.BigInteger(), nullable=False, server_default="0"),
+    )
+    # 只追加的增量表：Postgres 上触发器写入这里，后台定期并入（app/stats.py: DeltaFolder），
+    # 读取时与汇总表相加；核对的修正也以增量写入
+    op.create_table(
+        "stats_counter_deltas",
+        sa.Column("id", _ID_TYPE, primary_key=True, autoincrement=True),
+        sa.Column("dimension", sa.String(16), nullable=False),
+        sa.Column("name", sa.Text(), nullable=False, server_default=""),
+        sa.Column("delta", sa.BigInteger(), nullable=False),
+    )
+    op.create_table(
+        "change_version_deltas",
+        sa.Column("id", _ID_TYPE, primary_key=True, autoincrement=True),
+        sa.Column("table_name", sa.String(64), nullable=False),
+    )
+    op.execute(_RECOUNT)
+    # 汇总表本身也有变更版本：核对写入修正时加一（app/stats.py），统计接口的 ETag 随之变化
+    op.execute("INSERT INTO change_versions (table_name, version) VALUES ('stats_counters', 0)")
+
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        op.execute(
+            "CREATE TRIGGER products_stats_ai AFTER INSERT ON products "
+            f"BEGIN {_sqlite_row('new', '')} END"
+        )
+        op.execute(
+            "CREATE TRIGGER products_stats_ad AFTER DELETE ON products "
+            f"BEGIN {_sqlite_row('old', '-')} END"
+        )
+        for column, dimension in (("product_tag", "tag"), ("series", "series")):
+            op.execute(
+                f"CREATE TRIGGER products_stats_{dimension}_au "
+                f"AFTER UPDATE OF {column} ON products "
+                f"WHEN old.{column} IS NOT new.{column} BEGIN "
+                + _sqlite_add(dimension, f"COALESCE(old.{column}, '')", "-1")
+                + " "
+                + _sqlite_add(dimension, f"COALESCE(new.{column}, '')", "1")
+                + " END"
+            )
+        op.execute(
+            "CREATE TRIGGER products_stats_images_au AFTER UPDATE OF image_count ON products "
+            "WHEN (old.image_count > 0) <> (new.image_count > 0) BEGIN "
+            + _sqlite_add("with_images", "''", "(new.image_count > 0) - (old.image_count > 0)")
+            + " END"
+        )
+    elif dialect == "postgresql":
+        # 语句级触发器 + 转换表：批量导入的一条语句只聚合写入一次
+        updated = _pg_deltas("new_rows", "") + " UNION ALL " + _pg_deltas("old_rows", "-")
+        op.execute(
+            "CREATE OR REPLACE FUNCTION products_stats_apply() RETURNS trigger AS $$ BEGIN "
+            f"IF TG_OP = 'INSERT' THEN {_pg_apply(_pg_deltas('new_rows', ''))}; "
+            f"ELSIF TG_OP = 'DELETE' THEN {_pg_apply(_pg_deltas('old_rows', '-'))}; "
+            f"ELSE {_pg_apply(updated)}; "
+            "END IF; RETURN NULL; END $$ LANGUAGE plpgsql"
+        )
+        op.execute(
+            "CREATE TRIGGER products_stats_ai AFTER INSERT ON products "
+            "REFERENCING NEW TABLE AS new_rows "
+            "FOR EACH STATEMENT EXECUTE FUNCTION products_stats_apply()"
+        )
+        op.execute(
+            "CREATE TRIGGER products_stats_ad AFTER DELETE ON products "
+            "REFERENCING OLD TABLE AS old_rows "
+            "FOR EACH STATEMENT EXECUTE FUNCTION products_stats_apply()"
+        )
+        op.execute(
+            "CREATE TRIGGER products_stats_au AFTER UPDATE ON products "
+            "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows "
+            "FOR EACH STATEMENT EXECUTE FUNCTION products_stats_apply()"
+        )
+        # 变更版本同样改为追加增量：每次产品/图片写入不再更新 change_versions 的同一行，
+        # 先写图片再写产品（上传图片）与先写产品再写图片（导入）的事务之间不会因这些行死锁
+        op.execute(
+            "CREATE OR REPLACE FUNCTION bump_change_version() RETURNS trigger AS $$ BEGIN "
+            "INSERT INTO change_version_deltas (table_name) VALUES (TG_TABLE_NAME); "
+            "RETURN NULL; END $$ LANGUAGE plpgsql"
+        )
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        for trigger in ("ai", "ad", "tag_au", "series_au", "images_au"):
+            op.execute(f"DROP TRIGGER IF EXISTS products_stats_{trigger}")
+    elif dialect == "postgresql":
+        for trigger in ("ai", "ad", "au"):
+            op.execute(f"DROP TRIGGER IF EXISTS products_stats_{trigger} ON products")
+        op.execute("DROP FUNCTION IF EXISTS products_stats_apply()")
+        op.execute(
+            "CREATE OR REPLACE FUNCTION bump_change_version() RETURNS trigger AS $$ BEGIN "
+            "UPDATE change_versions SET version = version + 1 WHERE table_name = TG_TABLE_NAME; "
+            "RETURN NULL; END $$ LANGUAGE plpgsql"
+        )
+    # 未并入的版本增量先并入，版本不能回退
+    op.execute(
+        "UPDATE change_versions SET version = version + (SELECT count(*) FROM "
+        "change_version_deltas d WHERE d.table_name = change_versions.table_name)"
+    )
+    op.execute("DELETE FROM change_versions WHERE table_name = 'stats_counters'")
+    op.drop_table("change_version_deltas")
+    op.drop_table("stats_counter_deltas")
+    op.drop_table("stats_counters")
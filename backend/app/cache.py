@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Hashable
+
+from sqlalchemy import delete, func, literal, select, union_all, update
+from sqlalchemy.orm import Session
+
+from .models import ChangeVersion, ChangeVersionDelta
+
+
+def table_change_versions(db: Session, *tables: str) -> tuple[int, ...]:
+    """
+    读取表级变更版本（触发器维护，跨进程一致），一条语句
+
+    版本为 change_versions 加上尚未并入的增量行数，两者在同一语句（同一快照）中读取，
+    后台并入增量前后结果相同。
+    ETag 与进程内缓存都以此为版本：任何进程、任何写入方式（包括绕过 ORM 的 SQL、副本上回放的写入）
+    提交后版本即变化。与缓存的数据在同一事务中读取，两者对应同一快照。
+    """
+    parts = union_all(
+        select(ChangeVersion.table_name, ChangeVersion.version).where(
+            ChangeVersion.table_name.in_(tables)
+        ),
+        select(ChangeVersionDelta.table_name, literal(1)).where(
+            ChangeVersionDelta.table_name.in_(tables)
+        ),
+    ).subquery()
+    rows = dict(
+        db.execute(
+            select(parts.c.table_name, func.sum(parts.c.version)).group_by(parts.c.table_name)
+        )
+        .tuples()
+        .all()
+    )
+    return tuple(int(rows.get(t, 0)) for t in tables)
+
+
+def fold_change_versions(db: Session) -> int:
+    """把追加的版本增量并入 change_versions，返回并入的行数，不提交"""
+    tables = db.execute(
+        delete(ChangeVersionDelta).returning(ChangeVersionDelta.table_name)
+    ).scalars()
+    counts = Counter(tables)
+    for table_name in sorted(counts):
+        db.execute(
+            update(ChangeVersion)
+            .where(ChangeVersion.table_name == table_name)
+            .values(version=ChangeVersion.version + counts[table_name])
+        )
+    return sum(counts.values())
+
+
+class VersionedCache:
+    """
+    依赖表版本的 LRU 缓存：get() 时传入当前版本（table_change_versions），
+    与写入时不一致或超过 TTL 即视为未命中
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = max(maxsize, 0)
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[tuple[int, ...], float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, versions: tuple[int, ...]) -> Any | None:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            stored_versions, stored_at, value = item
+            if stored_versions != versions or time.monotonic() - stored_at > self.ttl:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, versions: tuple[int, ...], value: Any) -> None:
+        if self.maxsize == 0:
+            return
+        with self._lock:
+            self._data[key] = (versions, time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from functools import lru_cache
+
 from pydantic import BaseModel
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -14,6 +15,20 @@ class Settings(BaseSettings):
 
     DATABASE_URL: str | None = None
     DATABASE_PATH: str | None = "/data/app.db"
+    # SQLite 连接参数（每个连接建立时设置）：锁等待毫秒数、同步级别、内存映射字节数、页缓存 KiB；
+    # 另固定为 WAL 日志、临时表在内存。读接口使用只读连接池（连接数）；
+    # 同步与异步写入共用进程内唯一的写连接许可，
+    # 排队等待写连接的时间上限同为锁等待时间
+    SQLITE_BUSY_TIMEOUT_MS: int = 30000
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    SQLITE_CACHE_SIZE_KB: int = 64 * 1024
+    SQLITE_READ_POOL_SIZE: int = 8
+    # 只读副本（可选）：产品/图片/统计等读接口路由到该库（Postgres 流复制副本，
+    # 或本地测试用的另一个数据库文件）。
+    # 副本延迟超过 DATABASE_READ_MAX_LAG 秒时改读主库；客户端写入后同样秒数内的读也走主库
+    DATABASE_READ_URL: str | None = None
+    DATABASE_READ_MAX_LAG: float = 5.0
 
     MINIO_ENDPOINT: str = "minio:9000"
     MINIO_PUBLIC_ENDPOINT: str | None = None
@@ -23,6 +38,43 @@ class Settings(BaseSettings):
     MINIO_BUCKET: str = "bandai-hobby"
 
     DATA_DIR: str = "/data/import"
+    # 后台导入任务的工作线程数
+    IMPORT_JOB_WORKERS: int = 2
+    # 导入时上传图片（边上传边计算哈希）的线程数；进程内所有导入任务共用同一个线程池
+    IMPORT_UPLOAD_CONCURRENCY: int = 8
+    # 每个事务批量 UPSERT 的产品数；Postgres 上达到阈值的批次改用 COPY 到临时表
+    IMPORT_BATCH_SIZE: int = 200
+    IMPORT_COPY_THRESHOLD: int = 1000
+    # 监听 DATA_DIR：定期扫描（秒），只导入新增或文件元数据有变化的产品目录
+    IMPORT_WATCH_ENABLED: bool = False
+    IMPORT_WATCH_INTERVAL: float = 30.0
+
+    # 翻译缓存：进程内 LRU 条目数（其后为数据库持久缓存）
+    TRANSLATION_CACHE_SIZE: int = 10000
+    # 火山引擎翻译接口地址
+    VOLCANO_API_URL: str = "https://ark.cn-beijing.volces.com/api/v3/responses"
+    # 翻译客户端：每个请求打包的条数、并发请求数、限速（请求/秒）、重试次数、超时秒数
+    TRANSLATION_BATCH_SIZE: int = 20
+    TRANSLATION_CONCURRENCY: int = 4
+    TRANSLATION_RATE_LIMIT: float = 5.0
+    TRANSLATION_MAX_RETRIES: int = 3
+    TRANSLATION_TIMEOUT: float = 10.0
+    # 后台补全 product_name_cn：每批条数；启动时是否扫描补全所有待翻译的产品
+    TRANSLATION_BACKFILL_BATCH_SIZE: int = 100
+    TRANSLATION_BACKFILL_ON_STARTUP: bool = True
+
+    # 产品列表总数：默认计数方式（exact / cached / estimated）；计数缓存条数与最长有效秒数
+    PRODUCT_COUNT_MODE: str = "exact"
+    PRODUCT_COUNT_CACHE_SIZE: int = 1000
+    PRODUCT_COUNT_CACHE_TTL: float = 300.0
+
+    # 统计概览的汇总表由触发器增量维护；后台按此间隔（秒）与实际数据核对并修正偏差，0 为不自动核对
+    STATS_RECONCILE_INTERVAL: float = 3600.0
+    # Postgres 上触发器只追加增量行（变更版本与统计计数），后台按此间隔（秒）并入，0 为不自动并入
+    DELTA_FOLD_INTERVAL: float = 5.0
+
+    # 只读角色读接口的 Cache-Control max-age（秒）；其他角色每次重新验证 ETag
+    READONLY_CACHE_MAX_AGE: int = 30
 
     JWT_SECRET: str = "change_me"
     JWT_EXPIRES_IN: int = 86400
@@ -38,6 +90,6 @@ class VersionInfo(BaseModel):
     env: str = "development"
 
 
-@lru_cache()
+@lru_cache
 def get_settings() -> Settings:
     return Settings()  # type: ignore[arg-type]
@@ -1,12 +1,29 @@
 from __future__ import annotations
 
+import logging
+import threading
+import time
 from contextlib import contextmanager
-from typing import Iterator
+from functools import partial
+from typing import Any, AsyncIterator, Iterator
 
-from sqlalchemy import create_engine
+import anyio
+from fastapi import Request
+from sqlalchemy import Engine, create_engine, event, exc, make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.util import await_only
 
 from .config import get_settings
+from .security import decode_token
+
+logger = logging.getLogger(__name__)
 
 Base = declarative_base()
 
@@ -20,16 +37,301 @@ def _database_url() -> str:
     return f"sqlite+pysqlite:///{path}"
 
 
-_engine = create_engine(_database_url(), future=True, pool_pre_ping=True)
+def _is_sqlite_file(url: str) -> bool:
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database not in (None, "", ":memory:")
+
+
+def _read_only_url(url: str) -> str:
+    """SQLite 只读连接：URI 文件名加 mode=ro"""
+    parsed = make_url(url)
+    return parsed.set(
+        database=f"file:{parsed.database}", query={**parsed.query, "mode": "ro", "uri": "true"}
+    ).render_as_string(hide_password=False)
+
+
+def _set_sqlite_pragmas(
+    dbapi_connection: Any, connection_record: Any, read_only: bool = False
+) -> None:
+    """每个新连接设置的 PRAGMA；WAL 写入数据库文件，只需写连接设置一次，只读连接无权修改"""
+    settings = get_settings()
+    pragmas = [
+        f"busy_timeout = {int(settings.SQLITE_BUSY_TIMEOUT_MS)}",
+        f"synchronous = {settings.SQLITE_SYNCHRONOUS}",
+        f"mmap_size = {int(settings.SQLITE_MMAP_SIZE)}",
+        # 负数表示以 KiB 为单位
+        f"cache_size = -{int(settings.SQLITE_CACHE_SIZE_KB)}",
+        "temp_store = MEMORY",
+    ]
+    if not read_only:
+        pragmas.insert(0, "journal_mode = WAL")
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in pragmas:
+            cursor.execute(f"PRAGMA {pragma}")
+    finally:
+        cursor.close()
+
+
+def _engine_options(url: str, read_only: bool, is_async: bool = False) -> dict[str, Any]:
+    """
+    SQLite 文件库：写引擎只有一个连接（同步与异步写引擎另共用一个写许可，见 SQLiteWriteLock）；
+    读引擎为只读连接池。aiosqlite 默认不复用连接（NullPool），这里同样使用连接池，
+    PRAGMA 只在建立连接时执行一次
+    """
+    if not _is_sqlite_file(url):
+        return {}
+    settings = get_settings()
+    options: dict[str, Any] = {
+        "pool_size": 1,
+        "max_overflow": 0,
+        "pool_timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000,
+    }
+    if read_only:
+        options["pool_size"] = max(settings.SQLITE_READ_POOL_SIZE, 1)
+    if is_async:
+        options["poolclass"] = AsyncAdaptedQueuePool
+    return options
+
+
+def _listen_sqlite_pragmas(engine: Engine, url: str, read_only: bool) -> None:
+    if make_url(url).get_backend_name() == "sqlite":
+        event.listen(engine, "connect", partial(_set_sqlite_pragmas, read_only=read_only))
+
+
+class SQLiteWriteLock:
+    """
+    进程内的 SQLite 写许可：同步与异步写引擎各有一个连接，借出任一写连接前都要先取得这一个许可
+
+    否则后台线程（导入、翻译、统计核对）的同步写入与接口的异步写入各占一个连接，在数据库文件锁上
+    互相等待，超过 busy_timeout 即报 "database is locked"。许可随连接借出取得、归还释放，
+    等待时间上限同为锁等待时间。异步引擎在线程中等待，不阻塞事件循环。
+    """
+
+    _RECORD_KEY = "holds_sqlite_write_lock"
+
+    def __init__(self, timeout: float) -> None:
+        self.timeout = timeout
+        self._lock = threading.Lock()
+
+    def _acquire(self) -> bool:
+        return self._lock.acquire(timeout=self.timeout)
+
+    def _granted(self, acquired: bool, connection_record: Any) -> None:
+        if not acquired:
+            raise exc.TimeoutError(f"等待 SQLite 写连接超过 {self.timeout:g} 秒")
+        connection_record.info[self._RECORD_KEY] = True
+
+    def on_checkout(
+        self, dbapi_connection: Any, connection_record: Any, connection_proxy: Any
+    ) -> None:
+        self._granted(self._acquire(), connection_record)
+
+    def on_async_checkout(
+        self, dbapi_connection: Any, connection_record: Any, connection_proxy: Any
+    ) -> None:
+        # 事件在异步引擎的 greenlet 中执行：借 await_only 在线程中等待许可
+        self._granted(await_only(anyio.to_thread.run_sync(self._acquire)), connection_record)
+
+    def on_checkin(self, dbapi_connection: Any, connection_record: Any) -> None:
+        if connection_record.info.pop(self._RECORD_KEY, False):
+            self._lock.release()
+
+    def listen(self, engine: Engine, is_async: bool = False) -> None:
+        event.listen(engine, "checkout", self.on_async_checkout if is_async else self.on_checkout)
+        event.listen(engine, "checkin", self.on_checkin)
+
+
+def _create_engine(url: str, read_only: bool = False) -> Engine:
+    engine = create_engine(url, future=True, pool_pre_ping=True, **_engine_options(url, read_only))
+    _listen_sqlite_pragmas(engine, url, read_only)
+    return engine
+
+
+# 异步驱动：同一数据库换用 aiosqlite / psycopg 的异步连接
+_ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+psycopg"}
+
+
+def _async_database_url(url: str) -> str:
+    parsed = make_url(url)
+    driver = _ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        raise RuntimeError(f"不支持异步访问的数据库: {parsed.get_backend_name()}")
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def _create_async_engine(url: str, read_only: bool = False) -> AsyncEngine:
+    engine = create_async_engine(
+        _async_database_url(url),
+        pool_pre_ping=True,
+        **_engine_options(url, read_only, is_async=True),
+    )
+    _listen_sqlite_pragmas(engine.sync_engine, url, read_only)
+    return engine
+
+
+_url = _database_url()
+# SQLite 文件库读写分离：写引擎单连接，同步与异步写引擎共用一个写许可，同一时刻只有一个写连接借出；
+# 读接口走只读连接池（WAL 下读不被写阻塞）；其他数据库读写同一引擎
+_read_url = _read_only_url(_url) if _is_sqlite_file(_url) else None
+
+_engine = _create_engine(_url)
+_write_lock = (
+    SQLiteWriteLock(get_settings().SQLITE_BUSY_TIMEOUT_MS / 1000) if _is_sqlite_file(_url) else None
+)
+if _write_lock is not None:
+    _write_lock.listen(_engine)
+_read_engine = _create_engine(_read_url, read_only=True) if _read_url else _engine
 SessionLocal = sessionmaker(bind=_engine, autocommit=False, autoflush=False, future=True)
+ReadSessionLocal = sessionmaker(bind=_read_engine, autocommit=False, autoflush=False, future=True)
+
+# 路由使用异步会话，查询等待期间不占用事件循环；后台线程（导入、翻译、导出）仍使用同步会话。
+# 提交后不过期对象：异步会话中访问过期属性会触发隐式 IO 而报错
+_async_engine = _create_async_engine(_url)
+if _write_lock is not None:
+    _write_lock.listen(_async_engine.sync_engine, is_async=True)
+_async_read_engine = _create_async_engine(_read_url, read_only=True) if _read_url else _async_engine
+AsyncSessionLocal = async_sessionmaker(_async_engine, autoflush=False, expire_on_commit=False)
+AsyncReadSessionLocal = async_sessionmaker(
+    _async_read_engine, autoflush=False, expire_on_commit=False
+)
+
+# 只读副本（可选）：读接口按延迟与读己之写规则在副本与上面的读会话之间路由，见 ReadRouter
+_replica_url = get_settings().DATABASE_READ_URL
+_replica_engine = _create_engine(_replica_url, read_only=True) if _replica_url else None
+_async_replica_engine = _create_async_engine(_replica_url, read_only=True) if _replica_url else None
+ReplicaSessionLocal = (
+    sessionmaker(bind=_replica_engine, autocommit=False, autoflush=False, future=True)
+    if _replica_engine
+    else None
+)
+AsyncReplicaSessionLocal = (
+    async_sessionmaker(_async_replica_engine, autoflush=False, expire_on_commit=False)
+    if _async_replica_engine
+    else None
+)
+
+# 副本复制延迟（秒）；主库或已回放完所有收到的 WAL 时为 0
+_PG_REPLICA_LAG_SQL = (
+    "SELECT CASE WHEN NOT pg_is_in_recovery() "
+    "OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+class ReadRouter:
+    """
+    读请求路由：副本延迟不超过 max_lag 秒、且该客户端最近 max_lag 秒内没有写入时读副本，否则读主库
+
+    写入后 max_lag 秒内继续读主库，而副本延迟又不超过 max_lag，因此客户端总能读到自己的写入。
+    延迟最多每 LAG_CHECK_INTERVAL 秒查询一次；查询失败（副本不可用）按无限大处理。
+    SQLite 副本（本地测试用的另一个数据库文件）没有复制延迟可查，视为 0。
+    """
+
+    LAG_CHECK_INTERVAL = 1.0
+
+    def __init__(self, engine: AsyncEngine | None, max_lag: float) -> None:
+        self.engine = engine
+        self.max_lag = max(max_lag, 0.0)
+        self._writes: dict[str, float] = {}
+        self._lag = 0.0
+        self._lag_checked_at: float | None = None
+        self._lock = threading.Lock()
+
+    def note_write(self, client: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._writes[client] = now
+            expired = [c for c, t in self._writes.items() if now - t > self.max_lag]
+            for c in expired:
+                del self._writes[c]
+
+    def recently_wrote(self, client: str) -> bool:
+        with self._lock:
+            wrote_at = self._writes.get(client)
+        return wrote_at is not None and time.monotonic() - wrote_at <= self.max_lag
+
+    async def replica_lag(self) -> float:
+        now = time.monotonic()
+        if (
+            self._lag_checked_at is not None
+            and now - self._lag_checked_at < self.LAG_CHECK_INTERVAL
+        ):
+            return self._lag
+        lag = 0.0
+        if self.engine is not None and self.engine.dialect.name == "postgresql":
+            try:
+                async with self.engine.connect() as conn:
+                    lag = float((await conn.exec_driver_sql(_PG_REPLICA_LAG_SQL)).scalar_one())
+            except Exception:
+                logger.warning("查询只读副本延迟失败，暂时改读主库", exc_info=True)
+                lag = float("inf")
+        self._lag, self._lag_checked_at = lag, now
+        return lag
+
+    async def use_replica(self, client: str) -> bool:
+        if self.engine is None or self.recently_wrote(client):
+            return False
+        return await self.replica_lag() <= self.max_lag
+
 
+read_router = ReadRouter(_async_replica_engine, get_settings().DATABASE_READ_MAX_LAG)
 
-def get_db() -> Iterator[Session]:
+
+def _client_key(request: Request) -> str:
+    """读己之写按客户端区分：已登录按用户名，否则按来源地址"""
+    auth = request.headers.get("authorization", "")
+    if auth.lower().startswith("bearer "):
+        try:
+            subject = decode_token(auth[7:]).get("sub")
+        except Exception:
+            subject = None
+        if subject:
+            return f"user:{subject}"
+    return f"addr:{request.client.host if request.client else ''}"
+
+
+async def use_read_replica(request: Request) -> bool:
+    """本次只读请求是否读副本（未配置 DATABASE_READ_URL 时总是 False）"""
+    return await read_router.use_replica(_client_key(request))
+
+
+def get_db(request: Request) -> Iterator[Session]:
+    client = _client_key(request)
+    read_router.note_write(client)
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+        # 从写入结束时重新计算读主库的时间窗口
+        read_router.note_write(client)
+
+
+async def get_async_db(request: Request) -> AsyncIterator[AsyncSession]:
+    """写接口使用的主库会话；同时记录该客户端的写入，之后的读请求在延迟容忍时间内改读主库"""
+    client = _client_key(request)
+    read_router.note_write(client)
+    try:
+        async with AsyncSessionLocal() as db:
+            yield db
+    finally:
+        read_router.note_write(client)
+
+
+async def get_async_read_db(request: Request) -> AsyncIterator[AsyncSession]:
+    """只读接口使用的会话（副本或主库的只读连接）；在其中写入会失败"""
+    factory = AsyncReplicaSessionLocal if await use_read_replica(request) else AsyncReadSessionLocal
+    async with factory() as db:  # type: ignore[misc]
+        yield db
+
+
+async def dispose_async_engine() -> None:
+    await _async_engine.dispose()
+    if _async_read_engine is not _async_engine:
+        await _async_read_engine.dispose()
+    if _async_replica_engine is not None:
+        await _async_replica_engine.dispose()
 
 
 @contextmanager
@@ -43,3 +345,7 @@ def session_scope() -> Iterator[Session]:
         raise
     finally:
         session.close()
+
+
+def dialect_name() -> str:
+    return _engine.dialect.name
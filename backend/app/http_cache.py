@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import hashlib
+import time
+from typing import Any
+
+from fastapi import Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .cache import table_change_versions
+from .config import get_settings
+from .security import decode_token
+
+# 进程启动标识：部署新代码后响应格式可能变化，旧 ETag 一律失效
+_EPOCH = f"{time.time_ns():x}"
+
+
+def make_etag(versions: tuple[int, ...], *parts: Any) -> str:
+    digest = hashlib.sha1(repr((_EPOCH, versions, parts)).encode("utf-8")).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match 使用弱比较"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def _cache_control(request: Request) -> str:
+    """只读角色的数据短时间内可直接使用缓存；其他请求每次都需重新验证（命中时为 304）"""
+    auth = request.headers.get("authorization", "")
+    role = None
+    if auth.lower().startswith("bearer "):
+        try:
+            role = decode_token(auth[7:]).get("role")
+        except Exception:
+            role = None
+    if role == "readonly":
+        return f"private, max-age={get_settings().READONLY_CACHE_MAX_AGE}"
+    return "private, no-cache"
+
+
+async def conditional_response(
+    request: Request, response: Response, db: AsyncSession, tables: tuple[str, ...], *parts: Any
+) -> Response | None:
+    """
+    条件 GET：由 tables 的变更版本与 parts 生成弱 ETag，并设置 ETag / Cache-Control
+
+    If-None-Match 命中时返回 304 响应，调用方应直接返回它而不再执行查询；否则返回 None。
+    """
+    etag = make_etag(await db.run_sync(table_change_versions, *tables), *parts)
+    headers = {"ETag": etag, "Cache-Control": _cache_control(request), "Vary": "Authorization"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
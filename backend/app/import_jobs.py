@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable
+
+from .config import get_settings
+from .schemas import ImportJobOut, ImportReport
+
+logger = logging.getLogger(__name__)
+
+# 仅保留最近的已结束任务，避免内存无限增长
+MAX_FINISHED_JOBS = 50
+
+FINISHED_STATUSES = {"completed", "failed", "cancelled"}
+
+
+class ImportJob:
+    """一次后台导入任务的进度与结果。计数由工作线程更新，读取时通过 snapshot() 获取一致视图"""
+
+    def __init__(self, filename: str | None = None) -> None:
+        self.id = uuid.uuid4().hex
+        self.filename = filename
+        self.status = "pending"
+        self.created_at = datetime.utcnow()
+        self.started_at: datetime | None = None
+        self.finished_at: datetime | None = None
+        self.products_total = 0
+        self.products_done = 0
+        self.created = 0
+        self.updated = 0
+        self.images_added = 0
+        self.images_skipped = 0
+        self.unchanged = 0
+        self.dedupe_queries_saved = 0
+        self.errors: list[str] = []
+        # 本任务内已确认入库（或已存在）的图片哈希，仅由执行任务的线程访问
+        self.seen_hashes: set[str] = set()
+        self._started_monotonic: float | None = None
+        self._finished_monotonic: float | None = None
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    def start(self, products_total: int) -> None:
+        with self._lock:
+            self.status = "running"
+            self.started_at = datetime.utcnow()
+            self._started_monotonic = time.monotonic()
+            self.products_total = products_total
+
+    def record(
+        self,
+        created: int,
+        updated: int,
+        images_added: int,
+        images_skipped: int,
+        errors: list[str],
+        done: int = 1,
+        dedupe_queries_saved: int = 0,
+        unchanged: int = 0,
+    ) -> None:
+        with self._lock:
+            self.products_done += done
+            self.created += created
+            self.updated += updated
+            self.images_added += images_added
+            self.images_skipped += images_skipped
+            self.dedupe_queries_saved += dedupe_queries_saved
+            self.unchanged += unchanged
+            self.errors.extend(errors)
+
+    def finish(self, status: str, error: str | None = None) -> None:
+        with self._lock:
+            self.status = status
+            self.finished_at = datetime.utcnow()
+            self._finished_monotonic = time.monotonic()
+            if error:
+                self.errors.append(error)
+
+    def elapsed_seconds(self) -> float | None:
+        if self._started_monotonic is None:
+            return None
+        if self._finished_monotonic is not None:
+            return round(self._finished_monotonic - self._started_monotonic, 3)
+        return round(time.monotonic() - self._started_monotonic, 3)
+
+    def products_per_second(self) -> float | None:
+        elapsed = self.elapsed_seconds()
+        if not elapsed:
+            return None
+        return round(self.products_done / elapsed, 2)
+
+    def eta_seconds(self) -> float | None:
+        if self.status != "running" or not self.products_done or self._started_monotonic is None:
+            return None
+        elapsed = time.monotonic() - self._started_monotonic
+        remaining = max(self.products_total - self.products_done, 0)
+        return round(elapsed / self.products_done * remaining, 1)
+
+    def snapshot(self) -> ImportJobOut:
+        with self._lock:
+            return ImportJobOut(
+                id=self.id,
+                filename=self.filename,
+                status=self.status,
+                products_total=self.products_total,
+                products_done=self.products_done,
+                created=self.created,
+                updated=self.updated,
+                images_added=self.images_added,
+                images_skipped=self.images_skipped,
+                unchanged=self.unchanged,
+                dedupe_queries_saved=self.dedupe_queries_saved,
+                errors=list(self.errors),
+                eta_seconds=self.eta_seconds(),
+                elapsed_seconds=self.elapsed_seconds(),
+                products_per_second=self.products_per_second(),
+                created_at=self.created_at,
+                started_at=self.started_at,
+                finished_at=self.finished_at,
+            )
+
+    def report(self) -> ImportReport:
+        with self._lock:
+            return ImportReport(
+                total=self.created + self.updated,
+                created=self.created,
+                updated=self.updated,
+                images_added=self.images_added,
+                images_skipped=self.images_skipped,
+                unchanged=self.unchanged,
+                dedupe_queries_saved=self.dedupe_queries_saved,
+                elapsed_seconds=self.elapsed_seconds(),
+                products_per_second=self.products_per_second(),
+                errors=list(self.errors),
+            )
+
+
+_jobs: dict[str, ImportJob] = {}
+_jobs_lock = threading.Lock()
+_executor: ThreadPoolExecutor | None = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _jobs_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max(get_settings().IMPORT_JOB_WORKERS, 1),
+                thread_name_prefix="import-job",
+            )
+        return _executor
+
+
+def _prune_finished() -> None:
+    finished = [j for j in _jobs.values() if j.status in FINISHED_STATUSES]
+    finished.sort(key=lambda j: j.finished_at or j.created_at)
+    for job in finished[: max(len(finished) - MAX_FINISHED_JOBS, 0)]:
+        _jobs.pop(job.id, None)
+
+
+def submit_job(job: ImportJob, run: Callable[[ImportJob], None]) -> ImportJob:
+    """
+    登记任务并交给工作线程池执行；run 负责调用 job.start()/record()，并在适当时机检查 job.cancelled
+    """
+
+    def _runner() -> None:
+        if job.cancelled:
+            job.finish("cancelled")
+            return
+        try:
+            run(job)
+        except Exception as e:
+            logger.exception(f"导入任务失败: {job.id}")
+            job.finish("failed", f"任务失败: {e}")
+            return
+        job.finish("cancelled" if job.cancelled else "completed")
+        logger.info(f"导入任务结束: {job.id}, 状态: {job.status}")
+
+    with _jobs_lock:
+        _prune_finished()
+        _jobs[job.id] = job
+    _get_executor().submit(_runner)
+    return job
+
+
+def get_job(job_id: str) -> ImportJob | None:
+    with _jobs_lock:
+        return _jobs.get(job_id)
+
+
+def list_jobs() -> list[ImportJob]:
+    with _jobs_lock:
+        return sorted(_jobs.values(), key=lambda j: j.created_at, reverse=True)
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+
+from .config import get_settings
+from .db import SessionLocal
+from .import_jobs import FINISHED_STATUSES, ImportJob, submit_job
+from .routers.imports import import_product_dirs, iter_data_dir_products
+
+logger = logging.getLogger(__name__)
+
+
+class ImportWatcher:
+    """
+    定期扫描 DATA_DIR 的监听线程
+
+    每轮只做 stat：与上一轮成功导入时的文件元数据指纹比较，把新增或变化的产品目录
+    作为一个增量导入任务提交（可在 /api/import/jobs 中查看）。上一轮任务未结束时跳过本轮；
+    只记录完整入库的目录的指纹，批次失败、图片上传失败或因取消未处理的目录会在下一轮重新提交。
+    首轮会提交全部目录，由导入清单跳过内容未变化的部分。
+    """
+
+    def __init__(self, root: str, interval: float) -> None:
+        self.root = root
+        self.interval = max(interval, 1.0)
+        self._signatures: dict[str, str] = {}
+        self._job: ImportJob | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="import-watcher", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.scan_once()
+            except Exception:
+                logger.exception(f"扫描导入目录失败: {self.root}")
+            self._stop.wait(self.interval)
+
+    def scan_once(self) -> ImportJob | None:
+        """扫描一轮，有变化时提交导入任务并返回"""
+        if self._job is not None and self._job.status not in FINISHED_STATUSES:
+            return None
+        if not os.path.isdir(self.root):
+            return None
+        changed = []
+        signatures: dict[str, str] = {}
+        for product_dir in iter_data_dir_products(self.root):
+            try:
+                signature = product_dir.stat_signature()
+            except OSError:
+                continue
+            if self._signatures.get(product_dir.path) != signature:
+                changed.append(product_dir)
+                signatures[product_dir.path] = signature
+        if not changed:
+            return None
+
+        def run(job: ImportJob) -> None:
+            db = SessionLocal()
+            try:
+                imported = import_product_dirs(db, changed, job)
+            finally:
+                db.close()
+            self._signatures.update({d.path: signatures[d.path] for d in imported})
+
+        logger.info(f"导入目录有 {len(changed)} 个产品目录变化，提交增量导入")
+        self._job = submit_job(ImportJob(self.root), run)
+        return self._job
+
+
+_watcher: ImportWatcher | None = None
+_watcher_lock = threading.Lock()
+
+
+def get_import_watcher() -> ImportWatcher:
+    global _watcher
+    with _watcher_lock:
+        if _watcher is None:
+            settings = get_settings()
+            _watcher = ImportWatcher(settings.DATA_DIR, settings.IMPORT_WATCH_INTERVAL)
+        return _watcher
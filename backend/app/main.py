@@ -8,14 +8,18 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from .config import VersionInfo, get_settings
-from .db import session_scope
+from .db import dispose_async_engine, session_scope
+from .import_watcher import get_import_watcher
 from .models import User
-from .security import hash_password, verify_password
 from .routers import auth as auth_router
-from .routers import products as products_router
 from .routers import images as images_router
 from .routers import imports as imports_router
+from .routers import products as products_router
 from .routers import stats as stats_router
+from .routers import translations as translations_router
+from .security import hash_password, verify_password
+from .stats import get_delta_folder, get_stats_reconciler
+from .translation_worker import get_translation_worker
 
 
 def configure_logging() -> None:
@@ -72,6 +76,24 @@ def on_startup() -> None:
                 session.add(user)
                 log.info("admin_password_migrated", username=username)
 
+    if settings.TRANSLATION_BACKFILL_ON_STARTUP:
+        get_translation_worker().request_backfill()
+    if settings.IMPORT_WATCH_ENABLED:
+        get_import_watcher().start()
+    if settings.STATS_RECONCILE_INTERVAL > 0:
+        get_stats_reconciler().start()
+    if settings.DELTA_FOLD_INTERVAL > 0:
+        get_delta_folder().start()
+
+
+@app.on_event("shutdown")
+async def on_shutdown() -> None:
+    get_import_watcher().stop()
+    get_stats_reconciler().stop()
+    get_delta_folder().stop()
+    get_translation_worker().stop()
+    await dispose_async_engine()
+
 
 # Routers
 app.include_router(auth_router.router, prefix="/api/auth", tags=["认证"])
@@ -79,6 +101,7 @@ app.include_router(products_router.router, prefix="/api/products", tags=["产品
 app.include_router(images_router.router, prefix="/api/images", tags=["图片"])
 app.include_router(imports_router.router, prefix="/api/import", tags=["导入"])
 app.include_router(stats_router.router, prefix="/api", tags=["统计与健康"])
+app.include_router(translations_router.router, prefix="/api/translations", tags=["翻译"])
 
 
 @app.get("/version", response_model=VersionInfo, tags=["统计与健康"])
@@ -1,15 +1,17 @@
 from __future__ import annotations
 
 import hashlib
-import os
-from datetime import timedelta
-from typing import Optional
+import logging
+import uuid
+from dataclasses import dataclass
+from typing import IO, BinaryIO, cast
 
 from minio import Minio
-from minio.error import S3Error
 
 from .config import get_settings
 
+logger = logging.getLogger(__name__)
+
 
 def get_minio_client() -> Minio:
     s = get_settings()
@@ -25,19 +27,63 @@ def get_bucket_name() -> str:
     return get_settings().MINIO_BUCKET
 
 
-def md5_of_file(path: str) -> str:
-    md5 = hashlib.md5()
-    with open(path, "rb") as f:
-        for chunk in iter(lambda: f.read(8192), b""):
-            md5.update(chunk)
-    return md5.hexdigest()
+# 长度未知时的分片大小（MinIO 要求不小于 5MiB），也是单次上传的内存上限
+UPLOAD_PART_SIZE = 10 * 1024 * 1024
+
+
+class _HashingReader:
+    """包装只读流，数据被读取上传的同时计算 MD5"""
+
+    def __init__(self, stream: IO[bytes]) -> None:
+        self._stream = stream
+        self._md5 = hashlib.md5()
+        self.size = 0
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self._stream.read(size)
+        self._md5.update(chunk)
+        self.size += len(chunk)
+        return chunk
+
+    def hexdigest(self) -> str:
+        return self._md5.hexdigest()
+
+
+@dataclass
+class UploadedObject:
+    """已上传到最终对象名的图片；哈希重复或未能写入数据库时调用 discard() 删除"""
 
+    object_name: str
+    md5: str
+    size: int
 
-def put_file(local_path: str, object_name: str) -> str:
+    def discard(self) -> None:
+        """删除对象；失败只记录日志"""
+        try:
+            get_minio_client().remove_object(get_bucket_name(), self.object_name)
+        except Exception:
+            logger.warning(f"删除对象失败: {self.object_name}")
+
+
+def upload_stream(stream: IO[bytes], filename: str, length: int = -1) -> UploadedObject:
+    """
+    单次读取流：直接上传到最终对象，同时计算 MD5，内存占用以分片大小为上限
+
+    对象名为 {随机 id}/{filename}，与哈希无关，上传一次即可；调用方拿到哈希后若发现重复，
+    再 discard() 删除。length 未知时传 -1。
+    """
     client = get_minio_client()
     bucket = get_bucket_name()
-    client.fput_object(bucket, object_name, local_path)
-    return f"{bucket}/{object_name}"
+    object_name = f"{uuid.uuid4().hex}/{filename}"
+    reader = _HashingReader(stream)
+    try:
+        client.put_object(
+            bucket, object_name, cast(BinaryIO, reader), length, part_size=UPLOAD_PART_SIZE
+        )
+    except Exception:
+        UploadedObject(object_name, "", 0).discard()
+        raise
+    return UploadedObject(object_name=object_name, md5=reader.hexdigest(), size=reader.size)
 
 
 def _normalize_object_name(minio_path: str) -> str:
@@ -55,11 +101,11 @@ def presigned_url(minio_path: str, expires_seconds: int = 3600) -> str:
     s = get_settings()
     bucket = get_bucket_name()
     object_name = _normalize_object_name(minio_path)
-    
+
     # 使用公开端点或内部端点
     endpoint = s.MINIO_PUBLIC_ENDPOINT or s.MINIO_ENDPOINT
     protocol = "https" if s.MINIO_USE_SECURE else "http"
-    
+
     # 构造公开访问URL（桶已设置为公开读取）
     return f"{protocol}://{endpoint}/{bucket}/{object_name}"
 
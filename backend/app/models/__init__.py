@@ -1,3 +1,7 @@
-from .product import Product  # noqa: F401
+from .change_version import ChangeVersion, ChangeVersionDelta  # noqa: F401
 from .image import Image  # noqa: F401
+from .import_manifest import ImportManifest  # noqa: F401
+from .product import Product  # noqa: F401
+from .stats_counter import StatsCounter, StatsCounterDelta  # noqa: F401
+from .translation import TranslationCache  # noqa: F401
 from .user import User  # noqa: F401
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from sqlalchemy import BigInteger, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..db import Base
+
+
+class ChangeVersion(Base):
+    """
+    表级变更版本，用于生成 ETag 与进程内缓存的版本（见迁移 0008、0010）
+
+    SQLite 上由触发器在每次写入时直接加一；Postgres 上触发器只向 change_version_deltas 追加一行，
+    由后台定期并入本表。当前版本为两者之和（app/cache.py: table_change_versions）。
+    """
+
+    __tablename__ = "change_versions"
+
+    table_name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+
+class ChangeVersionDelta(Base):
+    """尚未并入 change_versions 的版本增量，每行加一；只追加，写入方之间不争用同一行"""
+
+    __tablename__ = "change_version_deltas"
+
+    id: Mapped[int] = mapped_column(
+        BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True
+    )
+    table_name: Mapped[str] = mapped_column(String(64), nullable=False)
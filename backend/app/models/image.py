@@ -1,9 +1,8 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Optional
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, Text, UniqueConstraint, Index
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, Text, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from ..db import Base
@@ -13,10 +12,12 @@ class Image(Base):
     __tablename__ = "images"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    product_id: Mapped[int] = mapped_column(ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
+    product_id: Mapped[int] = mapped_column(
+        ForeignKey("products.id", ondelete="CASCADE"), nullable=False
+    )
     image_filename: Mapped[str] = mapped_column(Text, nullable=False)
-    image_hash: Mapped[Optional[str]] = mapped_column(Text, unique=True)
-    minio_path: Mapped[Optional[str]] = mapped_column(Text)
+    image_hash: Mapped[str | None] = mapped_column(Text, unique=True)
+    minio_path: Mapped[str | None] = mapped_column(Text)
     is_cover: Mapped[bool] = mapped_column(default=False, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
 
@@ -24,5 +25,8 @@ class Image(Base):
 
     __table_args__ = (
         UniqueConstraint("product_id", "image_filename", name="uq_product_image_filename"),
-        Index("ix_images_product_id", "product_id"),
+        # 产品的图片列表按创建时间倒序；头像按 is_cover 查找。两者都以 product_id 开头，
+        # 也用于按产品筛选
+        Index("ix_images_product_created_at", "product_id", "created_at"),
+        Index("ix_images_product_cover", "product_id", "is_cover"),
     )
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..db import Base
+
+
+class ImportManifest(Base):
+    """每个产品 url 最近一次成功导入时的目录指纹，用于增量导入跳过未变化的目录"""
+
+    __tablename__ = "import_manifest"
+
+    url: Mapped[str] = mapped_column(Text, primary_key=True)
+    product_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    details_hash: Mapped[str] = mapped_column(
+        String(64), nullable=False
+    )  # sha256(product_details.json)
+    images_fingerprint: Mapped[str] = mapped_column(
+        String(64), nullable=False
+    )  # sha256(文件名+大小+校验)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
@@ -1,9 +1,8 @@
 from __future__ import annotations
 
 from datetime import date, datetime
-from typing import List, Optional
 
-from sqlalchemy import Date, DateTime, Integer, String, Text, UniqueConstraint, Index
+from sqlalchemy import Date, DateTime, Index, Integer, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from ..db import Base
@@ -13,26 +12,50 @@ class Product(Base):
     __tablename__ = "products"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    product_name: Mapped[Optional[str]] = mapped_column(Text)
-    product_name_cn: Mapped[Optional[str]] = mapped_column(Text)  # 中文翻译
-    price: Mapped[Optional[str]] = mapped_column(Text)
-    release_date: Mapped[Optional[str]] = mapped_column(Text)
-    article_content: Mapped[Optional[str]] = mapped_column(Text)
+    product_name: Mapped[str | None] = mapped_column(Text)
+    product_name_cn: Mapped[str | None] = mapped_column(Text)  # 中文翻译
+    price: Mapped[str | None] = mapped_column(Text)
+    release_date: Mapped[str | None] = mapped_column(Text)
+    article_content: Mapped[str | None] = mapped_column(Text)
     url: Mapped[str] = mapped_column(Text, unique=True, nullable=False)
-    product_tag: Mapped[Optional[str]] = mapped_column(Text)
-    series: Mapped[Optional[str]] = mapped_column(Text)
+    product_tag: Mapped[str | None] = mapped_column(Text)
+    series: Mapped[str | None] = mapped_column(Text)
     created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
 
     # minimal evolution for efficient filter/sort
-    price_value: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
-    release_date_value: Mapped[Optional[date]] = mapped_column(Date, nullable=True)
+    price_value: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    release_date_value: Mapped[date | None] = mapped_column(Date, nullable=True)
 
-    images: Mapped[List["Image"]] = relationship(
+    # 图片汇总（由 product_images.refresh_image_summary 维护）：图片数与头像图片 id
+    image_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    cover_image_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+
+    images: Mapped[list[Image]] = relationship(
         back_populates="product", cascade="all, delete-orphan"
     )
 
+    # 索引按列表实际的筛选/排序组合建立，见迁移 0009 与 tests/test_query_plans.py
     __table_args__ = (
-        Index("ix_products_common", "product_name", "price", "release_date", "product_tag", "series", "created_at"),
+        Index("ix_products_created_at", "created_at", "id"),
+        Index("ix_products_product_name", "product_name"),
         Index("ix_products_price_value", "price_value"),
         Index("ix_products_release_date_value", "release_date_value"),
+        Index("ix_products_image_count", "image_count"),
+        Index("ix_products_tag_created_at", "product_tag", "created_at"),
     )
+
+
+# Postgres：可为空的排序列在游标分页中按 DESC NULLS LAST 排序，与默认索引的反向扫描顺序不同，
+# 需单独的索引。
+# SQLite 可直接用上面的单列索引
+Index(
+    "ix_products_price_value_desc", Product.price_value.desc().nulls_last(), Product.id.desc()
+).ddl_if(dialect="postgresql")
+Index(
+    "ix_products_release_date_value_desc",
+    Product.release_date_value.desc().nulls_last(),
+    Product.id.desc(),
+).ddl_if(dialect="postgresql")
+Index(
+    "ix_products_product_name_desc", Product.product_name.desc().nulls_last(), Product.id.desc()
+).ddl_if(dialect="postgresql")
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from sqlalchemy import BigInteger, Integer, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..db import Base
+
+
+class StatsCounter(Base):
+    """
+    统计汇总计数，由 products 上的触发器增量维护（见迁移 0010），定期与实际数据核对（app/stats.py）
+
+    dimension：total / tag / series / with_images；name：标签或系列名（NULL 记为空串），
+    其余维度为空串。Postgres 上触发器只向 stats_counter_deltas 追加增量，由后台定期并入本表；
+    当前计数为两者之和。
+    """
+
+    __tablename__ = "stats_counters"
+
+    dimension: Mapped[str] = mapped_column(String(16), primary_key=True)
+    name: Mapped[str] = mapped_column(Text, primary_key=True, default="")
+    count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+
+class StatsCounterDelta(Base):
+    """尚未并入 stats_counters 的计数增量（触发器与核对修正写入），只追加"""
+
+    __tablename__ = "stats_counter_deltas"
+
+    id: Mapped[int] = mapped_column(
+        BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True
+    )
+    dimension: Mapped[str] = mapped_column(String(16), nullable=False)
+    name: Mapped[str] = mapped_column(Text, nullable=False, default="")
+    delta: Mapped[int] = mapped_column(BigInteger, nullable=False)
@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..db import Base
+
+
+class TranslationCache(Base):
+    """持久化翻译缓存，按 (原文哈希, 源语言, 目标语言, 模型) 唯一"""
+
+    __tablename__ = "translation_cache"
+
+    source_hash: Mapped[str] = mapped_column(String(64), primary_key=True)  # sha256(原文)
+    source_lang: Mapped[str] = mapped_column(String(16), primary_key=True)
+    target_lang: Mapped[str] = mapped_column(String(16), primary_key=True)
+    model: Mapped[str] = mapped_column(String(100), primary_key=True)
+    source_text: Mapped[str] = mapped_column(Text, nullable=False)
+    translated_text: Mapped[str] = mapped_column(Text, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
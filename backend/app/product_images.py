@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from typing import Iterable
+
+from sqlalchemy import ScalarSelect, func, select, update
+from sqlalchemy.orm import Session
+
+from .models import Image, Product
+
+# 单条 UPDATE 的 IN (...) 参数上限，兼顾 SQLite 的变量数上限
+REFRESH_CHUNK = 500
+
+
+def image_count_subquery() -> ScalarSelect[int]:
+    return select(func.count()).where(Image.product_id == Product.id).scalar_subquery()
+
+
+def cover_image_subquery() -> ScalarSelect[int]:
+    """头像：标记为 is_cover 的图片，没有时取最早的一张；同等条件下取 id 最小的"""
+    return (
+        select(Image.id)
+        .where(Image.product_id == Product.id)
+        .order_by(Image.is_cover.desc(), Image.id)
+        .limit(1)
+        .scalar_subquery()
+    )
+
+
+def refresh_image_summary(db: Session, product_ids: Iterable[int]) -> None:
+    """
+    按 images 表重新计算产品的 image_count 与 cover_image_id，不提交
+
+    在图片增删、设置头像之后、提交之前调用；会先 flush 当前会话中未写入的图片。
+    """
+    ids = sorted(set(product_ids))
+    if not ids:
+        return
+    db.flush()
+    for i in range(0, len(ids), REFRESH_CHUNK):
+        db.execute(
+            update(Product)
+            .where(Product.id.in_(ids[i : i + REFRESH_CHUNK]))
+            .values(image_count=image_count_subquery(), cover_image_id=cover_image_subquery())
+            .execution_options(synchronize_session=False)
+        )
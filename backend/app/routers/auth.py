@@ -3,22 +3,31 @@ from __future__ import annotations
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 
-from ..db import get_db
+from ..config import get_settings
+from ..db import get_async_read_db
+from ..deps import get_current_user
 from ..models import User
 from ..schemas import LoginRequest, TokenResponse, UserOut
 from ..security import create_access_token, verify_password
-from ..config import get_settings
-from ..deps import get_current_user
 
 router = APIRouter()
 
 
 @router.post("/login", response_model=TokenResponse)
-async def login(payload: LoginRequest, db: Annotated[Session, Depends(get_db)]) -> TokenResponse:
-    user = db.query(User).filter(User.username == payload.username).one_or_none()
-    if user is None or not verify_password(payload.password, user.password_hash):
+async def login(
+    payload: LoginRequest, db: Annotated[AsyncSession, Depends(get_async_read_db)]
+) -> TokenResponse:
+    user = (
+        await db.execute(select(User).where(User.username == payload.username))
+    ).scalar_one_or_none()
+    # PBKDF2 校验耗时数百毫秒，放到线程池中执行
+    if user is None or not await run_in_threadpool(
+        verify_password, payload.password, user.password_hash
+    ):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="用户名或密码错误")
     settings = get_settings()
     token = create_access_token(subject=user.username, role=user.role)
@@ -1,75 +1,130 @@
 from __future__ import annotations
 
-import os
-import tempfile
 from typing import Annotated, List
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status, Response
-from sqlalchemy.orm import Session
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Form,
+    HTTPException,
+    Request,
+    Response,
+    UploadFile,
+)
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 
-from ..db import get_db
-from ..deps import get_current_user, require_admin
-from ..minio_client import md5_of_file, presigned_url, put_file, remove_object
+from ..db import get_async_db, get_async_read_db
+from ..deps import require_admin
+from ..http_cache import conditional_response
+from ..minio_client import presigned_url, remove_object, upload_stream
 from ..models import Image, Product
+from ..product_images import refresh_image_summary
 from ..schemas import ImageOut, PresignResponse
 
 router = APIRouter()
 
 
 @router.get("/product/{product_id}", response_model=List[ImageOut])
-async def list_images(product_id: int, db: Annotated[Session, Depends(get_db)]) -> List[ImageOut]:
-    product = db.get(Product, product_id)
+async def list_images(
+    product_id: int,
+    request: Request,
+    response: Response,
+    db: Annotated[AsyncSession, Depends(get_async_read_db)],
+) -> list[ImageOut] | Response:
+    not_modified = await conditional_response(
+        request, response, db, ("products", "images"), "images", product_id
+    )
+    if not_modified is not None:
+        return not_modified
+    product = await db.get(Product, product_id)
     if not product:
         raise HTTPException(status_code=404, detail="产品不存在")
-    items = db.query(Image).filter(Image.product_id == product_id).order_by(Image.created_at.desc()).all()
+    items = (
+        (
+            await db.execute(
+                select(Image)
+                .where(Image.product_id == product_id)
+                .order_by(Image.created_at.desc())
+            )
+        )
+        .scalars()
+        .all()
+    )
     return [ImageOut.model_validate(i) for i in items]
 
 
 @router.post("/upload/{product_id}", response_model=ImageOut, dependencies=[Depends(require_admin)])
 async def upload_image(
     product_id: int,
-    db: Annotated[Session, Depends(get_db)],
-    file: UploadFile = File(...),
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    file: Annotated[UploadFile, File()],
     is_cover: str = Form("false"),
 ) -> ImageOut:
-    product = db.get(Product, product_id)
+    product = await db.get(Product, product_id)
     if not product:
         raise HTTPException(status_code=404, detail="产品不存在")
-    
+    # 结束只读事务、归还写连接：上传对象期间不占用写连接
+    await db.commit()
+
     # 将字符串转换为布尔值
     is_cover_bool = is_cover.lower() in ("true", "1", "yes")
-    print(f"Upload image: product_id={product_id}, is_cover={is_cover} -> {is_cover_bool}, filename={file.filename}")
+    print(
+        f"Upload image: product_id={product_id}, is_cover={is_cover} -> {is_cover_bool}, "
+        f"filename={file.filename}"
+    )
 
-    # save temp and compute md5
-    with tempfile.NamedTemporaryFile(delete=False) as tmp:
-        content = await file.read()
-        tmp.write(content)
-        tmp_path = tmp.name
+    # 读取一次上传内容：直接上传到最终对象并同时计算 MD5，不整体读入内存、不另写临时文件。
+    # 哈希与 MinIO 调用都是阻塞的，放到线程池中执行
+    try:
+        uploaded = await run_in_threadpool(
+            upload_stream,
+            file.file,
+            file.filename or "image",
+            file.size if file.size is not None else -1,
+        )
+    except Exception as e:
+        print(f"Error uploading image: {e}")
+        raise HTTPException(status_code=500, detail=f"上传图片失败: {str(e)}") from e
+    stored = False
     try:
-        img_hash = md5_of_file(tmp_path)
-        exists = db.query(Image).filter(Image.image_hash == img_hash).one_or_none()
+        # 先锁住产品行，与导入（先 UPSERT 产品再写图片）加锁顺序一致；同一产品的图片写入依次执行，
+        # 图片摘要总按最新的图片计算
+        locked = (
+            await db.execute(
+                select(Product.id).where(Product.id == product_id).with_for_update(key_share=True)
+            )
+        ).scalar_one_or_none()
+        if locked is None:
+            raise HTTPException(status_code=404, detail="产品不存在")
+        img_hash = uploaded.md5
+        exists = (
+            await db.execute(select(Image).where(Image.image_hash == img_hash))
+        ).scalar_one_or_none()
         if exists:
             print(f"Image already exists with hash: {img_hash}")
             raise HTTPException(status_code=400, detail="图片已存在（MD5 重复）")
-        object_name = f"{product_id}/{img_hash}_{file.filename}"
-        minio_path = put_file(tmp_path, object_name)
-        
+
         # 如果设置为首图，先取消该产品其他图片的首图标记
         if is_cover_bool:
-            db.query(Image).filter(
-                Image.product_id == product_id
-            ).update({Image.is_cover: False})
-        
+            await db.execute(
+                update(Image).where(Image.product_id == product_id).values(is_cover=False)
+            )
+
         entity = Image(
             product_id=product_id,
             image_filename=file.filename,
             image_hash=img_hash,
-            minio_path=object_name,
+            minio_path=uploaded.object_name,
             is_cover=is_cover_bool,
         )
         db.add(entity)
-        db.commit()
-        db.refresh(entity)
+        await db.run_sync(refresh_image_summary, [product_id])
+        await db.commit()
+        stored = True
+        await db.refresh(entity)
         print(f"Successfully created image: {entity.id}")
         return ImageOut.model_validate(entity)
     except HTTPException:
@@ -77,17 +132,18 @@ async def upload_image(
         raise
     except Exception as e:
         print(f"Error uploading image: {e}")
-        raise HTTPException(status_code=500, detail=f"上传图片失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"上传图片失败: {str(e)}") from e
     finally:
-        try:
-            os.unlink(tmp_path)
-        except Exception:
-            pass
+        # 重复或未能写入数据库时删除已上传的对象
+        if not stored:
+            await run_in_threadpool(uploaded.discard)
 
 
 @router.get("/presign/{image_id}", response_model=PresignResponse)
-async def get_presigned(image_id: int, db: Annotated[Session, Depends(get_db)]) -> PresignResponse:
-    entity = db.get(Image, image_id)
+async def get_presigned(
+    image_id: int, db: Annotated[AsyncSession, Depends(get_async_read_db)]
+) -> PresignResponse:
+    entity = await db.get(Image, image_id)
     if not entity or not entity.minio_path:
         raise HTTPException(status_code=404, detail="图片不存在")
     url = presigned_url(entity.minio_path)
@@ -97,41 +153,47 @@ async def get_presigned(image_id: int, db: Annotated[Session, Depends(get_db)])
 @router.put("/{image_id}/set-cover", response_model=ImageOut, dependencies=[Depends(require_admin)])
 async def set_image_as_cover(
     image_id: int,
-    db: Annotated[Session, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_async_db)],
 ) -> ImageOut:
     """设置图片为产品的头像"""
-    entity = db.get(Image, image_id)
+    entity = await db.get(Image, image_id)
     if not entity:
         raise HTTPException(status_code=404, detail="图片不存在")
-    
+
     # 取消该产品其他图片的头像标记
-    db.query(Image).filter(
-        Image.product_id == entity.product_id,
-        Image.id != image_id
-    ).update({Image.is_cover: False})
-    
+    await db.execute(
+        update(Image)
+        .where(Image.product_id == entity.product_id, Image.id != image_id)
+        .values(is_cover=False)
+    )
+
     # 设置当前图片为头像
     entity.is_cover = True
-    db.commit()
-    db.refresh(entity)
+    await db.run_sync(refresh_image_summary, [entity.product_id])
+    await db.commit()
+    await db.refresh(entity)
     return ImageOut.model_validate(entity)
 
 
-@router.delete("/{image_id}", status_code=204, response_class=Response, dependencies=[Depends(require_admin)])
+@router.delete(
+    "/{image_id}", status_code=204, response_class=Response, dependencies=[Depends(require_admin)]
+)
 async def delete_image(
     image_id: int,
-    db: Annotated[Session, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_async_db)],
     delete_object: bool = False,
 ) -> Response:
-    entity = db.get(Image, image_id)
+    entity = await db.get(Image, image_id)
     if not entity:
         raise HTTPException(status_code=404, detail="图片不存在")
     object_name = entity.minio_path
-    db.delete(entity)
-    db.commit()
+    product_id = entity.product_id
+    await db.delete(entity)
+    await db.run_sync(refresh_image_summary, [product_id])
+    await db.commit()
     if delete_object and object_name:
         try:
-            remove_object(object_name)
+            await run_in_threadpool(remove_object, object_name)
         except Exception:
             pass
     return Response(status_code=204)
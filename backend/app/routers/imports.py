@@ -1,28 +1,54 @@
 from __future__ import annotations
 
+import hashlib
 import json
+import logging
 import os
-import shutil
+import posixpath
 import tempfile
+import threading
 import zipfile
-from typing import Annotated, List
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from functools import partial
+from typing import (
+    IO,
+    Annotated,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Sequence,
+    TypeVar,
+    Union,
+)
 
-from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from ..config import get_settings
-from ..db import get_db
+from ..db import SessionLocal, get_db
 from ..deps import require_admin
-from ..models import Product, Image
-from ..schemas import ImportItem, ImportReport
-from ..minio_client import md5_of_file, put_file
+from ..import_jobs import ImportJob, get_job, list_jobs, submit_job
+from ..minio_client import UploadedObject, upload_stream
+from ..models import Image, ImportManifest, Product
+from ..product_images import refresh_image_summary
+from ..schemas import ImportItem, ImportJobOut, ImportReport
+from ..translation import cached_product_names
+from ..translation_worker import get_translation_worker
+from ..upsert import insert_ignore, upsert_products, upsert_rows
 from ..utils import parse_price_to_int, parse_release_date
-from ..translation import translate_product_name
 
+logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
 IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
+DETAILS_FILENAME = "product_details.json"
+# 上传文件分块落盘的块大小
+UPLOAD_CHUNK_SIZE = 1024 * 1024
 
 
 def _is_image_file(filename: str) -> bool:
@@ -30,202 +56,660 @@ def _is_image_file(filename: str) -> bool:
     return any(fname.endswith(ext) for ext in IMAGE_EXTS)
 
 
-def _import_images_for_product(db: Session, base_dir: str, product_id: int) -> tuple[int, int]:
-    """返回 (added, skipped) 数量。根目录下的图片标记为 is_cover=True，images/ 下为 False。"""
-    added = 0
-    skipped = 0
+@dataclass
+class _ImageEntry:
+    """产品目录中的一张图片，open() 返回只读字节流"""
+
+    filename: str
+    size: int
+    is_cover: bool
+    open: Callable[[], IO[bytes]]
+    # 不读取内容即可获得的变化标识（ZIP 成员的 CRC32 / 文件的修改时间），用于增量导入的目录指纹
+    signature: str
+
+
+class _ZipProductDir:
+    """ZIP 内的一个产品目录（包含 product_details.json 的前缀），直接读取成员流，不解压到磁盘"""
+
+    def __init__(self, zf: zipfile.ZipFile, prefix: str, members: list[zipfile.ZipInfo]) -> None:
+        self.zf = zf
+        self.prefix = prefix
+        self.members = members
+
+    @property
+    def name(self) -> str:
+        return posixpath.basename(self.prefix.rstrip("/")) or "."
+
+    def read_details(self) -> bytes:
+        return self.zf.read(self.prefix + DETAILS_FILENAME)
+
+    def image_entries(self) -> list[_ImageEntry]:
+        """根目录下的图片为头像（is_cover=True），images/ 下为详情图；两者均按文件名排序"""
+        covers: list[_ImageEntry] = []
+        details: list[_ImageEntry] = []
+        for info in self.members:
+            rel = info.filename[len(self.prefix) :]
+            if "/" not in rel:
+                is_cover = True
+            elif rel.startswith("images/") and "/" not in rel[len("images/") :]:
+                is_cover = False
+                rel = rel[len("images/") :]
+            else:
+                continue
+            if not rel or not _is_image_file(rel):
+                continue
+            entry = _ImageEntry(
+                filename=rel,
+                size=info.file_size,
+                is_cover=is_cover,
+                open=partial(self.zf.open, info),
+                signature=f"{info.CRC:08x}",
+            )
+            (covers if is_cover else details).append(entry)
+        covers.sort(key=lambda e: e.filename)
+        details.sort(key=lambda e: e.filename)
+        return covers + details
+
+
+def _iter_zip_product_dirs(zf: zipfile.ZipFile) -> Iterator[_ZipProductDir]:
+    """遍历一次中央目录，按前缀归组成员，产出每个包含 product_details.json 的产品目录"""
+    prefixes: list[str] = []
+    members: dict[str, list[zipfile.ZipInfo]] = {}
+    infos = [i for i in zf.infolist() if not i.is_dir()]
+    for info in infos:
+        if posixpath.basename(info.filename) == DETAILS_FILENAME:
+            prefix = info.filename[: -len(DETAILS_FILENAME)]
+            prefixes.append(prefix)
+            members[prefix] = []
+    if not prefixes:
+        return
+    for info in infos:
+        # 成员只属于其所在的产品目录，或产品目录下的 images/ 子目录
+        parent = posixpath.dirname(info.filename)
+        prefix = f"{parent}/" if parent else ""
+        if prefix not in members and posixpath.basename(parent) == "images":
+            grand = posixpath.dirname(parent)
+            prefix = f"{grand}/" if grand else ""
+        if prefix in members:
+            members[prefix].append(info)
+    for prefix in sorted(prefixes):
+        yield _ZipProductDir(zf, prefix, members[prefix])
+
+
+def _open_binary(path: str) -> IO[bytes]:
+    return open(path, "rb")
+
+
+class _FsProductDir:
+    """DATA_DIR 下的一个产品目录，原地读取文件，不复制、不解压"""
 
-    # 根目录头像图
-    for entry in os.listdir(base_dir):
-        full_path = os.path.join(base_dir, entry)
-        if os.path.isfile(full_path) and _is_image_file(entry):
-            try:
-                img_hash = md5_of_file(full_path)
-                exists = db.query(Image).filter(Image.image_hash == img_hash).one_or_none()
-                if exists:
-                    skipped += 1
+    def __init__(self, root: str, path: str) -> None:
+        self.root = root
+        self.path = path
+
+    @property
+    def name(self) -> str:
+        return os.path.relpath(self.path, self.root)
+
+    def read_details(self) -> bytes:
+        with open(os.path.join(self.path, DETAILS_FILENAME), "rb") as f:
+            return f.read()
+
+    def image_entries(self) -> list[_ImageEntry]:
+        """与 ZIP 目录相同的约定：根目录下的图片为头像，images/ 下为详情图，均按文件名排序"""
+        return self._scan(self.path, True) + self._scan(os.path.join(self.path, "images"), False)
+
+    @staticmethod
+    def _scan(directory: str, is_cover: bool) -> list[_ImageEntry]:
+        entries: list[_ImageEntry] = []
+        try:
+            it = os.scandir(directory)
+        except OSError:
+            return entries
+        with it:
+            for item in it:
+                if not item.is_file() or not _is_image_file(item.name):
                     continue
-                object_name = f"{product_id}/{img_hash}_{entry}"
-                put_file(full_path, object_name)
-                db.add(Image(product_id=product_id, image_filename=entry, image_hash=img_hash, minio_path=object_name, is_cover=True))
-                added += 1
-            except Exception:
-                skipped += 1
+                st = item.stat()
+                entries.append(
+                    _ImageEntry(
+                        filename=item.name,
+                        size=st.st_size,
+                        is_cover=is_cover,
+                        open=partial(_open_binary, item.path),
+                        signature=f"{st.st_mtime_ns:x}",
+                    )
+                )
+        entries.sort(key=lambda e: e.filename)
+        return entries
 
-    # 详情图目录 images/
-    images_dir = os.path.join(base_dir, "images")
-    if os.path.isdir(images_dir):
-        for entry in sorted(os.listdir(images_dir)):
-            full_path = os.path.join(images_dir, entry)
-            if os.path.isfile(full_path) and _is_image_file(entry):
-                try:
-                    img_hash = md5_of_file(full_path)
-                    exists = db.query(Image).filter(Image.image_hash == img_hash).one_or_none()
-                    if exists:
-                        skipped += 1
-                        continue
-                    object_name = f"{product_id}/{img_hash}_{entry}"
-                    put_file(full_path, object_name)
-                    db.add(Image(product_id=product_id, image_filename=entry, image_hash=img_hash, minio_path=object_name, is_cover=False))
-                    added += 1
-                except Exception:
-                    skipped += 1
+    def stat_signature(self) -> str:
+        """仅基于文件元数据（大小与修改时间）的目录指纹，供监听器判断目录是否变化"""
+        st = os.stat(os.path.join(self.path, DETAILS_FILENAME))
+        return f"{st.st_size:x}.{st.st_mtime_ns:x}.{_images_fingerprint(self.image_entries())}"
+
+
+_ProductDir = Union[_ZipProductDir, _FsProductDir]
+_D = TypeVar("_D", bound=_ProductDir)
+
+
+def iter_data_dir_products(root: str) -> Iterator[_FsProductDir]:
+    """按路径顺序遍历 root 下所有包含 product_details.json 的目录"""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        if DETAILS_FILENAME in filenames:
+            yield _FsProductDir(root, dirpath)
+
+
+_upload_executor: ThreadPoolExecutor | None = None
+_upload_executor_lock = threading.Lock()
+
+
+def _get_upload_executor() -> ThreadPoolExecutor:
+    """所有导入共享的有界线程池，限制对 MinIO 的总并发"""
+    global _upload_executor
+    with _upload_executor_lock:
+        if _upload_executor is None:
+            _upload_executor = ThreadPoolExecutor(
+                max_workers=max(get_settings().IMPORT_UPLOAD_CONCURRENCY, 1),
+                thread_name_prefix="import-upload",
+            )
+        return _upload_executor
 
-    db.commit()
-    return added, skipped
 
+def _upload_entry(entry: _ImageEntry) -> UploadedObject | None:
+    """读取一次图片：直接上传到最终对象并同时计算 MD5；失败返回 None"""
+    try:
+        with entry.open() as stream:
+            return upload_stream(stream, entry.filename, entry.size)
+    except Exception:
+        return None
+
+
+# 单条 IN (...) 查询的最大参数个数，兼顾 SQLite 的变量数上限
+HASH_LOOKUP_CHUNK = 500
+
+
+def _existing_hashes(db: Session, hashes: Iterable[str]) -> tuple[set[str], int]:
+    """用 IN (...) 批量查询已存在的图片哈希，返回 (已存在的哈希集合, 查询次数)"""
+    pending = list(hashes)
+    found: set[str] = set()
+    queries = 0
+    for i in range(0, len(pending), HASH_LOOKUP_CHUNK):
+        chunk = pending[i : i + HASH_LOOKUP_CHUNK]
+        rows = db.query(Image.image_hash).filter(Image.image_hash.in_(chunk)).all()
+        found.update(h for (h,) in rows)
+        queries += 1
+    return found, queries
+
+
+def _images_fingerprint(entries: list[_ImageEntry]) -> str:
+    """图片集合指纹：文件名、头像标记、大小与校验标识，不读取图片内容"""
+    digest = hashlib.sha256()
+    for entry in entries:
+        digest.update(
+            f"{int(entry.is_cover)}|{entry.filename}|{entry.size}|{entry.signature}\n".encode()
+        )
+    return digest.hexdigest()
 
-def _is_product_dir(path: str) -> bool:
-    """判断目录是否为产品目录（包含 product_details.json）"""
-    return os.path.isfile(os.path.join(path, "product_details.json"))
 
+@dataclass
+class _PendingImage:
+    """已上传、哈希不重复，等待写入数据库的图片"""
 
-def _process_product_dir(db: Session, product_dir: str) -> tuple[int, int, int, int, List[str]]:
+    url: str
+    entry: _ImageEntry
+    uploaded: UploadedObject
+
+
+def _discard_all(uploaded: Iterable[UploadedObject | None]) -> None:
+    list(
+        _get_upload_executor().map(
+            lambda obj: obj.discard(), [obj for obj in uploaded if obj is not None]
+        )
+    )
+
+
+def _upload_images_for_batch(
+    db: Session, targets: list[tuple[str, list[_ImageEntry], int | None]], seen_hashes: set[str]
+) -> tuple[list[_PendingImage], int, int, set[str]]:
     """
-    处理单个产品目录
-    返回: (created, updated, images_added, images_skipped, errors)
+    上传一批产品的图片并完成去重，不写数据库。
+    返回 (pending, skipped, dedupe_queries_saved, failed_urls)
+
+    targets 为 (url, 图片列表, 已有产品 id 或 None)。根目录下的图片标记为 is_cover=True，
+    images/ 下为 False。
+    同名文件已存在的图片不读取；其余图片只读取一次，直接上传到最终对象并同时计算 MD5，
+    内存占用以分片大小为上限。
+    去重先查 seen_hashes（本次导入已见过的哈希），其余哈希对整批只做一次 IN 查询，
+    重复的对象删除。
+    上传在线程池中并发执行；每次查询后即结束只读事务，上传期间不占用写连接。
+    failed_urls 为有图片读取或上传失败的产品，这些产品不应记入导入清单。
     """
-    created = 0
-    updated = 0
-    images_added = 0
-    images_skipped = 0
-    errors: List[str] = []
-    
+    entries = [(url, entry) for url, images, _ in targets for entry in images]
+    if not entries:
+        return [], 0, 0, set()
+    executor = _get_upload_executor()
+    skipped = 0
+    failed: set[str] = set()
+
+    # 1. 同名文件已存在的图片直接跳过，不读取内容
+    urls_by_id = {product_id: url for url, _, product_id in targets if product_id is not None}
+    existing_names = {
+        (urls_by_id[product_id], filename)
+        for product_id, filename in db.query(Image.product_id, Image.image_filename)
+        .filter(Image.product_id.in_(list(urls_by_id)))
+        .all()
+    }
+    db.commit()
+    to_upload: list[tuple[str, _ImageEntry]] = []
+    for url, entry in entries:
+        if (url, entry.filename) in existing_names:
+            skipped += 1
+            continue
+        existing_names.add((url, entry.filename))
+        to_upload.append((url, entry))
+
+    # 2. 并发上传，同时得到哈希
+    uploaded = list(executor.map(lambda t: _upload_entry(t[1]), to_upload))
     try:
-        # 读取 product_details.json
-        json_path = os.path.join(product_dir, "product_details.json")
-        with open(json_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            items: List[ImportItem]
-            if isinstance(data, list):
-                items = [ImportItem.model_validate(i) for i in data]
+        # 3. 去重：本次导入已见过的哈希不再查库，其余整批一次查询
+        candidates: list[_PendingImage] = []
+        discard: list[UploadedObject] = []
+        local: set[str] = set()
+        for (url, entry), obj in zip(to_upload, uploaded):
+            if obj is None:
+                failed.add(url)
+                skipped += 1
+            elif obj.md5 in local or obj.md5 in seen_hashes:
+                discard.append(obj)
+                skipped += 1
             else:
-                items = [ImportItem.model_validate(data)]
-        
-        if len(items) != 1:
-            errors.append("目录包含多条产品，跳过")
-            return created, updated, images_added, images_skipped, errors
-        
-        it = items[0]
-        
-        # Upsert 产品
-        existing = db.query(Product).filter(Product.url == it.url).one_or_none()
-        
-        # 翻译产品名称
-        cn_name = None
-        if it.product_name:
-            cn_name = translate_product_name(it.product_name)
-        
-        if existing is None:
-            entity = Product(
-                product_name=it.product_name,
-                product_name_cn=cn_name,
-                price=(it.product_info or {}).get("価格") if it.product_info else None,
-                release_date=(it.product_info or {}).get("発売日") if it.product_info else None,
-                article_content=it.article_content,
-                url=it.url,
-                product_tag=it.product_tag,
-                series=it.series,
-            )
-            entity.price_value = parse_price_to_int(entity.price)
-            entity.release_date_value = parse_release_date(entity.release_date)
-            db.add(entity)
-            db.commit()
-            db.refresh(entity)
-            created += 1
-            product_id = entity.id
+                local.add(obj.md5)
+                candidates.append(_PendingImage(url, entry, obj))
+        existing, queries = _existing_hashes(db, local)
+        db.commit()
+    except Exception:
+        _discard_all(uploaded)
+        raise
+    # 逐图查询时，每张算出哈希的图片都要查询一次
+    queries_saved = len([obj for obj in uploaded if obj is not None]) - queries
+    seen_hashes.update(existing)
+
+    pending: list[_PendingImage] = []
+    for image in candidates:
+        if image.uploaded.md5 in existing:
+            discard.append(image.uploaded)
+            skipped += 1
         else:
-            existing.product_name = it.product_name or existing.product_name
-            # 总是更新翻译，即使用 None（翻译失败）
-            existing.product_name_cn = cn_name
-            if it.product_info:
-                price_text = it.product_info.get("価格")
-                release_text = it.product_info.get("発売日")
-                if price_text is not None:
-                    existing.price = price_text
-                if release_text is not None:
-                    existing.release_date = release_text
-            if it.article_content is not None:
-                existing.article_content = it.article_content
-            if it.product_tag is not None:
-                existing.product_tag = it.product_tag
-            if it.series is not None:
-                existing.series = it.series
-            existing.price_value = parse_price_to_int(existing.price)
-            existing.release_date_value = parse_release_date(existing.release_date)
-            db.commit()
-            updated += 1
-            product_id = existing.id
-        
-        # 导入图片
+            pending.append(image)
+    # 4. 并发删除重复的对象
+    _discard_all(discard)
+    return pending, skipped, queries_saved, failed
+
+
+def _parse_import_item(raw: bytes) -> ImportItem:
+    """校验 product_details.json 的内容，目录必须只包含一条产品"""
+    data = json.loads(raw.decode("utf-8"))
+    items: list[ImportItem]
+    if isinstance(data, list):
+        items = [ImportItem.model_validate(i) for i in data]
+    else:
+        items = [ImportItem.model_validate(data)]
+    if len(items) != 1:
+        raise ValueError("目录包含多条产品，跳过")
+    return items[0]
+
+
+def _product_row(it: ImportItem, cn_name: str | None) -> dict[str, object]:
+    price = it.product_info.get("価格") if it.product_info else None
+    release_date = it.product_info.get("発売日") if it.product_info else None
+    return {
+        # 空名称视为未提供，保留旧值
+        "product_name": it.product_name or None,
+        "product_name_cn": cn_name,
+        "price": price,
+        "release_date": release_date,
+        "article_content": it.article_content,
+        "url": it.url,
+        "product_tag": it.product_tag,
+        "series": it.series,
+        "price_value": parse_price_to_int(price),
+        "release_date_value": parse_release_date(release_date),
+    }
+
+
+def _process_product_batch(
+    db: Session, product_dirs: Sequence[_D], job: ImportJob, incremental: bool = True
+) -> list[_D]:
+    """
+    处理一批产品目录并把结果记录到 job，返回已完整入库（或内容未变化）的目录：整批产品一次 UPSERT、
+    图片一次去重查询，最后只提交一次
+
+    图片上传与所有查询在写入之前完成，写事务只包含产品 UPSERT、图片记录与清单，不涉及网络传输；
+    事务失败时删除本批已上传的对象；与并发写入冲突而未插入的图片记为跳过，同样删除其对象。
+    incremental=True 时，product_details.json 哈希与图片指纹都与导入清单一致的目录直接跳过，
+    记为 unchanged；处理成功（图片无失败）的目录在同一事务中更新清单。
+    """
+    errors: list[str] = []
+    parsed: list[tuple[_D, ImportItem, list[_ImageEntry], str, str]] = []
+    for product_dir in product_dirs:
         try:
-            a, s = _import_images_for_product(db, product_dir, product_id)
-            images_added += a
-            images_skipped += s
+            raw = product_dir.read_details()
+            entries = product_dir.image_entries()
+            parsed.append(
+                (
+                    product_dir,
+                    _parse_import_item(raw),
+                    entries,
+                    hashlib.sha256(raw).hexdigest(),
+                    _images_fingerprint(entries),
+                )
+            )
         except Exception as e:
-            errors.append(f"导入图片失败: {e}")
-            
+            errors.append(f"{product_dir.name}: 处理失败: {e}")
+
+    unchanged = 0
+    unchanged_dirs: list[_D] = []
+    pending: list[_PendingImage] = []
+    try:
+        if incremental and parsed:
+            # 清单与产品表联查，产品被删除后对应目录会重新导入
+            manifest = {
+                url: (details_hash, fingerprint)
+                for url, details_hash, fingerprint in db.query(
+                    ImportManifest.url,
+                    ImportManifest.details_hash,
+                    ImportManifest.images_fingerprint,
+                )
+                .join(Product, Product.id == ImportManifest.product_id)
+                .filter(ImportManifest.url.in_([it.url for _, it, _, _, _ in parsed]))
+                .all()
+            }
+            changed = [p for p in parsed if manifest.get(p[1].url) != (p[3], p[4])]
+            unchanged_dirs = [p[0] for p in parsed if manifest.get(p[1].url) == (p[3], p[4])]
+            unchanged = len(unchanged_dirs)
+            parsed = changed
+        if not parsed:
+            db.commit()
+            job.record(0, 0, 0, 0, errors, done=len(product_dirs), unchanged=unchanged)
+            return unchanged_dirs
+
+        # 同一批次内 url 重复时以后出现的目录为准
+        # 只取缓存中已有的翻译，其余置为待翻译，提交后交给后台补全
+        cn_names = cached_product_names(
+            [it.product_name for _, it, _, _, _ in parsed if it.product_name], db=db
+        )
+        rows: dict[str, dict[str, object]] = {}
+        for _, it, _, _, _ in parsed:
+            rows[it.url] = _product_row(
+                it, cn_names.get(it.product_name) if it.product_name else None
+            )
+        urls = list(rows)
+        known_ids = dict(
+            db.query(Product.url, Product.id).filter(Product.url.in_(urls)).tuples().all()
+        )
+
+        # 写入之前完成所有图片上传与去重查询：写事务中不再有网络传输
+        pending, images_skipped, queries_saved, failed_urls = _upload_images_for_batch(
+            db,
+            [(it.url, entries, known_ids.get(it.url)) for _, it, entries, _, _ in parsed],
+            job.seen_hashes,
+        )
+
+        # 一个短事务：产品 UPSERT、图片记录、导入清单、图片摘要
+        upsert_products(db, list(rows.values()))
+        ids = dict(db.query(Product.url, Product.id).filter(Product.url.in_(urls)).tuples().all())
+        # 去重查询之后其他写入方可能已提交相同哈希（或同名文件）的图片：冲突的行直接忽略，
+        # 不让整批失败，提交后删除这些行对应的对象
+        stored_paths = set(
+            insert_ignore(
+                db,
+                Image.__table__,
+                [
+                    {
+                        "product_id": ids[p.url],
+                        "image_filename": p.entry.filename,
+                        "image_hash": p.uploaded.md5,
+                        "minio_path": p.uploaded.object_name,
+                        "is_cover": p.entry.is_cover,
+                    }
+                    for p in pending
+                ],
+                returning=Image.minio_path,
+            )
+        )
+        manifest_rows = {
+            it.url: {
+                "url": it.url,
+                "product_id": ids[it.url],
+                "details_hash": details_hash,
+                "images_fingerprint": fingerprint,
+                "updated_at": datetime.utcnow(),
+            }
+            for _, it, _, details_hash, fingerprint in parsed
+            if it.url not in failed_urls
+        }
+        upsert_rows(db, ImportManifest.__table__, list(manifest_rows.values()), ["url"])
+        if stored_paths:
+            refresh_image_summary(db, ids.values())
+        db.commit()
     except Exception as e:
-        errors.append(f"处理失败: {e}")
-    
-    return created, updated, images_added, images_skipped, errors
+        # 回滚失败的事务，避免会话失效影响同一任务中后续的批次；未入库的对象一并删除
+        db.rollback()
+        _discard_all(p.uploaded for p in pending)
+        errors.extend(f"{p[0].name}: 处理失败: {e}" for p in parsed)
+        job.record(0, 0, 0, 0, errors, done=len(product_dirs), unchanged=unchanged)
+        return unchanged_dirs
+
+    for product_dir, it, _, _, _ in parsed:
+        if it.url in failed_urls:
+            errors.append(f"{product_dir.name}: 图片读取或上传失败，下次导入时重试")
+    lost = [p.uploaded for p in pending if p.uploaded.object_name not in stored_paths]
+    _discard_all(lost)
+    images_added = len(pending) - len(lost)
+    images_skipped += len(lost)
+    job.seen_hashes.update(p.uploaded.md5 for p in pending)
+    pending_translation = [
+        ids[url] for url, row in rows.items() if row["product_name"] and not row["product_name_cn"]
+    ]
+    if pending_translation:
+        get_translation_worker().enqueue(pending_translation)
+    job.record(
+        len(urls) - len(known_ids),
+        len(known_ids),
+        images_added,
+        images_skipped,
+        errors,
+        done=len(product_dirs),
+        dedupe_queries_saved=queries_saved,
+        unchanged=unchanged,
+    )
+    # 图片读取或上传失败的目录没有记入清单，不算完成
+    return unchanged_dirs + [
+        product_dir for product_dir, it, _, _, _ in parsed if it.url in manifest_rows
+    ]
+
+
+async def _spool_upload(file: UploadFile) -> str:
+    """将上传文件分块写入临时文件，返回路径；调用方负责删除"""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".zip") as tmp:
+        while True:
+            chunk = await file.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            tmp.write(chunk)
+        return tmp.name
+
+
+def _remove_file(path: str) -> None:
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+def import_product_dirs(
+    db: Session, product_dirs: Sequence[_D], job: ImportJob, incremental: bool = True
+) -> list[_D]:
+    """
+    按批次处理产品目录，把进度记录到 job；每个批次之间检查取消标记
+
+    返回已完整入库（或内容未变化）的目录；失败或因取消未处理的目录不在其中
+    """
+    batch_size = max(get_settings().IMPORT_BATCH_SIZE, 1)
+    job.start(len(product_dirs))
+    imported: list[_D] = []
+    for i in range(0, len(product_dirs), batch_size):
+        if job.cancelled:
+            break
+        imported.extend(
+            _process_product_batch(db, product_dirs[i : i + batch_size], job, incremental)
+        )
+        logger.info(
+            f"导入批次完成: {job.products_done}/{job.products_total}, "
+            f"{job.products_per_second()} 产品/秒"
+        )
+    return imported
+
+
+def _run_zip_import(db: Session, zip_path: str, job: ImportJob, incremental: bool = True) -> None:
+    with zipfile.ZipFile(zip_path, "r") as zf:
+        import_product_dirs(db, list(_iter_zip_product_dirs(zf)), job, incremental)
+
+
+def _data_dir() -> str:
+    root = get_settings().DATA_DIR
+    if not os.path.isdir(root):
+        raise HTTPException(status_code=404, detail=f"导入目录不存在: {root}")
+    return root
+
+
+async def _receive_zip(file: UploadFile) -> str:
+    """校验文件名并落盘上传的 ZIP，返回临时文件路径"""
+    if not file.filename or not file.filename.endswith((".zip", ".ZIP")):
+        raise HTTPException(status_code=400, detail="仅支持 ZIP 格式")
+    zip_path = await _spool_upload(file)
+    if not zipfile.is_zipfile(zip_path):
+        _remove_file(zip_path)
+        raise HTTPException(status_code=400, detail="ZIP 文件损坏或格式错误")
+    return zip_path
 
 
 @router.post("/zip", response_model=ImportReport, dependencies=[Depends(require_admin)])
 async def import_from_zip(
     db: Annotated[Session, Depends(get_db)],
-    file: UploadFile = File(...),
+    file: Annotated[UploadFile, File()],
+    incremental: bool = Query(True, description="跳过与上次导入相比未变化的产品目录"),
 ) -> ImportReport:
     """
-    批量导入：接收ZIP压缩包，遍历包含 product_details.json 的子目录并导入
+    批量导入（同步）：接收ZIP压缩包，按中央目录逐个处理包含 product_details.json 的目录
+
+    上传内容分块落盘，不整体读入内存；也不解压到磁盘，图片直接从 ZIP 成员流上传。
+    大批量导入请使用 POST /api/import/jobs 在后台执行。
     """
-    import logging
-    logger = logging.getLogger(__name__)
     logger.info(f"接收到ZIP文件上传请求: {file.filename}")
-    
-    if not file.filename or not file.filename.endswith(('.zip', '.ZIP')):
-        raise HTTPException(status_code=400, detail="仅支持 ZIP 格式")
-    
-    # 创建临时目录
-    temp_dir = tempfile.mkdtemp()
+
+    zip_path = await _receive_zip(file)
     try:
-        # 保存上传的文件
-        zip_path = os.path.join(temp_dir, file.filename)
-        with open(zip_path, "wb") as f:
-            content = await file.read()
-            f.write(content)
-        
-        # 解压ZIP
-        extract_dir = os.path.join(temp_dir, "extracted")
-        os.makedirs(extract_dir, exist_ok=True)
-        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            zip_ref.extractall(extract_dir)
-        
-        # 遍历所有子目录，查找包含 product_details.json 的目录
-        total_created = 0
-        total_updated = 0
-        total_images_added = 0
-        total_images_skipped = 0
-        all_errors: List[str] = []
-        
-        for root, dirs, files in os.walk(extract_dir):
-            if _is_product_dir(root):
-                dir_name = os.path.basename(root)
-                created, updated, images_added, images_skipped, errors = _process_product_dir(db, root)
-                total_created += created
-                total_updated += updated
-                total_images_added += images_added
-                total_images_skipped += images_skipped
-                for err in errors:
-                    all_errors.append(f"{dir_name}: {err}")
-        
-        return ImportReport(
-            total=total_created + total_updated,
-            created=total_created,
-            updated=total_updated,
-            errors=all_errors,
-        )
-    
+        job = ImportJob(file.filename)
+        # 导入全程是同步的数据库与 MinIO 调用，放到线程池中执行，不阻塞事件循环
+        await run_in_threadpool(_run_zip_import, db, zip_path, job, incremental)
+        return job.report()
     finally:
-        # 清理临时目录
-        shutil.rmtree(temp_dir, ignore_errors=True)
+        # 清理临时文件
+        _remove_file(zip_path)
+
+
+@router.post(
+    "/jobs",
+    response_model=ImportJobOut,
+    status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(require_admin)],
+)
+async def create_import_job(
+    file: Annotated[UploadFile, File()],
+    incremental: bool = Query(True, description="跳过与上次导入相比未变化的产品目录"),
+) -> ImportJobOut:
+    """
+    批量导入（后台）：上传落盘后立即返回任务，由后台工作线程处理各产品目录。
+    通过 GET /api/import/jobs/{job_id} 查询进度。
+    """
+    zip_path = await _receive_zip(file)
+
+    def run(job: ImportJob) -> None:
+        db = SessionLocal()
+        try:
+            _run_zip_import(db, zip_path, job, incremental)
+        finally:
+            db.close()
+            _remove_file(zip_path)
+
+    job = submit_job(ImportJob(file.filename), run)
+    return job.snapshot()
+
+
+@router.post("/data-dir", response_model=ImportReport, dependencies=[Depends(require_admin)])
+def import_from_data_dir(
+    db: Annotated[Session, Depends(get_db)],
+    incremental: bool = Query(True, description="跳过与上次导入相比未变化的产品目录"),
+) -> ImportReport:
+    """
+    批量导入（同步）：原地扫描服务端 DATA_DIR 下包含 product_details.json 的目录，
+    目录结构与 ZIP 导入相同；不上传、不复制、不解压。大量目录请使用 POST /api/import/data-dir/jobs。
+    """
+    root = _data_dir()
+    job = ImportJob(root)
+    import_product_dirs(db, list(iter_data_dir_products(root)), job, incremental)
+    return job.report()
+
+
+@router.post(
+    "/data-dir/jobs",
+    response_model=ImportJobOut,
+    status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(require_admin)],
+)
+def create_data_dir_import_job(
+    incremental: bool = Query(True, description="跳过与上次导入相比未变化的产品目录"),
+) -> ImportJobOut:
+    """批量导入（后台）：在工作线程中原地扫描并导入 DATA_DIR"""
+    root = _data_dir()
+
+    def run(job: ImportJob) -> None:
+        db = SessionLocal()
+        try:
+            import_product_dirs(db, list(iter_data_dir_products(root)), job, incremental)
+        finally:
+            db.close()
+
+    job = submit_job(ImportJob(root), run)
+    return job.snapshot()
+
+
+@router.get("/jobs", response_model=List[ImportJobOut], dependencies=[Depends(require_admin)])
+async def list_import_jobs() -> list[ImportJobOut]:
+    return [j.snapshot() for j in list_jobs()]
+
+
+@router.get("/jobs/{job_id}", response_model=ImportJobOut, dependencies=[Depends(require_admin)])
+async def get_import_job(job_id: str) -> ImportJobOut:
+    job = get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="任务不存在")
+    return job.snapshot()
+
+
+@router.post(
+    "/jobs/{job_id}/cancel", response_model=ImportJobOut, dependencies=[Depends(require_admin)]
+)
+async def cancel_import_job(job_id: str) -> ImportJobOut:
+    """
+    取消任务：取消标记在批次之间检查，正在处理的批次（最多 IMPORT_BATCH_SIZE 个产品）
+    会完整提交，之后不再处理新的批次
+    """
+    job = get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="任务不存在")
+    job.cancel()
+    return job.snapshot()
@@ -1,31 +1,81 @@
 from __future__ import annotations
 
+import base64
+import csv
+import io
+import json
 import logging
-from typing import Annotated, List, Tuple
+from datetime import date, datetime
+from typing import Annotated, Any, Iterator, Sequence
 
-from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, status, Response
-from sqlalchemy import and_, func, or_, select
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select, and_, case, extract, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, load_only
+from starlette.concurrency import run_in_threadpool
 
-from ..db import get_db
-from ..deps import get_current_user, require_admin
+from .. import search
+from ..cache import VersionedCache, table_change_versions
+from ..config import get_settings
+from ..db import (
+    ReadSessionLocal,
+    ReplicaSessionLocal,
+    get_async_db,
+    get_async_read_db,
+    use_read_replica,
+)
+from ..deps import require_admin
+from ..http_cache import conditional_response
+from ..minio_client import presigned_url
 from ..models import Image, Product
-from ..schemas import Page, PageMeta, ProductCreate, ProductOut, ProductQuery, ProductUpdate
+from ..schemas import (
+    Page,
+    PageMeta,
+    PriceBucket,
+    ProductCreate,
+    ProductFacets,
+    ProductListItem,
+    ProductOut,
+    ProductQuery,
+    ProductUpdate,
+)
+from ..translation_worker import get_translation_worker
 from ..utils import parse_price_to_int, parse_release_date
 
-from datetime import datetime
-
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
-def _apply_filters(query, params: ProductQuery):
+# 可排序的列；游标分页对每一种排序都以 (排序列, id) 定位
+_SORT_COLUMNS = {
+    "created_at": Product.created_at,
+    "price": Product.price_value,
+    "release_date": Product.release_date_value,
+    "product_name": Product.product_name,
+    "image_count": Product.image_count,
+}
+
+
+def _sort_spec(params: ProductQuery) -> tuple[str, Any, bool]:
+    """返回 (排序键, 排序列, 是否降序)；未知的排序键按 created_at"""
+    sort_by = params.sort_by if params.sort_by in _SORT_COLUMNS else "created_at"
+    return sort_by, _SORT_COLUMNS[sort_by], (params.sort_order or "desc").lower() == "desc"
+
+
+def _is_relevance_sort(params: ProductQuery) -> bool:
+    return bool(params.q) and params.sort_by == "relevance"
+
+
+def _apply_where(query: Select, params: ProductQuery) -> Select:
+    if params.q:
+        query = query.where(search.matches(params.q))
     if params.name:
-        query = query.where(Product.product_name.ilike(f"%{params.name}%"))
+        query = query.where(search.contains(Product.product_name, params.name))
     if params.tag:
         query = query.where(Product.product_tag == params.tag)
     if params.series:
-        query = query.where(Product.series.ilike(f"%{params.series}%"))
+        query = query.where(search.contains(Product.series, params.series))
     if params.price_min is not None:
         query = query.where(Product.price_value >= params.price_min)
     if params.price_max is not None:
@@ -40,31 +90,202 @@ def _apply_filters(query, params: ProductQuery):
         query = query.where(Product.created_at <= params.created_to)
     if params.has_images is not None:
         if params.has_images:
-            query = query.where(
-                Product.id.in_(select(Image.product_id).group_by(Image.product_id))
-            )
+            query = query.where(Product.image_count > 0)
         else:
-            query = query.where(
-                ~Product.id.in_(select(Image.product_id).group_by(Image.product_id))
-            )
+            query = query.where(Product.image_count == 0)
+    return query
+
+
+def _apply_filters(query: Select, params: ProductQuery) -> Select:
+    query = _apply_where(query, params)
     # sort
-    sort_col = {
-        "created_at": Product.created_at,
-        "price": Product.price_value,
-        "release_date": Product.release_date_value,
-        "product_name": Product.product_name,
-    }.get(params.sort_by or "created_at", Product.created_at)
-    if (params.sort_order or "desc").lower() == "desc":
+    if _is_relevance_sort(params):
+        return search.order_by_relevance(query, params.q or "")
+    _, sort_col, desc = _sort_spec(params)
+    if desc:
         query = query.order_by(sort_col.desc())
     else:
         query = query.order_by(sort_col.asc())
     return query
 
 
-@router.get("/", response_model=Page)
-async def list_products(
-    db: Annotated[Session, Depends(get_db)],
+def _encode_cursor(sort_by: str, desc: bool, value: Any, last_id: int) -> str:
+    if isinstance(value, (datetime, date)):
+        value = value.isoformat()
+    raw = json.dumps({"s": sort_by, "d": desc, "v": value, "id": last_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str, sort_by: str, desc: bool) -> tuple[Any, int]:
+    """解析游标为 (排序列的值, id)；游标须与当前排序一致"""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if data["s"] != sort_by or data["d"] != desc:
+            raise ValueError
+        value = data["v"]
+        if value is not None:
+            if sort_by == "created_at":
+                value = datetime.fromisoformat(value)
+            elif sort_by == "release_date":
+                value = date.fromisoformat(value)
+            elif sort_by in ("price", "image_count"):
+                value = int(value)
+            else:
+                value = str(value)
+        return value, int(data["id"])
+    except Exception:
+        raise HTTPException(status_code=400, detail="游标无效或与当前排序不一致") from None
+
+
+def _apply_keyset(query: Select, params: ProductQuery, cursor: str | None) -> Select:
+    """
+    游标分页：按 (排序列, id) 排序并从游标之后开始，代价与页深无关
+
+    NULL 一律排在最后（显式 NULLS LAST，SQLite 与 Postgres 默认的 NULL 顺序不同），
+    id 的方向与排序方向一致，保证顺序全序且稳定。非空列不加 NULLS LAST，
+    Postgres 才能反向扫描普通索引。
+    """
+    if _is_relevance_sort(params):
+        raise HTTPException(status_code=400, detail="相关度排序不支持游标分页")
+    query = _apply_where(query, params)
+    sort_by, sort_col, desc = _sort_spec(params)
+    id_after = (lambda v: Product.id < v) if desc else (lambda v: Product.id > v)
+    if cursor:
+        value, last_id = _decode_cursor(cursor, sort_by, desc)
+        if value is None:
+            query = query.where(sort_col.is_(None), id_after(last_id))
+        else:
+            beyond = sort_col < value if desc else sort_col > value
+            query = query.where(
+                or_(beyond, and_(sort_col == value, id_after(last_id)), sort_col.is_(None))
+            )
+    if desc:
+        order = sort_col.desc().nulls_last() if sort_col.nullable else sort_col.desc()
+        return query.order_by(order, Product.id.desc())
+    order = sort_col.asc().nulls_last() if sort_col.nullable else sort_col.asc()
+    return query.order_by(order, Product.id.asc())
+
+
+_COUNT_TABLES = ("products", "images")
+_count_cache: VersionedCache | None = None
+
+
+def _get_count_cache() -> VersionedCache:
+    global _count_cache
+    if _count_cache is None:
+        settings = get_settings()
+        _count_cache = VersionedCache(
+            settings.PRODUCT_COUNT_CACHE_SIZE, settings.PRODUCT_COUNT_CACHE_TTL
+        )
+    return _count_cache
+
+
+def _filter_signature(params: ProductQuery) -> str:
+    """规范化的筛选条件签名：只包含影响总数的字段，与排序、分页无关"""
+    data = params.model_dump(mode="json", exclude={"sort_by", "sort_order", "page", "page_size"})
+    return json.dumps(data, sort_keys=True, ensure_ascii=False)
+
+
+def _exact_count(db: Session, params: ProductQuery) -> int:
+    return db.execute(_apply_where(select(func.count()).select_from(Product), params)).scalar_one()
+
+
+def _cached_count(db: Session, params: ProductQuery) -> int:
+    """
+    按筛选签名缓存总数；产品或图片表有写入提交后失效
+
+    版本取自数据库的 change_versions（与 ETag 同源），与计数在同一事务中读取：
+    其他进程、绕过 ORM 的写入以及副本上回放的写入同样使缓存失效
+    """
+    cache = _get_count_cache()
+    key = _filter_signature(params)
+    versions = table_change_versions(db, *_COUNT_TABLES)
+    total = cache.get(key, versions)
+    if total is None:
+        total = _exact_count(db, params)
+        cache.set(key, versions, total)
+    return total
+
+
+def _estimated_count(db: Session, params: ProductQuery) -> int | None:
+    """Postgres 查询计划的行数估算（不执行查询）；其他数据库返回 None"""
+    bind = db.get_bind()
+    if bind.dialect.name != "postgresql":
+        return None
+    compiled = _apply_where(select(Product.id), params).compile(dialect=bind.dialect)
+    plan = (
+        db.connection()
+        .exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params)
+        .scalar_one()
+    )
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+# 列表可选的字段（均为 products 的列）；默认不返回大字段
+_LIST_FIELDS = tuple(f for f in ProductListItem.model_fields if f != "cover_url")
+_HEAVY_FIELDS = {"article_content"}
+_DEFAULT_LIST_FIELDS = tuple(f for f in _LIST_FIELDS if f not in _HEAVY_FIELDS)
+
+
+def _parse_fields(fields: str | None) -> list[str]:
+    """解析 fields=a,b,c；id 总是返回"""
+    if not fields:
+        return list(_DEFAULT_LIST_FIELDS)
+    selected = ["id"]
+    for name in (f.strip() for f in fields.split(",")):
+        if not name or name in selected:
+            continue
+        if name not in _LIST_FIELDS:
+            raise HTTPException(status_code=400, detail=f"未知字段: {name}")
+        selected.append(name)
+    return selected
+
+
+def _load_columns(fields: list[str], params: ProductQuery, include_cover: bool) -> Any:
+    """只读取需要的列：返回字段、游标用的排序列、头像 id；其余列不会从数据库读取"""
+    names = set(fields)
+    if not _is_relevance_sort(params):
+        names.add(_sort_spec(params)[1].key)
+    if include_cover:
+        names.add("cover_image_id")
+    return load_only(*[getattr(Product, n) for n in sorted(names)], raiseload=True)
+
+
+async def _to_out(
+    db: AsyncSession, items: Sequence[Product], fields: list[str], include_cover: bool
+) -> list[ProductListItem]:
+    """转换为只含所选字段的列表项；include_cover 时一次 IN 查询取出本页所有头像，并填入公开 URL"""
+    out = [ProductListItem(**{f: getattr(i, f) for f in fields}) for i in items]
+    if not include_cover:
+        return out
+    cover_ids = [i.cover_image_id for i in items if i.cover_image_id is not None]
+    paths: dict[int | None, str | None] = {}
+    if cover_ids:
+        paths = dict(
+            (await db.execute(select(Image.id, Image.minio_path).where(Image.id.in_(cover_ids))))
+            .tuples()
+            .all()
+        )
+    for o, item in zip(out, items):
+        path = paths.get(item.cover_image_id)
+        o.cover_url = presigned_url(path) if path else None
+    return out
+
+
+def _parse_dt(v: str | None) -> datetime | None:
+    if not v:
+        return None
+    try:
+        return datetime.fromisoformat(v)
+    except Exception:
+        return None
+
+
+def product_filters(
     name: str | None = None,
+    q: str | None = Query(None, description="关键词：在名称、中文名、系列中搜索，默认按相关度排序"),
     tag: str | None = None,
     series: str | None = None,
     price_min: int | None = None,
@@ -74,56 +295,298 @@ async def list_products(
     created_from: str | None = None,
     created_to: str | None = None,
     has_images: bool | None = None,
-    sort_by: str | None = "created_at",
-    sort_order: str | None = "desc",
-    page: int = 1,
-    page_size: int = 20,
-) -> Page:
-    def parse_dt(v: str | None):
-        if not v:
-            return None
-        try:
-            return datetime.fromisoformat(v)
-        except Exception:
-            return None
-
-    params = ProductQuery(
+) -> ProductQuery:
+    """列表与分面共用的筛选参数"""
+    return ProductQuery(
         name=name,
+        q=(q or "").strip() or None,
         tag=tag,
         series=series,
         price_min=price_min,
         price_max=price_max,
         release_from=parse_release_date(release_from),
         release_to=parse_release_date(release_to),
-        created_from=parse_dt(created_from),
-        created_to=parse_dt(created_to),
+        created_from=_parse_dt(created_from),
+        created_to=_parse_dt(created_to),
         has_images=has_images,
-        sort_by=sort_by,
-        sort_order=sort_order,
-        page=page,
-        page_size=page_size,
     )
 
+
+@router.get("/", response_model=Page, response_model_exclude_unset=True)
+async def list_products(
+    request: Request,
+    response: Response,
+    db: Annotated[AsyncSession, Depends(get_async_read_db)],
+    filters: Annotated[ProductQuery, Depends(product_filters)],
+    sort_by: str | None = Query(
+        None,
+        description="created_at / price / release_date / product_name / image_count / "
+        "relevance（需 q）；"
+        "默认有 q 且非游标分页时按相关度，否则按 created_at",
+    ),
+    sort_order: str | None = "desc",
+    page: int = 1,
+    page_size: int = 20,
+    use_cursor: bool = Query(False, description="游标分页：按 meta.next_cursor 翻页，不返回 total"),
+    cursor: str | None = Query(None, description="上一页返回的 next_cursor；提供时即为游标分页"),
+    include_total: bool = Query(True, description="为 false 时不计算总数"),
+    include_cover: bool = Query(False, description="在每个产品中返回头像的公开 URL（cover_url）"),
+    fields: str | None = Query(
+        None,
+        description="返回的字段，逗号分隔（id 总是返回）；默认为除 article_content 外的所有字段",
+    ),
+    count_mode: str | None = Query(
+        None,
+        pattern="^(exact|cached|estimated)$",
+        description="总数计算方式：exact 精确计数；cached 按筛选条件缓存，写入后失效；"
+        "estimated 使用 Postgres 查询计划估算（其他数据库按 cached）",
+    ),
+) -> Page | Response:
+    # 数据未变化时直接返回 304，不执行分页与计数查询
+    not_modified = await conditional_response(
+        request,
+        response,
+        db,
+        ("products", "images"),
+        "products",
+        sorted(request.query_params.multi_items()),
+    )
+    if not_modified is not None:
+        return not_modified
+
+    params = filters.model_copy(
+        update={
+            "sort_by": sort_by
+            or ("relevance" if filters.q and not (use_cursor or cursor) else "created_at"),
+            "sort_order": sort_order,
+            "page": page,
+            "page_size": page_size,
+        }
+    )
+
+    selected = _parse_fields(fields)
+    columns = _load_columns(selected, params, include_cover)
+
+    if use_cursor or cursor:
+        limit = max(params.page_size, 1)
+        query = _apply_keyset(select(Product).options(columns), params, cursor)
+        rows = (await db.execute(query.limit(limit + 1))).scalars().all()
+        items = rows[:limit]
+        next_cursor = None
+        if len(rows) > limit:
+            sort_by, sort_col, desc = _sort_spec(params)
+            last = items[-1]
+            next_cursor = _encode_cursor(sort_by, desc, getattr(last, sort_col.key), last.id)
+        return Page(
+            items=await _to_out(db, items, selected, include_cover),
+            meta=PageMeta(
+                page=page,
+                page_size=page_size,
+                total=None,
+                total_estimated=False,
+                next_cursor=next_cursor,
+            ),
+        )
+
     # base selectable
-    base = select(Product)
+    base = select(Product).options(columns)
     base = _apply_filters(base, params)
 
-    # count
-    total = db.execute(
-        _apply_filters(select(func.count()).select_from(Product), params)
-    ).scalar_one()
+    # count：计数函数与后台同步代码共用，通过 run_sync 在异步会话的连接上执行
+    total: int | None = None
+    estimated = False
+    if include_total:
+        mode = count_mode or get_settings().PRODUCT_COUNT_MODE
+        if mode == "estimated":
+            total = await db.run_sync(_estimated_count, params)
+            estimated = total is not None
+        if total is None:
+            count = _cached_count if mode in ("cached", "estimated") else _exact_count
+            total = await db.run_sync(count, params)
 
     # pagination
     offset = max((params.page - 1) * params.page_size, 0)
-    items = db.execute(base.offset(offset).limit(params.page_size)).scalars().all()
+    items = (await db.execute(base.offset(offset).limit(params.page_size))).scalars().all()
+
+    return Page(
+        items=await _to_out(db, items, selected, include_cover),
+        meta=PageMeta(
+            page=page, page_size=page_size, total=total, total_estimated=estimated, next_cursor=None
+        ),
+    )
+
+
+# 价格分面的区间边界（日元）
+PRICE_BUCKET_EDGES = (1000, 3000, 5000, 10000, 20000)
+_facet_cache: VersionedCache | None = None
+
+
+def _get_facet_cache() -> VersionedCache:
+    global _facet_cache
+    if _facet_cache is None:
+        settings = get_settings()
+        _facet_cache = VersionedCache(
+            settings.PRODUCT_COUNT_CACHE_SIZE, settings.PRODUCT_COUNT_CACHE_TTL
+        )
+    return _facet_cache
+
+
+def _grouped_counts(db: Session, key: Any, params: ProductQuery) -> list[tuple[Any, int]]:
+    query = select(key, func.count()).select_from(Product)
+    return list(db.execute(_apply_where(query, params).group_by(key)).tuples())
+
+
+def _compute_facets(db: Session, params: ProductQuery) -> ProductFacets:
+    """每个维度一条 GROUP BY 查询；该维度自身的筛选条件不参与计数，便于展示可切换的选项"""
+    by_tag = _grouped_counts(db, Product.product_tag, params.model_copy(update={"tag": None}))
+    by_series = _grouped_counts(db, Product.series, params.model_copy(update={"series": None}))
+
+    bucket = case(
+        (Product.price_value.is_(None), -1),
+        *[(Product.price_value < edge, i) for i, edge in enumerate(PRICE_BUCKET_EDGES)],
+        else_=len(PRICE_BUCKET_EDGES),
+    )
+    price_counts = dict(
+        _grouped_counts(
+            db, bucket, params.model_copy(update={"price_min": None, "price_max": None})
+        )
+    )
+    bounds = [None, *PRICE_BUCKET_EDGES, None]
+    price_buckets = [
+        PriceBucket(min=bounds[i], max=bounds[i + 1], count=price_counts.get(i, 0))
+        for i in range(len(bounds) - 1)
+    ]
+
+    year = extract("year", Product.release_date_value)
+    release_years = _grouped_counts(
+        db, year, params.model_copy(update={"release_from": None, "release_to": None})
+    )
+
+    return ProductFacets(
+        total=_exact_count(db, params),
+        by_tag={k or "": v for k, v in by_tag},
+        by_series={k or "": v for k, v in by_series},
+        price_buckets=price_buckets,
+        price_unknown=price_counts.get(-1, 0),
+        release_years={str(int(k)) if k is not None else "": v for k, v in release_years},
+    )
+
+
+def _cached_facets(db: Session, params: ProductQuery) -> ProductFacets:
+    """按筛选签名缓存分面计数，版本取自 change_versions（与 ETag 同源），与计数在同一事务中读取"""
+    cache = _get_facet_cache()
+    key = _filter_signature(params)
+    versions = table_change_versions(db, *_COUNT_TABLES)
+    facets = cache.get(key, versions)
+    if facets is None:
+        facets = _compute_facets(db, params)
+        cache.set(key, versions, facets)
+    return facets
+
+
+@router.get("/facets", response_model=ProductFacets)
+async def product_facets(
+    request: Request,
+    response: Response,
+    db: Annotated[AsyncSession, Depends(get_async_read_db)],
+    params: Annotated[ProductQuery, Depends(product_filters)],
+) -> ProductFacets | Response:
+    """
+    分面计数：与 GET /api/products 相同的筛选参数，一次返回标签、系列、价格区间、发售年份的计数
+
+    结果按筛选签名缓存，产品或图片表有写入后失效。
+    """
+    not_modified = await conditional_response(
+        request,
+        response,
+        db,
+        ("products", "images"),
+        "facets",
+        sorted(request.query_params.multi_items()),
+    )
+    if not_modified is not None:
+        return not_modified
+    return await db.run_sync(_cached_facets, params)
+
+
+# 导出时每次从游标取出的行数，也是每次写出的块大小
+EXPORT_BATCH_SIZE = 1000
+
+
+def _export_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
 
-    return Page(items=[ProductOut.model_validate(i) for i in items], meta=PageMeta(page=page, page_size=page_size, total=total))
+
+def _iter_export(
+    params: ProductQuery, fields: list[str], fmt: str, replica: bool = False
+) -> Iterator[str]:
+    """
+    按 id 顺序流式读取并逐块输出；使用独立的只读会话（请求的会话在响应开始后即关闭），
+    replica 时读副本
+
+    yield_per 让 Postgres 使用服务端游标、SQLite 逐批读取游标，内存占用与导出行数无关。
+    """
+    db = ReplicaSessionLocal() if replica and ReplicaSessionLocal else ReadSessionLocal()
+    try:
+        query = _apply_where(select(*[getattr(Product, f) for f in fields]), params).order_by(
+            Product.id
+        )
+        result = db.execute(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        if fmt == "csv":
+            buf = io.StringIO()
+            writer = csv.writer(buf)
+            # BOM：Excel 按 UTF-8 打开中日文
+            buf.write("\ufeff")
+            writer.writerow(fields)
+            yield buf.getvalue()
+        for rows in result.partitions():
+            if fmt == "csv":
+                buf = io.StringIO()
+                writer = csv.writer(buf)
+                writer.writerows([[_export_value(v) for v in row] for row in rows])
+                yield buf.getvalue()
+            else:
+                yield "".join(
+                    json.dumps(
+                        {f: _export_value(v) for f, v in zip(fields, row)}, ensure_ascii=False
+                    )
+                    + "\n"
+                    for row in rows
+                )
+    finally:
+        db.close()
+
+
+@router.get("/export")
+async def export_products(
+    request: Request,
+    params: Annotated[ProductQuery, Depends(product_filters)],
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="ndjson 或 csv"),
+    fields: str | None = Query(
+        None,
+        description="导出的字段，逗号分隔（id 总是导出）；默认为除 article_content 外的所有字段",
+    ),
+) -> StreamingResponse:
+    """流式导出符合筛选条件的全部产品（按 id 排序），不计数、不分页"""
+    selected = _parse_fields(fields)
+    media_type = "text/csv; charset=utf-8" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        _iter_export(params, selected, format, replica=await use_read_replica(request)),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="products.{format}"'},
+    )
 
 
 @router.post("/", response_model=ProductOut, dependencies=[Depends(require_admin)])
-async def create_product(payload: ProductCreate, db: Annotated[Session, Depends(get_db)]) -> ProductOut:
+async def create_product(
+    payload: ProductCreate, db: Annotated[AsyncSession, Depends(get_async_db)]
+) -> ProductOut:
     # uniqueness by url
-    exists = db.query(Product).filter(Product.url == payload.url).one_or_none()
+    exists = (
+        await db.execute(select(Product).where(Product.url == payload.url))
+    ).scalar_one_or_none()
     if exists:
         raise HTTPException(status_code=400, detail="URL 已存在")
     entity = Product(
@@ -138,26 +601,43 @@ async def create_product(payload: ProductCreate, db: Annotated[Session, Depends(
         release_date_value=parse_release_date(payload.release_date),
     )
     db.add(entity)
-    db.commit()
-    db.refresh(entity)
+    await db.commit()
+    await db.refresh(entity)
+    if entity.product_name:
+        # 中文名由后台补全
+        get_translation_worker().enqueue([entity.id])
     return ProductOut.model_validate(entity)
 
 
 @router.get("/{product_id}", response_model=ProductOut)
-async def get_product(product_id: int, db: Annotated[Session, Depends(get_db)]) -> ProductOut:
-    entity = db.get(Product, product_id)
+async def get_product(
+    product_id: int,
+    request: Request,
+    response: Response,
+    db: Annotated[AsyncSession, Depends(get_async_read_db)],
+) -> ProductOut | Response:
+    not_modified = await conditional_response(
+        request, response, db, ("products",), "product", product_id
+    )
+    if not_modified is not None:
+        return not_modified
+    entity = await db.get(Product, product_id)
     if not entity:
         raise HTTPException(status_code=404, detail="未找到")
     return ProductOut.model_validate(entity)
 
 
 @router.put("/{product_id}", response_model=ProductOut, dependencies=[Depends(require_admin)])
-async def update_product(product_id: int, payload: ProductUpdate, db: Annotated[Session, Depends(get_db)]) -> ProductOut:
-    entity = db.get(Product, product_id)
+async def update_product(
+    product_id: int, payload: ProductUpdate, db: Annotated[AsyncSession, Depends(get_async_db)]
+) -> ProductOut:
+    entity = await db.get(Product, product_id)
     if not entity:
         raise HTTPException(status_code=404, detail="未找到")
     if payload.url and payload.url != entity.url:
-        conflict = db.query(Product).filter(Product.url == payload.url).one_or_none()
+        conflict = (
+            await db.execute(select(Product).where(Product.url == payload.url))
+        ).scalar_one_or_none()
         if conflict:
             raise HTTPException(status_code=400, detail="URL 已存在")
         entity.url = payload.url
@@ -178,41 +658,51 @@ async def update_product(product_id: int, payload: ProductUpdate, db: Annotated[
     entity.release_date_value = parse_release_date(entity.release_date)
 
     db.add(entity)
-    db.commit()
-    db.refresh(entity)
+    await db.commit()
+    await db.refresh(entity)
     return ProductOut.model_validate(entity)
 
 
-@router.delete("/{product_id}", status_code=204, response_class=Response, dependencies=[Depends(require_admin)])
-async def delete_product(product_id: int, db: Annotated[Session, Depends(get_db)]) -> Response:
-    entity = db.get(Product, product_id)
+@router.delete(
+    "/{product_id}", status_code=204, response_class=Response, dependencies=[Depends(require_admin)]
+)
+async def delete_product(
+    product_id: int, db: Annotated[AsyncSession, Depends(get_async_db)]
+) -> Response:
+    entity = await db.get(Product, product_id)
     if not entity:
         raise HTTPException(status_code=404, detail="未找到")
-    
+
     logger.info(f"开始删除产品 #{product_id}: {entity.product_name}")
-    
+
     # 删除关联的图片记录和MinIO文件
     from ..minio_client import remove_object
-    images = db.query(Image).filter(Image.product_id == product_id).all()
-    logger.info(f"找到 {len(images)} 张图片需要删除")
-    for img in images:
-        if img.minio_path:
-            try:
-                remove_object(img.minio_path)
-                logger.info(f"已删除MinIO文件: {img.minio_path}")
-            except Exception as e:
-                logger.warning(f"删除MinIO文件失败: {img.minio_path}, 错误: {e}")
-    
-    # 删除产品（会自动级联删除images记录）
-    db.delete(entity)
-    db.commit()
+
+    paths = [
+        path
+        for path in (
+            await db.execute(select(Image.minio_path).where(Image.product_id == product_id))
+        ).scalars()
+        if path
+    ]
+    logger.info(f"找到 {len(paths)} 张图片需要删除")
+
+    # 删除产品（会自动级联删除images记录）；先提交再删除 MinIO 文件，网络请求期间不占用写连接
+    await db.delete(entity)
+    await db.commit()
+    for path in paths:
+        try:
+            await run_in_threadpool(remove_object, path)
+            logger.info(f"已删除MinIO文件: {path}")
+        except Exception as e:
+            logger.warning(f"删除MinIO文件失败: {path}, 错误: {e}")
     logger.info(f"产品 #{product_id} 已从数据库删除")
-    
+
     # 验证删除
-    verify = db.get(Product, product_id)
+    verify = await db.get(Product, product_id)
     if verify:
         logger.error(f"警告：产品 #{product_id} 删除后仍然存在！")
     else:
         logger.info(f"确认：产品 #{product_id} 已完全删除")
-    
+
     return Response(status_code=204)
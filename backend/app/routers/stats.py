@@ -1,14 +1,19 @@
 from __future__ import annotations
 
-from typing import Annotated, List
+from typing import Annotated
 
-from fastapi import APIRouter, Depends
-from sqlalchemy import func, select
+from fastapi import APIRouter, Depends, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from ..db import get_db
-from ..models import Image, Product
-from ..schemas import ProductOut, StatsOverview
+from ..db import get_async_read_db, get_db
+from ..deps import require_admin
+from ..http_cache import conditional_response
+from ..models import Product
+from ..schemas import ProductOut, StatsOverview, StatsReconcileResult, TranslationCacheStats
+from ..stats import counter_summary, live_summary, reconcile_stats
+from ..translation import translation_cache_stats
 
 router = APIRouter()
 
@@ -19,19 +24,52 @@ async def healthz() -> dict:
 
 
 @router.get("/stats/overview", response_model=StatsOverview)
-async def stats_overview(db: Annotated[Session, Depends(get_db)], top: int = 10) -> StatsOverview:
-    total = db.execute(select(func.count()).select_from(Product)).scalar_one()
-    with_img = db.execute(select(func.count(func.distinct(Image.product_id)))).scalar_one()
-    by_tag_rows = db.execute(select(Product.product_tag, func.count()).group_by(Product.product_tag)).all()
-    by_series_rows = db.execute(select(Product.series, func.count()).group_by(Product.series)).all()
+async def stats_overview(
+    request: Request,
+    response: Response,
+    db: Annotated[AsyncSession, Depends(get_async_read_db)],
+    top: int = 10,
+    fresh: bool = False,
+) -> StatsOverview | Response:
+    """计数默认读取触发器维护的汇总表；fresh=true 时直接在产品表上聚合（用于核对）"""
+    not_modified = await conditional_response(
+        request, response, db, ("products", "images", "stats_counters"), "overview", top, fresh
+    )
+    if not_modified is not None:
+        return not_modified
+    summary = await db.run_sync(live_summary if fresh else counter_summary)
     recent_items = (
-        db.query(Product).order_by(Product.created_at.desc()).limit(top).all()
+        (await db.execute(select(Product).order_by(Product.created_at.desc()).limit(top)))
+        .scalars()
+        .all()
     )
     return StatsOverview(
-        products_total=total,
-        by_tag={k or "": v for k, v in by_tag_rows},
-        by_series={k or "": v for k, v in by_series_rows},
-        with_images=with_img,
-        without_images=max(total - with_img, 0),
+        products_total=summary.total,
+        by_tag=summary.by_tag,
+        by_series=summary.by_series,
+        with_images=summary.with_images,
+        without_images=max(summary.total - summary.with_images, 0),
         recent=[ProductOut.model_validate(i) for i in recent_items],
     )
+
+
+@router.post(
+    "/stats/reconcile",
+    response_model=StatsReconcileResult,
+    dependencies=[Depends(require_admin)],
+)
+def reconcile_overview(db: Annotated[Session, Depends(get_db)]) -> StatsReconcileResult:
+    """立即按实际数据核对统计汇总表，返回修正的计数项数"""
+    corrected = reconcile_stats(db)
+    db.commit()
+    return StatsReconcileResult(corrected=corrected)
+
+
+@router.get(
+    "/stats/translation-cache",
+    response_model=TranslationCacheStats,
+    dependencies=[Depends(require_admin)],
+)
+async def translation_cache_overview() -> TranslationCacheStats:
+    """翻译缓存命中情况（当前进程自启动起累计）"""
+    return TranslationCacheStats(**translation_cache_stats())
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, status
+
+from ..deps import require_admin
+from ..schemas import TranslationBacklog, TranslationCacheStats
+from ..translation import translation_cache_stats
+from ..translation_worker import count_pending_translations, get_translation_worker
+
+router = APIRouter()
+
+
+def _backlog() -> TranslationBacklog:
+    worker = get_translation_worker()
+    return TranslationBacklog(
+        pending_products=count_pending_translations(),
+        queued=worker.queued,
+        backfill_running=worker.backfill_running,
+        cache=TranslationCacheStats(**translation_cache_stats()),
+    )
+
+
+@router.get("/backlog", response_model=TranslationBacklog, dependencies=[Depends(require_admin)])
+def translation_backlog() -> TranslationBacklog:
+    """待补全翻译的积压情况（同步计数查询，在线程池中执行）"""
+    return _backlog()
+
+
+@router.post(
+    "/backfill",
+    response_model=TranslationBacklog,
+    status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(require_admin)],
+)
+def trigger_backfill() -> TranslationBacklog:
+    """后台补全所有 product_name_cn 为空的产品"""
+    get_translation_worker().request_backfill()
+    return _backlog()
@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 from datetime import date, datetime
-from typing import List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -30,14 +29,14 @@ class UserOut(BaseModel):
 
 # Products
 class ProductBase(BaseModel):
-    product_name: Optional[str] = None
-    product_name_cn: Optional[str] = None
-    price: Optional[str] = None
-    release_date: Optional[str] = None
-    article_content: Optional[str] = None
+    product_name: str | None = None
+    product_name_cn: str | None = None
+    price: str | None = None
+    release_date: str | None = None
+    article_content: str | None = None
     url: str
-    product_tag: Optional[str] = None
-    series: Optional[str] = None
+    product_tag: str | None = None
+    series: str | None = None
 
 
 class ProductCreate(ProductBase):
@@ -45,56 +44,83 @@ class ProductCreate(ProductBase):
 
 
 class ProductUpdate(BaseModel):
-    product_name: Optional[str] = None
-    product_name_cn: Optional[str] = None
-    price: Optional[str] = None
-    release_date: Optional[str] = None
-    article_content: Optional[str] = None
-    url: Optional[str] = None
-    product_tag: Optional[str] = None
-    series: Optional[str] = None
+    product_name: str | None = None
+    product_name_cn: str | None = None
+    price: str | None = None
+    release_date: str | None = None
+    article_content: str | None = None
+    url: str | None = None
+    product_tag: str | None = None
+    series: str | None = None
 
 
 class ProductOut(BaseModel):
     id: int
-    product_name: Optional[str]
-    product_name_cn: Optional[str]
-    price: Optional[str]
-    release_date: Optional[str]
-    article_content: Optional[str]
+    product_name: str | None
+    product_name_cn: str | None
+    price: str | None
+    release_date: str | None
+    article_content: str | None
     url: str
-    product_tag: Optional[str]
-    series: Optional[str]
+    product_tag: str | None
+    series: str | None
     created_at: datetime
+    image_count: int = 0
+    cover_image_id: int | None = None
 
     class Config:
         from_attributes = True
 
 
+class ProductListItem(BaseModel):
+    """列表项：只包含所选字段（fields=），未选的字段不出现在响应中；默认不含 article_content"""
+
+    id: int
+    product_name: str | None = None
+    product_name_cn: str | None = None
+    price: str | None = None
+    release_date: str | None = None
+    article_content: str | None = None
+    url: str | None = None
+    product_tag: str | None = None
+    series: str | None = None
+    created_at: datetime | None = None
+    image_count: int | None = None
+    cover_image_id: int | None = None
+    # 仅在 include_cover=true 时填充
+    cover_url: str | None = None
+
+
 class PageMeta(BaseModel):
     page: int
     page_size: int
-    total: int
+    # 游标分页或 include_total=false 时不计算总数
+    total: int | None = None
+    total_estimated: bool = Field(default=False, description="total 是否为查询计划的估算值")
+    next_cursor: str | None = Field(
+        default=None, description="游标分页时下一页的游标，没有下一页时为空"
+    )
 
 
 class Page(BaseModel):
-    items: List[ProductOut]
+    items: list[ProductListItem]
     meta: PageMeta
 
 
 class ProductQuery(BaseModel):
-    name: Optional[str] = Field(default=None, description="名称包含")
-    price_min: Optional[int] = None
-    price_max: Optional[int] = None
-    release_from: Optional[date] = None
-    release_to: Optional[date] = None
-    tag: Optional[str] = None
-    series: Optional[str] = None
-    created_from: Optional[datetime] = None
-    created_to: Optional[datetime] = None
-    has_images: Optional[bool] = None
-    sort_by: Optional[str] = Field(default="created_at")
-    sort_order: Optional[str] = Field(default="desc")
+    name: str | None = Field(default=None, description="名称包含")
+    q: str | None = Field(default=None, description="关键词：名称、中文名或系列包含")
+    price_min: int | None = None
+    price_max: int | None = None
+    release_from: date | None = None
+    release_to: date | None = None
+    tag: str | None = None
+    series: str | None = None
+    created_from: datetime | None = None
+    created_to: datetime | None = None
+    has_images: bool | None = None
+    sort_by: str | None = Field(default="created_at")
+    sort_order: str | None = Field(default="desc")
     page: int = 1
     page_size: int = 20
 
@@ -104,8 +130,8 @@ class ImageOut(BaseModel):
     id: int
     product_id: int
     image_filename: str
-    image_hash: Optional[str]
-    minio_path: Optional[str]
+    image_hash: str | None
+    minio_path: str | None
     is_cover: bool
     created_at: datetime
 
@@ -119,27 +145,92 @@ class PresignResponse(BaseModel):
 
 # Import
 class ImportItem(BaseModel):
-    product_name: Optional[str] = None
-    image_links: Optional[List[str]] = None
-    product_info: Optional[dict] = None
-    article_content: Optional[str] = None
+    product_name: str | None = None
+    image_links: list[str] | None = None
+    product_info: dict | None = None
+    article_content: str | None = None
     url: str
-    product_tag: Optional[str] = None
-    series: Optional[str] = None
+    product_tag: str | None = None
+    series: str | None = None
 
 
 class ImportReport(BaseModel):
     total: int
     created: int
     updated: int
-    errors: List[str]
+    images_added: int = 0
+    images_skipped: int = 0
+    unchanged: int = Field(default=0, description="与上次导入相比未变化而跳过的产品目录数")
+    dedupe_queries_saved: int = Field(
+        default=0, description="批量/任务内去重相比逐图查询节省的数据库查询次数"
+    )
+    elapsed_seconds: float | None = None
+    products_per_second: float | None = Field(default=None, description="导入吞吐量（产品/秒）")
+    errors: list[str]
+
+
+class ImportJobOut(BaseModel):
+    id: str
+    filename: str | None
+    status: str = Field(description="pending / running / completed / failed / cancelled")
+    products_total: int
+    products_done: int
+    created: int
+    updated: int
+    images_added: int
+    images_skipped: int
+    unchanged: int
+    dedupe_queries_saved: int
+    errors: list[str]
+    eta_seconds: float | None = Field(default=None, description="预计剩余秒数")
+    elapsed_seconds: float | None = None
+    products_per_second: float | None = Field(default=None, description="导入吞吐量（产品/秒）")
+    created_at: datetime
+    started_at: datetime | None
+    finished_at: datetime | None
 
 
 # Stats
+class TranslationCacheStats(BaseModel):
+    memory_hits: int
+    db_hits: int
+    misses: int
+    api_failures: int
+    memory_size: int
+
+
+class TranslationBacklog(BaseModel):
+    pending_products: int = Field(description="有名称但 product_name_cn 为空的产品数")
+    queued: int = Field(description="后台队列中等待处理的产品 id 数")
+    backfill_running: bool
+    cache: TranslationCacheStats
+
+
+class PriceBucket(BaseModel):
+    min: int | None = Field(default=None, description="下限（含），为空表示无下限")
+    max: int | None = Field(default=None, description="上限（不含），为空表示无上限")
+    count: int
+
+
+class ProductFacets(BaseModel):
+    """分面计数：每个维度的计数不应用该维度自身的筛选条件，其余条件与列表一致"""
+
+    total: int
+    by_tag: dict[str, int]
+    by_series: dict[str, int]
+    price_buckets: list[PriceBucket]
+    price_unknown: int
+    release_years: dict[str, int]
+
+
 class StatsOverview(BaseModel):
     products_total: int
     by_tag: dict
     by_series: dict
     with_images: int
     without_images: int
-    recent: List[ProductOut]
+    recent: list[ProductOut]
+
+
+class StatsReconcileResult(BaseModel):
+    corrected: int
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from typing import Any
+
+from sqlalchemy import column, func, literal_column, or_, select, table
+from sqlalchemy.sql import Select
+
+from .db import dialect_name
+from .models import Product
+
+# SQLite：外部内容 FTS5 表（trigram 分词），由触发器与 products 同步，见迁移 0006
+FTS_TABLE = "products_fts"
+# trigram 分词/索引至少需要 3 个字符，更短的关键词回退到 ILIKE
+MIN_INDEXED_LENGTH = 3
+
+SEARCH_COLUMNS = (Product.product_name, Product.product_name_cn, Product.series)
+
+_fts = table(FTS_TABLE, column("rowid"), column("rank"))
+
+
+def _fts_phrase(term: str) -> str:
+    """把关键词转为 FTS5 短语，避免其中的运算符被解析"""
+    return '"' + term.replace('"', '""') + '"'
+
+
+def _fts_match(expr: str) -> Any:
+    return literal_column(FTS_TABLE).op("MATCH")(expr)
+
+
+def _use_fts(term: str) -> bool:
+    return dialect_name() == "sqlite" and len(term) >= MIN_INDEXED_LENGTH
+
+
+def contains(col: Any, term: str) -> Any:
+    """
+    单列包含关键词（不区分大小写）。SQLite 上走 FTS5 列过滤，Postgres 的 ILIKE 由 pg_trgm 索引服务
+    """
+    if _use_fts(term):
+        return Product.id.in_(
+            select(_fts.c.rowid).where(_fts_match(f"{col.key} : {_fts_phrase(term)}"))
+        )
+    return col.ilike(f"%{term}%")
+
+
+def matches(term: str) -> Any:
+    """名称、中文名或系列任一包含关键词"""
+    if _use_fts(term):
+        return Product.id.in_(select(_fts.c.rowid).where(_fts_match(_fts_phrase(term))))
+    return or_(*[col.ilike(f"%{term}%") for col in SEARCH_COLUMNS])
+
+
+def order_by_relevance(query: Select, term: str) -> Select:
+    """
+    按相关度排序，id 作为次序键：SQLite 用 FTS5 的 bm25（rank 越小越相关），
+    Postgres 用 pg_trgm 的 word_similarity；SQLite 上过短的关键词没有评分，按新建时间排序
+    """
+    dialect = dialect_name()
+    if _use_fts(term):
+        ranked = select(_fts.c.rowid, _fts.c.rank).where(_fts_match(_fts_phrase(term))).subquery()
+        return query.join(ranked, ranked.c.rowid == Product.id).order_by(
+            ranked.c.rank, Product.id.desc()
+        )
+    if dialect == "postgresql":
+        score = func.greatest(
+            *[func.word_similarity(term, func.coalesce(col, "")) for col in SEARCH_COLUMNS]
+        )
+        return query.order_by(score.desc(), Product.id.desc())
+    return query.order_by(Product.created_at.desc(), Product.id.desc())
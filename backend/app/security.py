@@ -1,12 +1,12 @@
 from __future__ import annotations
 
-from datetime import datetime, timedelta, timezone
-from typing import Any, Dict
-
 import base64
 import hashlib
 import hmac
 import os
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
 import jwt
 
 from .config import get_settings
@@ -45,11 +45,11 @@ def verify_password(password: str, stored: str) -> bool:
 def create_access_token(subject: str, role: str) -> str:
     settings = get_settings()
     expire = datetime.now(timezone.utc) + timedelta(seconds=settings.JWT_EXPIRES_IN)
-    payload: Dict[str, Any] = {"sub": subject, "role": role, "exp": expire}
+    payload: dict[str, Any] = {"sub": subject, "role": role, "exp": expire}
     token = jwt.encode(payload, settings.JWT_SECRET, algorithm="HS256")
     return token
 
 
-def decode_token(token: str) -> Dict[str, Any]:
+def decode_token(token: str) -> dict[str, Any]:
     settings = get_settings()
     return jwt.decode(token, settings.JWT_SECRET, algorithms=["HS256"])  # type: ignore[no-any-return]
@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import logging
+import threading
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from sqlalchemy import delete, func, select, union_all
+from sqlalchemy.orm import Session
+
+from .cache import fold_change_versions
+from .config import get_settings
+from .db import session_scope
+from .models import ChangeVersionDelta, Product, StatsCounter, StatsCounterDelta
+from .upsert import add_to_rows
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StatsSummary:
+    """统计概览中的计数部分"""
+
+    total: int = 0
+    with_images: int = 0
+    by_tag: dict[str, int] = field(default_factory=dict)
+    by_series: dict[str, int] = field(default_factory=dict)
+
+    def counters(self) -> dict[tuple[str, str], int]:
+        """展开为汇总表的 (dimension, name) -> count，计数为 0 的项省略"""
+        rows = {("total", ""): self.total, ("with_images", ""): self.with_images}
+        rows.update({("tag", k): v for k, v in self.by_tag.items()})
+        rows.update({("series", k): v for k, v in self.by_series.items()})
+        return {k: v for k, v in rows.items() if v}
+
+
+def live_summary(db: Session) -> StatsSummary:
+    """直接在 products 上聚合（全表扫描），标签/系列为 NULL 时与空串合并"""
+    summary = StatsSummary(
+        total=db.execute(select(func.count()).select_from(Product)).scalar_one(),
+        with_images=db.execute(
+            select(func.count()).select_from(Product).where(Product.image_count > 0)
+        ).scalar_one(),
+    )
+    for column, target in (
+        (Product.product_tag, summary.by_tag),
+        (Product.series, summary.by_series),
+    ):
+        key = func.coalesce(column, "")
+        for name, count in db.execute(select(key, func.count()).group_by(key)).all():
+            target[name] = count
+    return summary
+
+
+def counter_summary(db: Session) -> StatsSummary:
+    """读取汇总表加上尚未并入的增量，一条语句（同一快照），不扫描 products"""
+    parts = union_all(
+        select(StatsCounter.dimension, StatsCounter.name, StatsCounter.count),
+        select(StatsCounterDelta.dimension, StatsCounterDelta.name, StatsCounterDelta.delta),
+    ).subquery()
+    count = func.sum(parts.c.count)
+    rows = db.execute(
+        select(parts.c.dimension, parts.c.name, count)
+        .group_by(parts.c.dimension, parts.c.name)
+        .having(count != 0)
+    ).all()
+    summary = StatsSummary()
+    for dimension, name, value in rows:
+        value = int(value)
+        if dimension == "total":
+            summary.total = value
+        elif dimension == "with_images":
+            summary.with_images = value
+        elif dimension == "tag":
+            summary.by_tag[name] = value
+        elif dimension == "series":
+            summary.by_series[name] = value
+    return summary
+
+
+def fold_stats_deltas(db: Session) -> int:
+    """把追加的计数增量并入汇总表，返回并入的增量行数，不提交"""
+    deltas = db.execute(
+        delete(StatsCounterDelta).returning(
+            StatsCounterDelta.dimension, StatsCounterDelta.name, StatsCounterDelta.delta
+        )
+    ).all()
+    totals: dict[tuple[str, str], int] = defaultdict(int)
+    for dimension, name, delta in deltas:
+        totals[(dimension, name)] += delta
+    # 按主键顺序写入；只有并入会更新汇总表的行，写入方只追加增量
+    add_to_rows(
+        db,
+        StatsCounter.__table__,
+        [
+            {"dimension": dimension, "name": name, "count": count}
+            for (dimension, name), count in sorted(totals.items())
+            if count
+        ],
+        ["dimension", "name"],
+        "count",
+    )
+    db.execute(delete(StatsCounter).where(StatsCounter.count == 0))
+    return len(deltas)
+
+
+def reconcile_stats(db: Session) -> int:
+    """
+    按实际数据校正汇总计数，返回被修正的计数项数，不提交
+
+    实际计数与汇总计数在同一快照中读取：Postgres 上为可重复读事务（须在会话执行任何语句之前调用），
+    SQLite 上先取得写锁（写事务本身互斥）。修正以增量行追加，不锁汇总表与 change_versions，
+    核对期间的写入照常进行；快照之后提交的写入各自追加增量，不会被修正覆盖。
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+    elif dialect == "sqlite":
+        # 先取得写锁，保证下面的读取与修正看到的是同一份数据
+        db.execute(delete(StatsCounter).where(StatsCounter.count == 0))
+    expected = live_summary(db).counters()
+    current = counter_summary(db).counters()
+    fixes = [
+        StatsCounterDelta(
+            dimension=dimension,
+            name=name,
+            delta=expected.get((dimension, name), 0) - current.get((dimension, name), 0),
+        )
+        for dimension, name in sorted(set(expected) | set(current))
+        if expected.get((dimension, name), 0) != current.get((dimension, name), 0)
+    ]
+    if fixes:
+        db.add_all(fixes)
+        # 修正不经过 products，单独加一次汇总表的版本，统计接口的 ETag 随之变化
+        db.add(ChangeVersionDelta(table_name="stats_counters"))
+        db.flush()
+    return len(fixes)
+
+
+class _PeriodicTask:
+    """按固定间隔在后台线程中执行 run_once() 的任务，首轮在启动一个间隔之后执行"""
+
+    thread_name = "periodic-task"
+    failure_message = "后台任务失败"
+
+    def __init__(self, interval: float) -> None:
+        self.interval = max(interval, 1.0)
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=self.thread_name, daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception(self.failure_message)
+
+    def run_once(self) -> int:
+        raise NotImplementedError
+
+
+class StatsReconciler(_PeriodicTask):
+    """
+    定期核对汇总表的后台线程
+
+    触发器覆盖了所有经 SQL 的产品写入，正常情况下不会有偏差；核对用于兜底绕过触发器的修改
+    （如手工修库、Postgres 上的 TRUNCATE）。迁移时已回填，首轮在启动一个间隔之后执行。
+    """
+
+    thread_name = "stats-reconciler"
+    failure_message = "核对统计汇总表失败"
+
+    def run_once(self) -> int:
+        with session_scope() as db:
+            corrected = reconcile_stats(db)
+        if corrected:
+            logger.warning(f"统计汇总表有 {corrected} 项与实际数据不一致，已修正")
+        return corrected
+
+
+class DeltaFolder(_PeriodicTask):
+    """
+    定期把追加的增量行并入 change_versions 与 stats_counters 的后台线程
+
+    读取时总是把未并入的增量加上，并入与否不影响结果；并入只是让增量表保持很小，读取不必扫描太多行。
+    """
+
+    thread_name = "delta-folder"
+    failure_message = "并入增量行失败"
+
+    def run_once(self) -> int:
+        with session_scope() as db:
+            return fold_change_versions(db) + fold_stats_deltas(db)
+
+
+_reconciler: StatsReconciler | None = None
+_folder: DeltaFolder | None = None
+_singleton_lock = threading.Lock()
+
+
+def get_stats_reconciler() -> StatsReconciler:
+    global _reconciler
+    with _singleton_lock:
+        if _reconciler is None:
+            _reconciler = StatsReconciler(get_settings().STATS_RECONCILE_INTERVAL)
+        return _reconciler
+
+
+def get_delta_folder() -> DeltaFolder:
+    global _folder
+    with _singleton_lock:
+        if _folder is None:
+            _folder = DeltaFolder(get_settings().DELTA_FOLD_INTERVAL)
+        return _folder
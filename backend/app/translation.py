@@ -1,96 +1,437 @@
 from __future__ import annotations
 
+import hashlib
 import logging
 import os
-from typing import Optional
+import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Tuple
+
+import requests
+from sqlalchemy.orm import Session
+
+from .config import get_settings
+from .models import TranslationCache
+from .upsert import insert_ignore
 
 logger = logging.getLogger(__name__)
 
-# 火山引擎API配置
+# 火山引擎API配置（接口地址见 Settings.VOLCANO_API_URL）
 VOLCANO_API_KEY = os.getenv("VOLCANO_API_KEY", "fe77ab7f-84af-47c9-9885-c8ecac7684c5")
-VOLCANO_API_URL = "https://ark.cn-beijing.volces.com/api/v3/responses"
+VOLCANO_MODEL = "doubao-seed-translation-250915"
+
+CacheKey = Tuple[str, str, str, str]
+
+
+class _LRUCache:
+    """线程安全的进程内 LRU，位于数据库翻译缓存之前"""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._data: OrderedDict[CacheKey, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: CacheKey) -> str | None:
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key: CacheKey, value: str) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+_memory_cache = _LRUCache(get_settings().TRANSLATION_CACHE_SIZE)
+_stats_lock = threading.Lock()
+_stats: dict[str, int] = {"memory_hits": 0, "db_hits": 0, "misses": 0, "api_failures": 0}
+
+
+def _count(name: str) -> None:
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def translation_cache_stats() -> dict[str, int]:
+    """返回翻译缓存的命中/未命中计数（进程级，自启动起累计）"""
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["memory_size"] = len(_memory_cache)
+    return stats
+
+
+def _cache_key(
+    text: str, source_lang: str, target_lang: str, model: str = VOLCANO_MODEL
+) -> CacheKey:
+    return (hashlib.sha256(text.encode("utf-8")).hexdigest(), source_lang, target_lang, model)
+
+
+class _TokenBucket:
+    """令牌桶限速：平均每秒 rate 个请求，允许 capacity 个突发"""
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class _RetryableError(Exception):
+    def __init__(self, message: str, retry_after: float | None = None) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _request_body(text: str, source_lang: str, target_lang: str) -> dict:
+    return {
+        "model": VOLCANO_MODEL,
+        "input": [
+            {
+                "role": "user",
+                "content": [
+                    {
+                        "type": "input_text",
+                        "text": text,
+                        "translation_options": {
+                            "source_language": source_lang,
+                            "target_language": target_lang,
+                        },
+                    }
+                ],
+            }
+        ],
+    }
+
+
+def _parse_output(result: dict) -> str | None:
+    # 解析火山引擎的响应格式: output[0].content[0].text
+    try:
+        translated_text = (
+            result.get("output", [{}])[0].get("content", [{}])[0].get("text", "").strip()
+        )
+    except (IndexError, KeyError, AttributeError) as e:
+        logger.error(f"解析翻译响应失败: {result}, 错误: {e}")
+        return None
+    return translated_text or None
+
+
+class VolcanoTranslator:
+    """
+    火山引擎翻译客户端：复用连接池，令牌桶限速，429/5xx/网络错误按指数退避重试
+
+    translate_batch 把多个短文本按行拼接进同一个请求（每包最多 batch_size 条），并发发送；
+    返回行数与输入不一致时该包退回逐条翻译，保证结果与输入一一对应。
+    """
+
+    def __init__(
+        self,
+        api_url: str,
+        batch_size: int,
+        concurrency: int,
+        rate_limit: float,
+        max_retries: int,
+        timeout: float,
+    ) -> None:
+        self.api_url = api_url
+        self.batch_size = max(batch_size, 1)
+        self.max_retries = max(max_retries, 0)
+        self.timeout = timeout
+        self._bucket = _TokenBucket(rate_limit, capacity=max(concurrency, 1))
+        self._session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=1, pool_maxsize=max(concurrency, 1)
+        )
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(concurrency, 1), thread_name_prefix="translation"
+        )
+
+    def _post(self, text: str, source_lang: str, target_lang: str) -> str | None:
+        headers = {"Authorization": f"Bearer {VOLCANO_API_KEY}", "Content-Type": "application/json"}
+        body = _request_body(text, source_lang, target_lang)
+        attempt = 0
+        while True:
+            self._bucket.acquire()
+            try:
+                try:
+                    response = self._session.post(
+                        self.api_url, headers=headers, json=body, timeout=self.timeout
+                    )
+                except requests.RequestException as e:
+                    raise _RetryableError(str(e)) from e
+                if response.status_code == 429 or response.status_code >= 500:
+                    retry_after = response.headers.get("Retry-After")
+                    raise _RetryableError(
+                        f"HTTP {response.status_code}",
+                        float(retry_after) if retry_after and retry_after.isdigit() else None,
+                    )
+                response.raise_for_status()
+                result = response.json()
+                logger.debug(f"翻译API响应: {result}")
+                return _parse_output(result)
+            except _RetryableError as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = e.retry_after if e.retry_after is not None else 0.5 * (2**attempt)
+                attempt += 1
+                logger.warning(f"翻译请求失败({e})，{delay:.1f}s 后第 {attempt} 次重试")
+                time.sleep(delay + random.uniform(0, 0.1))
+
+    def translate(self, text: str, source_lang: str = "ja", target_lang: str = "zh") -> str | None:
+        try:
+            translated = self._post(text, source_lang, target_lang)
+        except Exception as e:
+            logger.error(f"翻译失败: {text}, 错误: {e}")
+            return None
+        if translated:
+            logger.info(f"翻译成功: {text} -> {translated}")
+        else:
+            logger.warning(f"翻译返回空结果: {text}")
+        return translated
 
+    def _translate_pack(
+        self, texts: list[str], source_lang: str, target_lang: str
+    ) -> list[str | None]:
+        if len(texts) == 1:
+            return [self.translate(texts[0], source_lang, target_lang)]
+        try:
+            output = self._post("\n".join(texts), source_lang, target_lang)
+        except Exception as e:
+            logger.warning(f"批量翻译失败，改为逐条翻译: {e}")
+            output = None
+        lines = [line.strip() for line in output.splitlines()] if output else []
+        if len(lines) == len(texts) and all(lines):
+            return list(lines)
+        if output:
+            logger.warning(f"批量翻译返回 {len(lines)} 行，期望 {len(texts)} 行，改为逐条翻译")
+        return [self.translate(t, source_lang, target_lang) for t in texts]
+
+    def translate_batch(
+        self, texts: list[str], source_lang: str = "ja", target_lang: str = "zh"
+    ) -> list[str | None]:
+        """批量翻译，返回与 texts 等长、顺序一致的结果列表，失败项为 None"""
+        packs: list[list[int]] = []
+        current: list[int] = []
+        for i, text in enumerate(texts):
+            # 含换行的文本无法按行拆分结果，单独成包
+            if "\n" in text:
+                packs.append([i])
+                continue
+            current.append(i)
+            if len(current) >= self.batch_size:
+                packs.append(current)
+                current = []
+        if current:
+            packs.append(current)
+
+        results: list[str | None] = [None] * len(texts)
+        translated_packs = self._executor.map(
+            lambda pack: self._translate_pack([texts[i] for i in pack], source_lang, target_lang),
+            packs,
+        )
+        for pack, translated in zip(packs, translated_packs):
+            for i, value in zip(pack, translated):
+                results[i] = value
+        return results
+
+
+_translator: VolcanoTranslator | None = None
+_translator_lock = threading.Lock()
 
-def translate_with_volcano(text: str, source_lang: str = "ja", target_lang: str = "zh") -> Optional[str]:
+
+def get_translator() -> VolcanoTranslator:
+    global _translator
+    with _translator_lock:
+        if _translator is None:
+            s = get_settings()
+            _translator = VolcanoTranslator(
+                api_url=s.VOLCANO_API_URL,
+                batch_size=s.TRANSLATION_BATCH_SIZE,
+                concurrency=s.TRANSLATION_CONCURRENCY,
+                rate_limit=s.TRANSLATION_RATE_LIMIT,
+                max_retries=s.TRANSLATION_MAX_RETRIES,
+                timeout=s.TRANSLATION_TIMEOUT,
+            )
+        return _translator
+
+
+def translate_with_volcano(
+    text: str, source_lang: str = "ja", target_lang: str = "zh"
+) -> str | None:
     """
     使用火山引擎翻译API进行翻译
-    
+
     Args:
         text: 要翻译的文本
         source_lang: 源语言代码 (ja=日语, zh=中文, en=英语)
         target_lang: 目标语言代码
-    
+
     Returns:
         翻译后的文本，如果失败则返回None
     """
-    try:
-        import requests
-        
-        headers = {
-            "Authorization": f"Bearer fe77ab7f-84af-47c9-9885-c8ecac7684c5",
-            "Content-Type": "application/json"
-        }
-        
-        data = {
-            "model": "doubao-seed-translation-250915",
-            "input": [
-                {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "input_text",
-                            "text": text,
-                            "translation_options": {
-                                "source_language": source_lang,
-                                "target_language": target_lang
-                            }
-                        }
-                    ]
-                }
-            ]
-        }
-        
-        response = requests.post(VOLCANO_API_URL, headers=headers, json=data, timeout=10)
-        response.raise_for_status()
-        
-        result = response.json()
-        logger.debug(f"翻译API响应: {result}")
-        
-        # 解析火山引擎的响应格式: output[0].content[0].text
-        try:
-            translated_text = result.get("output", [{}])[0].get("content", [{}])[0].get("text", "").strip()
-            
-            if translated_text:
-                logger.info(f"翻译成功: {text} -> {translated_text}")
-                return translated_text
-            else:
-                logger.warning(f"翻译返回空结果: {text}")
-                return None
-        except (IndexError, KeyError) as e:
-            logger.error(f"解析翻译响应失败: {result}, 错误: {e}")
-            return None
-            
-    except Exception as e:
-        logger.error(f"翻译失败: {text}, 错误: {e}")
-        return None
+    return get_translator().translate(text, source_lang, target_lang)
+
+
+# 单条 IN (...) 查询的最大参数个数
+_CACHE_LOOKUP_CHUNK = 500
+
+
+def cached_translate_many(
+    texts: Iterable[str],
+    source_lang: str = "ja",
+    target_lang: str = "zh",
+    db: Session | None = None,
+    fetch_missing: bool = True,
+) -> dict[str, str | None]:
+    """
+    带缓存的批量翻译：依次查询进程内 LRU、数据库翻译缓存（一次 IN 查询），剩余未命中的
+    一次性交给 VolcanoTranslator.translate_batch
+
+    db 为 None 时只使用进程内缓存。新翻译写入 db 的当前事务，由调用方提交；翻译失败不缓存。
+    fetch_missing=False 时只查缓存、不调用API，未命中的文本不出现在结果中。
+    返回 {原文: 译文或 None}。
+    """
+    unique = list(dict.fromkeys(t for t in texts if t))
+    keys = {t: _cache_key(t, source_lang, target_lang) for t in unique}
+    results: dict[str, str | None] = {}
+    missing: list[str] = []
+    for text in unique:
+        cached = _memory_cache.get(keys[text])
+        if cached is not None:
+            _count("memory_hits")
+            results[text] = cached
+        else:
+            missing.append(text)
+
+    if db is not None and missing:
+        by_hash = {keys[t][0]: t for t in missing}
+        hashes = list(by_hash)
+        for i in range(0, len(hashes), _CACHE_LOOKUP_CHUNK):
+            rows = (
+                db.query(TranslationCache.source_hash, TranslationCache.translated_text)
+                .filter(
+                    TranslationCache.source_hash.in_(hashes[i : i + _CACHE_LOOKUP_CHUNK]),
+                    TranslationCache.source_lang == source_lang,
+                    TranslationCache.target_lang == target_lang,
+                    TranslationCache.model == VOLCANO_MODEL,
+                )
+                .all()
+            )
+            for source_hash, translated_text in rows:
+                text = by_hash[source_hash]
+                _count("db_hits")
+                _memory_cache.put(keys[text], translated_text)
+                results[text] = translated_text
+        missing = [t for t in missing if t not in results]
+
+    if not missing or not fetch_missing:
+        return results
+
+    for _ in missing:
+        _count("misses")
+    fetched: dict[str, str | None] = {}
+    for text, translated in zip(
+        missing, get_translator().translate_batch(missing, source_lang, target_lang)
+    ):
+        results[text] = translated
+        fetched[text] = translated
+        if not translated:
+            _count("api_failures")
+            continue
+        _memory_cache.put(keys[text], translated)
+    if db is not None:
+        store_translations(db, fetched, source_lang, target_lang)
+    return results
+
+
+def store_translations(
+    db: Session,
+    translations: dict[str, str | None],
+    source_lang: str = "ja",
+    target_lang: str = "zh",
+) -> None:
+    """把 {原文: 译文} 写入数据库翻译缓存（已存在的忽略，译文为空的跳过），不提交"""
+    rows = []
+    for text, translated in translations.items():
+        if not text or not translated:
+            continue
+        source_hash, _, _, model = _cache_key(text, source_lang, target_lang)
+        rows.append(
+            {
+                "source_hash": source_hash,
+                "source_lang": source_lang,
+                "target_lang": target_lang,
+                "model": model,
+                "source_text": text,
+                "translated_text": translated,
+            }
+        )
+    insert_ignore(db, TranslationCache.__table__, rows)
+
+
+def cached_translate(
+    text: str, source_lang: str = "ja", target_lang: str = "zh", db: Session | None = None
+) -> str | None:
+    """带缓存的单条翻译，见 cached_translate_many"""
+    return cached_translate_many([text], source_lang, target_lang, db).get(text)
+
+
+def translate_product_names(
+    names: Iterable[str], db: Session | None = None
+) -> dict[str, str | None]:
+    """批量翻译产品名称（日文 -> 中文），返回 {原名: 中文名或 None}"""
+    return cached_translate_many(names, source_lang="ja", target_lang="zh", db=db)
 
 
-def translate_product_name(product_name: str) -> Optional[str]:
+def cached_product_names(names: Iterable[str], db: Session | None = None) -> dict[str, str | None]:
+    """只从缓存取产品名称的翻译，不发起网络请求；未命中的名称不在结果中"""
+    return cached_translate_many(
+        names, source_lang="ja", target_lang="zh", db=db, fetch_missing=False
+    )
+
+
+def translate_product_name(product_name: str, db: Session | None = None) -> str | None:
     """
     翻译产品名称从日文到中文
-    使用火山引擎翻译API进行翻译
-    
+    使用火山引擎翻译API进行翻译，结果经由 cached_translate 缓存
+
     返回: 中文翻译，如果失败则返回None
     """
     if not product_name:
         return None
-    
+
     # 尝试使用API翻译 (ja=日语, zh=中文)
-    translated = translate_with_volcano(product_name, source_lang="ja", target_lang="zh")
-    
+    translated = cached_translate(product_name, source_lang="ja", target_lang="zh", db=db)
+
     if translated:
         return translated
-    
+
     # API失败时使用手动映射表（降级方案）
     # translation_map = {
     #     "GQuuuuuuX": "GX",
@@ -105,14 +446,14 @@ def translate_product_name(product_name: str) -> Optional[str]:
     #     "PG": "PG",
     #     "メカニカルクリア": "机械透明",
     # }
-    
+
     # result = product_name
     # for jp, cn in translation_map.items():
     #     result = result.replace(jp, cn)
-    
+
     # # 如果翻译后的结果与原文件相同，说明没有翻译，返回None
     # if result == product_name:
     #     logger.warning(f"未找到翻译: {product_name}")
     #     return None
-    
+
     return None
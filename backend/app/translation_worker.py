@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+from typing import Iterable
+
+from sqlalchemy import func, select, update
+
+from .config import get_settings
+from .db import ReadSessionLocal, SessionLocal
+from .models import Product
+from .translation import cached_product_names, store_translations, translate_product_names
+
+logger = logging.getLogger(__name__)
+
+
+def _pending_filter() -> tuple:
+    """待翻译：有日文名称但 product_name_cn 为 NULL"""
+    return (Product.product_name.is_not(None), Product.product_name_cn.is_(None))
+
+
+class TranslationWorker:
+    """
+    后台补全 product_name_cn 的工作线程
+
+    导入只写入产品并把待翻译的 id 放入队列，由本线程按批次调用翻译（含缓存）后回写，
+    导入速度因此不受翻译接口延迟影响。request_backfill() 会按 id 顺序扫描全表中待翻译的行。
+    队列只在进程内，重启后未处理的行仍为 NULL，可通过全量补全恢复。
+    """
+
+    def __init__(self, batch_size: int) -> None:
+        self.batch_size = max(batch_size, 1)
+        self._queue: queue.Queue[int] = queue.Queue()
+        self._backfill = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="translation-backfill", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def enqueue(self, product_ids: Iterable[int]) -> None:
+        for product_id in product_ids:
+            self._queue.put(product_id)
+        self.start()
+
+    def request_backfill(self) -> None:
+        self._backfill.set()
+        self.start()
+
+    @property
+    def queued(self) -> int:
+        return self._queue.qsize()
+
+    @property
+    def backfill_running(self) -> bool:
+        return self._backfill.is_set()
+
+    def _drain(self, first: int) -> list[int]:
+        ids = [first]
+        while len(ids) < self.batch_size:
+            try:
+                ids.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return ids
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            if self._backfill.is_set():
+                try:
+                    self._backfill_all()
+                except Exception:
+                    logger.exception("全量补全翻译失败")
+                finally:
+                    self._backfill.clear()
+                continue
+            try:
+                first = self._queue.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            try:
+                self._translate_ids(self._drain(first))
+            except Exception:
+                logger.exception("补全翻译批次失败，可稍后通过全量补全重试")
+
+    def _translate_ids(self, ids: list[int]) -> int:
+        """
+        翻译并回写一批产品，返回成功写入的条数
+
+        查询与翻译接口调用期间只使用只读连接；SQLite 的写连接只有一个，仅在最后回写时短暂占用。
+        """
+        with ReadSessionLocal() as read_db:
+            rows = read_db.execute(
+                select(Product.id, Product.product_name).where(
+                    Product.id.in_(ids), *_pending_filter()
+                )
+            ).all()
+            if not rows:
+                return 0
+            names = [name for _, name in rows]
+            translated = cached_product_names(names, db=read_db)
+        fetched = translate_product_names([name for name in names if name not in translated])
+        translated.update(fetched)
+
+        db = SessionLocal()
+        try:
+            store_translations(db, fetched)
+            written = 0
+            for product_id, name in rows:
+                cn_name = translated.get(name)
+                if not cn_name:
+                    continue
+                # 仅在名称未变且仍待翻译时回写，避免覆盖期间发生的修改
+                db.execute(
+                    update(Product)
+                    .where(
+                        Product.id == product_id,
+                        Product.product_name == name,
+                        Product.product_name_cn.is_(None),
+                    )
+                    .values(product_name_cn=cn_name)
+                )
+                written += 1
+            db.commit()
+            logger.info(f"补全翻译: {written}/{len(rows)}")
+            return written
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _backfill_all(self) -> None:
+        last_id = 0
+        while not self._stop.is_set():
+            with ReadSessionLocal() as db:
+                ids = list(
+                    db.execute(
+                        select(Product.id)
+                        .where(Product.id > last_id, *_pending_filter())
+                        .order_by(Product.id)
+                        .limit(self.batch_size)
+                    ).scalars()
+                )
+            if not ids:
+                return
+            self._translate_ids(ids)
+            last_id = ids[-1]
+
+
+_worker: TranslationWorker | None = None
+_worker_lock = threading.Lock()
+
+
+def get_translation_worker() -> TranslationWorker:
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = TranslationWorker(batch_size=get_settings().TRANSLATION_BACKFILL_BATCH_SIZE)
+        return _worker
+
+
+def count_pending_translations() -> int:
+    with ReadSessionLocal() as db:
+        return db.execute(
+            select(func.count()).select_from(Product).where(*_pending_filter())
+        ).scalar_one()
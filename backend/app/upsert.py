@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import case, column, func, or_, select, table
+from sqlalchemy.dialects.postgresql import Insert as PgInsert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import Insert as SqliteInsert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from .config import get_settings
+from .models import Product
+
+# 导入时写入的列（created_at 仅在新建时赋值）
+UPSERT_COLUMNS = (
+    "product_name",
+    "product_name_cn",
+    "price",
+    "release_date",
+    "article_content",
+    "url",
+    "product_tag",
+    "series",
+    "price_value",
+    "release_date_value",
+)
+
+_STAGE_TABLE = "products_import_stage"
+
+
+def _merge_set(excluded: Any) -> dict[str, Any]:
+    """ON CONFLICT DO UPDATE 的赋值：新值为 NULL 时保留旧值，与逐条导入的合并语义一致"""
+    products = Product.__table__
+
+    def keep_old_if_null(name: str) -> Any:
+        return func.coalesce(excluded[name], products.c[name])
+
+    return {
+        "product_name": keep_old_if_null("product_name"),
+        # 有新翻译则写入；名称未变时保留旧翻译；名称变化且暂无翻译时置空，等待后台补全
+        "product_name_cn": case(
+            (excluded.product_name_cn.is_not(None), excluded.product_name_cn),
+            (
+                or_(
+                    excluded.product_name.is_(None),
+                    excluded.product_name == products.c.product_name,
+                ),
+                products.c.product_name_cn,
+            ),
+            else_=None,
+        ),
+        "price": keep_old_if_null("price"),
+        "release_date": keep_old_if_null("release_date"),
+        "article_content": keep_old_if_null("article_content"),
+        "product_tag": keep_old_if_null("product_tag"),
+        "series": keep_old_if_null("series"),
+        # 派生列跟随原文：原文未提供时保留旧的派生值
+        "price_value": case(
+            (excluded.price.is_not(None), excluded.price_value), else_=products.c.price_value
+        ),
+        "release_date_value": case(
+            (excluded.release_date.is_not(None), excluded.release_date_value),
+            else_=products.c.release_date_value,
+        ),
+    }
+
+
+def _copy_upsert_postgres(db: Session, rows: list[dict[str, Any]]) -> bool:
+    """Postgres 大批量：COPY 到事务级临时表，再一条 INSERT ... SELECT ... ON CONFLICT 合并。
+
+    驱动不支持 COPY（非 psycopg 3）时返回 False，由调用方回退到普通批量 UPSERT。
+    """
+    conn = db.connection()
+    driver_conn = conn.connection.driver_connection
+    with driver_conn.cursor() as cur:  # type: ignore[union-attr]
+        if not hasattr(cur, "copy"):
+            return False
+        cur.execute(
+            f"CREATE TEMP TABLE {_STAGE_TABLE} ("
+            "product_name text, product_name_cn text, price text, release_date text, "
+            "article_content text, url text, product_tag text, series text, "
+            "price_value integer, release_date_value date"
+            ") ON COMMIT DROP"
+        )
+        with cur.copy(f"COPY {_STAGE_TABLE} ({', '.join(UPSERT_COLUMNS)}) FROM STDIN") as copy:
+            for row in rows:
+                copy.write_row([row[c] for c in UPSERT_COLUMNS])
+
+    stage = table(_STAGE_TABLE, *[column(c) for c in UPSERT_COLUMNS])
+    stmt = pg_insert(Product.__table__).from_select(
+        [*UPSERT_COLUMNS, "created_at"],
+        select(*[stage.c[c] for c in UPSERT_COLUMNS], func.timezone("utc", func.now())).order_by(
+            stage.c.url
+        ),
+    )
+    stmt = stmt.on_conflict_do_update(index_elements=["url"], set_=_merge_set(stmt.excluded))
+    conn.execute(stmt)
+    return True
+
+
+def upsert_products(db: Session, rows: list[dict[str, Any]]) -> None:
+    """在当前事务中按 url 批量 UPSERT 产品，不提交。rows 的键为 UPSERT_COLUMNS，url 不可重复"""
+    if not rows:
+        return
+    # 按 url 顺序加行锁：并发导入包含相同的产品时不会交叉等待而死锁
+    rows = sorted(rows, key=lambda row: str(row["url"]))
+    dialect = db.get_bind().dialect.name
+    stmt: PgInsert | SqliteInsert
+    if dialect == "postgresql":
+        if len(rows) >= get_settings().IMPORT_COPY_THRESHOLD and _copy_upsert_postgres(db, rows):
+            return
+        stmt = pg_insert(Product.__table__)
+    elif dialect == "sqlite":
+        stmt = sqlite_insert(Product.__table__)
+    else:
+        raise RuntimeError(f"批量导入不支持的数据库: {dialect}")
+    stmt = stmt.on_conflict_do_update(index_elements=["url"], set_=_merge_set(stmt.excluded))
+    now = datetime.utcnow()
+    db.execute(stmt, [{**row, "created_at": now} for row in rows])
+
+
+def insert_ignore(
+    db: Session, target: Any, rows: list[dict[str, Any]], returning: Any = None
+) -> list[Any]:
+    """
+    批量插入，主键/唯一键冲突的行直接忽略（并发写入同一键时不报错），不提交。
+    给出 returning 列时返回实际插入的行的该列值，冲突被忽略的行不在其中
+    """
+    if not rows:
+        return []
+    dialect = db.get_bind().dialect.name
+    stmt: PgInsert | SqliteInsert
+    if dialect == "postgresql":
+        stmt = pg_insert(target).on_conflict_do_nothing()
+    elif dialect == "sqlite":
+        stmt = sqlite_insert(target).on_conflict_do_nothing()
+    else:
+        raise RuntimeError(f"不支持的数据库: {dialect}")
+    if returning is not None:
+        return list(db.execute(stmt.returning(returning), rows).scalars())
+    db.execute(stmt, rows)
+    return []
+
+
+def upsert_rows(
+    db: Session, target: Any, rows: list[dict[str, Any]], key_columns: list[str]
+) -> None:
+    """按 key_columns 批量 UPSERT，冲突时用新值覆盖其余列，不提交"""
+    if not rows:
+        return
+    dialect = db.get_bind().dialect.name
+    stmt: PgInsert | SqliteInsert
+    if dialect == "postgresql":
+        stmt = pg_insert(target)
+    elif dialect == "sqlite":
+        stmt = sqlite_insert(target)
+    else:
+        raise RuntimeError(f"不支持的数据库: {dialect}")
+    update_columns = [c for c in rows[0] if c not in key_columns]
+    stmt = stmt.on_conflict_do_update(
+        index_elements=key_columns, set_={c: stmt.excluded[c] for c in update_columns}
+    )
+    db.execute(stmt, rows)
+
+
+def add_to_rows(
+    db: Session, target: Any, rows: list[dict[str, Any]], key_columns: list[str], column: str
+) -> None:
+    """按 key_columns 批量 UPSERT 计数：不存在时插入，存在时在 column 上加上新值，不提交"""
+    if not rows:
+        return
+    dialect = db.get_bind().dialect.name
+    stmt: PgInsert | SqliteInsert
+    if dialect == "postgresql":
+        stmt = pg_insert(target)
+    elif dialect == "sqlite":
+        stmt = sqlite_insert(target)
+    else:
+        raise RuntimeError(f"不支持的数据库: {dialect}")
+    stmt = stmt.on_conflict_do_update(
+        index_elements=key_columns, set_={column: target.c[column] + stmt.excluded[column]}
+    )
+    db.execute(stmt, rows)
@@ -2,17 +2,16 @@ from __future__ import annotations
 
 import re
 from datetime import date
-from typing import Optional
 
 
-def parse_price_to_int(price_text: str | None) -> Optional[int]:
+def parse_price_to_int(price_text: str | None) -> int | None:
     if not price_text:
         return None
     digits = re.sub(r"\D", "", price_text)
     return int(digits) if digits else None
 
 
-def parse_release_date(value: str | None) -> Optional[date]:
+def parse_release_date(value: str | None) -> date | None:
     if not value:
         return None
     # supports YYYY or YYYY-MM or YYYY/MM or YYYY.MM
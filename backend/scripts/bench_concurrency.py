@@ -0,0 +1,84 @@
+"""
+并发压测：持续发送慢请求的同时，测量快请求（健康检查、单个产品）的延迟
+
+用法（服务已启动）：
+    python scripts/bench_concurrency.py --base-url http://localhost:8000 \
+        --concurrency 16 --duration 10
+慢请求默认为需要全表扫描的短关键词搜索。只依赖标准库。
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def _get(url: str) -> float:
+    start = time.perf_counter()
+    with urllib.request.urlopen(url) as resp:
+        resp.read()
+    return (time.perf_counter() - start) * 1000
+
+
+def _percentile(values: list[float], p: float) -> float:
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(int(len(values) * p), len(values) - 1)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--slow-path", default="/api/products/?name=ab&page_size=20")
+    parser.add_argument("--fast-paths", default="/api/healthz,/api/products/1")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    stop = threading.Event()
+    slow: list[float] = []
+    fast: list[float] = []
+    lock = threading.Lock()
+
+    def slow_worker() -> None:
+        while not stop.is_set():
+            ms = _get(args.base_url + args.slow_path)
+            with lock:
+                slow.append(ms)
+
+    def fast_worker() -> None:
+        paths = args.fast_paths.split(",")
+        i = 0
+        while not stop.is_set():
+            ms = _get(args.base_url + paths[i % len(paths)])
+            i += 1
+            with lock:
+                fast.append(ms)
+            time.sleep(0.02)
+
+    with ThreadPoolExecutor(max_workers=args.concurrency + 1) as pool:
+        for _ in range(args.concurrency):
+            pool.submit(slow_worker)
+        pool.submit(fast_worker)
+        time.sleep(args.duration)
+        stop.set()
+
+    nan = float("nan")
+    print(
+        f"慢请求: {len(slow)} 次, {len(slow) / args.duration:.1f} 次/秒, "
+        f"p50 {_percentile(slow, 0.5):.0f} ms, p95 {_percentile(slow, 0.95):.0f} ms"
+    )
+    print(
+        f"快请求: {len(fast)} 次, p50 {_percentile(fast, 0.5):.1f} ms, "
+        f"p95 {_percentile(fast, 0.95):.1f} ms, max {max(fast) if fast else nan:.1f} ms, "
+        f"平均 {statistics.fmean(fast) if fast else nan:.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
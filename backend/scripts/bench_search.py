@@ -0,0 +1,111 @@
+"""
+对比产品搜索的 ILIKE 全表扫描与 FTS5/pg_trgm 索引路径
+
+用法（在 backend 目录下）：
+    export PYTHONPATH=. DATABASE_PATH=/tmp/bench.db
+    alembic upgrade head
+    python scripts/bench_search.py --rows 200000
+不传 --rows 时直接使用库中已有的数据。
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from datetime import datetime
+from typing import Any, Callable
+
+from sqlalchemy import func, insert, or_, select
+
+from app import search
+from app.db import SessionLocal
+from app.models import Product
+
+WORDS = [
+    "ガンダム",
+    "ザク",
+    "エアリアル",
+    "高达",
+    "扎古",
+    "Strike",
+    "Freedom",
+    "Zaku",
+    "Unicorn",
+    "Barbatos",
+]
+GRADES = ["HG", "RG", "MG", "PG", "SD", "EG"]
+
+
+def seed(rows: int) -> None:
+    rnd = random.Random(0)
+    now = datetime.utcnow()
+    with SessionLocal() as db:
+        batch: list[dict] = []
+        for i in range(rows):
+            word = rnd.choice(WORDS)
+            batch.append(
+                {
+                    "product_name": f"{rnd.choice(GRADES)} 1/144 {word} {i}",
+                    "product_name_cn": f"{rnd.choice(GRADES)} {word} 第{i}号",
+                    "url": f"https://bench.example/{i}-{rnd.random()}",
+                    "series": rnd.choice(
+                        ["機動戦士ガンダム", "水星の魔女", "鉄血のオルフェンズ", "SEED"]
+                    ),
+                    "created_at": now,
+                }
+            )
+            if len(batch) == 5000:
+                db.execute(insert(Product), batch)
+                batch.clear()
+        if batch:
+            db.execute(insert(Product), batch)
+        db.commit()
+
+
+def timed(fn: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=0, help="先写入的模拟产品数")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    if args.rows:
+        seed(args.rows)
+
+    with SessionLocal() as db:
+        total = db.execute(select(func.count()).select_from(Product)).scalar_one()
+        print(f"产品数: {total}")
+        for term in ["エアリアル", "Unicorn", "扎古", "水星の魔女", "12345"]:
+            ilike = or_(*[col.ilike(f"%{term}%") for col in search.SEARCH_COLUMNS])
+
+            def run_ilike(ilike: Any = ilike) -> Any:
+                return (
+                    db.execute(select(Product.id).where(ilike).limit(20)).all(),
+                    db.execute(select(func.count()).select_from(Product).where(ilike)).scalar_one(),
+                )
+
+            def run_index(term: str = term) -> Any:
+                q = search.order_by_relevance(select(Product.id).where(search.matches(term)), term)
+                return (
+                    db.execute(q.limit(20)).all(),
+                    db.execute(
+                        select(func.count()).select_from(Product).where(search.matches(term))
+                    ).scalar_one(),
+                )
+
+            ilike_ms = timed(run_ilike, args.repeat)
+            index_ms = timed(run_index, args.repeat)
+            hits = run_index()[1]
+            print(f"{term:>10}  命中 {hits:>7}  ilike {ilike_ms:8.1f} ms  索引 {index_ms:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
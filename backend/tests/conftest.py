@@ -0,0 +1,107 @@
+"""
+测试环境：临时 SQLite 数据库，迁移到最新版本；内存中的 MinIO 替身；
+不启动后台翻译、统计核对与增量并入
+
+设置 TEST_DATABASE_URL（须为空库，如 postgresql+psycopg://...）时改用该数据库。
+"""
+
+from __future__ import annotations
+
+import os
+import tempfile
+import threading
+import time
+from typing import Any, BinaryIO, Iterator
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_TMP_DIR = tempfile.mkdtemp(prefix="modellion-test-")
+
+# 应用在导入时读取配置并创建引擎，必须先设置环境变量
+if os.environ.get("TEST_DATABASE_URL"):
+    os.environ["DATABASE_URL"] = os.environ["TEST_DATABASE_URL"]
+else:
+    os.environ.pop("DATABASE_URL", None)
+    os.environ["DATABASE_PATH"] = os.path.join(_TMP_DIR, "test.db")
+os.environ.update(
+    ADMIN_USERNAME="admin",
+    ADMIN_PASSWORD="admin123",
+    DATA_DIR=_TMP_DIR,
+    IMPORT_WATCH_ENABLED="false",
+    TRANSLATION_BACKFILL_ON_STARTUP="false",
+    STATS_RECONCILE_INTERVAL="0",
+    DELTA_FOLD_INTERVAL="0",
+)
+
+
+class FakeMinio:
+    """内存中的对象存储，只实现应用用到的方法；put_delay 模拟慢速上传"""
+
+    def __init__(self) -> None:
+        self.objects: dict[str, bytes] = {}
+        self.put_delay = 0.0
+        self._lock = threading.Lock()
+
+    def put_object(
+        self, bucket: str, name: str, data: BinaryIO, length: int = -1, **kwargs: Any
+    ) -> None:
+        body = data.read() if length < 0 else data.read(length)
+        time.sleep(self.put_delay)
+        with self._lock:
+            self.objects[name] = body
+
+    def remove_object(self, bucket: str, name: str) -> None:
+        with self._lock:
+            self.objects.pop(name, None)
+
+
+@pytest.fixture(scope="session")
+def storage() -> Iterator[FakeMinio]:
+    from app import minio_client
+
+    fake = FakeMinio()
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(minio_client, "get_minio_client", lambda: fake)
+        yield fake
+
+
+@pytest.fixture(scope="session")
+def client(storage: FakeMinio) -> Iterator[Any]:
+    from fastapi.testclient import TestClient
+
+    from alembic import command
+    from alembic.config import Config
+    from app.main import app
+    from app.translation_worker import TranslationWorker
+
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    command.upgrade(config, "head")
+    with pytest.MonkeyPatch.context() as mp:
+        # 不调用外部翻译接口
+        mp.setattr(TranslationWorker, "enqueue", lambda self, product_ids: None)
+        with TestClient(app) as test_client:
+            yield test_client
+
+
+@pytest.fixture(scope="session")
+def admin_headers(client: Any) -> dict[str, str]:
+    response = client.post("/api/auth/login", json={"username": "admin", "password": "admin123"})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture
+def clean_db(client: Any, storage: FakeMinio) -> None:
+    """清空产品、图片与导入清单（统计计数随触发器归零），供断言全库统计的用例使用"""
+    from sqlalchemy import delete
+
+    from app.db import SessionLocal
+    from app.models import Image, ImportManifest, Product
+
+    with SessionLocal() as db:
+        for model in (Image, ImportManifest, Product):
+            db.execute(delete(model))
+        db.commit()
+    storage.objects.clear()
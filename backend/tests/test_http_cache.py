@@ -0,0 +1,94 @@
+"""条件 GET：读接口返回弱 ETag，If-None-Match 命中时 304；相关表有写入后 ETag 变化"""
+
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def product_id(client: Any, admin_headers: dict[str, str]) -> int:
+    response = client.post(
+        "/api/products/",
+        json={"url": "https://example.com/etag/0", "product_tag": "etag-test"},
+        headers=admin_headers,
+    )
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+def _get(
+    client: Any, path: str, headers: dict[str, str], etag: str | None = None, **params: Any
+) -> Any:
+    extra = {"If-None-Match": etag} if etag else {}
+    return client.get(path, params=params, headers={**headers, **extra})
+
+
+@pytest.mark.parametrize(
+    "path",
+    ["/api/products/{id}", "/api/images/product/{id}", "/api/products", "/api/products/facets"],
+)
+def test_etag_round_trip(
+    client: Any, admin_headers: dict[str, str], product_id: int, path: str
+) -> None:
+    # 列表与分面的 ETag 包含查询参数
+    by_query = "{id}" not in path
+    path = path.format(id=product_id)
+    first = _get(client, path, admin_headers, tag="etag-test")
+    assert first.status_code == 200, first.text
+    etag = first.headers["ETag"]
+    assert etag.startswith('W/"')
+    assert first.headers["Cache-Control"] == "private, no-cache"
+
+    again = _get(client, path, admin_headers, etag, tag="etag-test")
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["ETag"] == etag
+
+    # 弱比较：强形式、列表与 * 都能命中
+    for candidate in (etag[2:], f'"other", {etag}', "*"):
+        assert _get(client, path, admin_headers, candidate, tag="etag-test").status_code == 304
+    if by_query:
+        assert _get(client, path, admin_headers, etag, tag="other").status_code == 200
+
+
+def test_writes_change_etag(client: Any, admin_headers: dict[str, str], product_id: int) -> None:
+    from app.stats import get_delta_folder
+
+    paths = [f"/api/products/{product_id}", f"/api/images/product/{product_id}"]
+    etags = [_get(client, p, admin_headers).headers["ETag"] for p in paths]
+
+    # 后台并入增量不改变版本：仍然命中
+    get_delta_folder().run_once()
+    statuses = [_get(client, p, admin_headers, e).status_code for p, e in zip(paths, etags)]
+    assert statuses == [304, 304]
+
+    response = client.post(
+        f"/api/images/upload/{product_id}",
+        files={"file": ("etag.jpg", b"etag-image", "image/jpeg")},
+        headers=admin_headers,
+    )
+    assert response.status_code == 200, response.text
+    changed = [_get(client, p, admin_headers, e) for p, e in zip(paths, etags)]
+    assert [r.status_code for r in changed] == [200, 200]
+    assert len(changed[1].json()) == 1
+
+    etag = changed[0].headers["ETag"]
+    response = client.put(
+        f"/api/products/{product_id}", json={"product_name": "改名"}, headers=admin_headers
+    )
+    assert response.status_code == 200, response.text
+    updated = _get(client, paths[0], admin_headers, etag)
+    assert updated.status_code == 200
+    assert updated.json()["product_name"] == "改名"
+
+
+def test_readonly_role_may_reuse_cached_response(client: Any, product_id: int) -> None:
+    from app.security import create_access_token
+
+    headers = {"Authorization": f"Bearer {create_access_token('viewer', 'readonly')}"}
+    response = _get(client, f"/api/products/{product_id}", headers)
+    assert response.status_code == 200, response.text
+    assert response.headers["Cache-Control"] == "private, max-age=30"
+    assert response.headers["Vary"] == "Authorization"
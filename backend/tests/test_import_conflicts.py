@@ -0,0 +1,80 @@
+"""去重查询之后、写入之前，其他写入方提交了相同哈希的图片：导入不失败，冲突的图片跳过并删除对象"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import zipfile
+from typing import Any
+
+import pytest
+
+
+def _zip() -> bytes:
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        for i in range(3):
+            prefix = f"root/c{i}/"
+            details = {"product_name": f"ザク{i}", "url": f"https://example.com/conflict/{i}"}
+            zf.writestr(prefix + "product_details.json", json.dumps(details))
+            zf.writestr(prefix + "cover.jpg", f"conflict-cover-{i}")
+    return buf.getvalue()
+
+
+def test_concurrent_image_hash_does_not_fail_batch(
+    client: Any, admin_headers: dict[str, str], storage: Any, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    from app.db import SessionLocal
+    from app.models import Image
+    from app.routers import imports
+
+    response = client.post(
+        "/api/products/", json={"url": "https://example.com/conflict/winner"}, headers=admin_headers
+    )
+    assert response.status_code == 200, response.text
+    winner_id = response.json()["id"]
+    racing_hash = hashlib.md5(b"conflict-cover-1").hexdigest()
+    real_upsert = imports.upsert_products
+
+    def upsert_after_racing_writer(db: Any, rows: list[dict[str, Any]]) -> None:
+        # 导入的去重查询已经结束：另一个写入方抢先提交同一哈希的图片
+        with SessionLocal() as other:
+            other.add(
+                Image(
+                    product_id=winner_id,
+                    image_filename="winner.jpg",
+                    image_hash=racing_hash,
+                    minio_path="winner/winner.jpg",
+                )
+            )
+            other.commit()
+        real_upsert(db, rows)
+
+    monkeypatch.setattr(imports, "upsert_products", upsert_after_racing_writer)
+    before = set(storage.objects)
+    response = client.post(
+        "/api/import/zip",
+        files={"file": ("c.zip", _zip(), "application/zip")},
+        headers=admin_headers,
+    )
+    assert response.status_code == 200, response.text
+    report = response.json()
+    assert report["errors"] == []
+    assert report["created"] == 3
+    assert (report["images_added"], report["images_skipped"]) == (2, 1)
+
+    with SessionLocal() as db:
+        paths = dict(
+            db.query(Image.image_hash, Image.minio_path)
+            .filter(
+                Image.image_hash.in_(
+                    [hashlib.md5(f"conflict-cover-{i}".encode()).hexdigest() for i in range(3)]
+                )
+            )
+            .tuples()
+            .all()
+        )
+    assert paths[racing_hash] == "winner/winner.jpg"
+    # 未入库图片的对象已删除，新增对象恰好是入库的两张
+    assert set(storage.objects) - before == set(paths.values()) - {"winner/winner.jpg"}
@@ -0,0 +1,82 @@
+"""
+增量导入：与导入清单一致的目录记为 unchanged，不读取图片、不写入；
+内容或图片变化、产品被删除后重新导入
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import zipfile
+from typing import Any
+
+URL = "https://example.com/incremental/{}"
+
+
+def _zip(names: dict[int, str], extra_images: dict[int, int] | None = None) -> bytes:
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        for i, name in names.items():
+            prefix = f"root/inc{i}/"
+            details = {"product_name": name, "url": URL.format(i)}
+            zf.writestr(prefix + "product_details.json", json.dumps(details))
+            zf.writestr(prefix + "cover.jpg", f"incremental-cover-{i}")
+            for j in range((extra_images or {}).get(i, 0)):
+                zf.writestr(prefix + f"images/{j}.jpg", f"incremental-{i}-{j}")
+    return buf.getvalue()
+
+
+def _import(
+    client: Any, headers: dict[str, str], data: bytes, incremental: bool = True
+) -> dict[str, Any]:
+    response = client.post(
+        "/api/import/zip",
+        params={"incremental": incremental},
+        files={"file": ("inc.zip", data, "application/zip")},
+        headers=headers,
+    )
+    assert response.status_code == 200, response.text
+    report = response.json()
+    assert report["errors"] == []
+    return report
+
+
+def _counts(report: dict[str, Any]) -> tuple[int, int, int, int]:
+    return report["created"], report["updated"], report["unchanged"], report["images_added"]
+
+
+def test_reimport_skips_unchanged_directories(
+    client: Any, admin_headers: dict[str, str], storage: Any
+) -> None:
+    names = {0: "ザク", 1: "グフ", 2: "ドム"}
+    assert _counts(_import(client, admin_headers, _zip(names))) == (3, 0, 0, 3)
+
+    # 原样再导入：全部 unchanged，不上传任何对象
+    objects = set(storage.objects)
+    assert _counts(_import(client, admin_headers, _zip(names))) == (0, 0, 3, 0)
+    assert set(storage.objects) == objects
+
+    # 一个目录的 product_details.json 变化，另一个目录多了图片
+    changed = {**names, 1: "グフカスタム"}
+    report = _import(client, admin_headers, _zip(changed, extra_images={2: 1}))
+    assert _counts(report) == (0, 2, 1, 1)
+    report = _import(client, admin_headers, _zip(changed, extra_images={2: 1}))
+    assert _counts(report) == (0, 0, 3, 0)
+
+    # 非增量导入不跳过；图片已存在，不重复写入
+    report = _import(client, admin_headers, _zip(changed, extra_images={2: 1}), incremental=False)
+    assert _counts(report) == (0, 3, 0, 0)
+
+
+def test_deleted_product_is_imported_again(client: Any, admin_headers: dict[str, str]) -> None:
+    from app.db import SessionLocal
+    from app.models import Product
+
+    names = {10: "ゲルググ", 11: "ギャン"}
+    _import(client, admin_headers, _zip(names))
+    with SessionLocal() as db:
+        deleted = db.query(Product.id).filter(Product.url == URL.format(11)).scalar()
+    assert client.delete(f"/api/products/{deleted}", headers=admin_headers).status_code == 204
+
+    # 清单中仍有该目录，但产品已不存在：重新导入
+    assert _counts(_import(client, admin_headers, _zip(names))) == (1, 0, 1, 1)
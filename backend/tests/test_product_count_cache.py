@@ -0,0 +1,108 @@
+"""
+count_mode=cached：相同筛选条件的总数只计算一次；
+产品或图片表有写入提交后（包括绕过 ORM 的 SQL）失效
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+
+TAG = "count-cache-test"
+
+
+def _total(client: Any, headers: dict[str, str], **filters: Any) -> int:
+    params = {"tag": TAG, "count_mode": "cached", "page_size": 1, **filters}
+    response = client.get("/api/products", params=params, headers=headers)
+    assert response.status_code == 200, response.text
+    meta = response.json()["meta"]
+    assert meta["total_estimated"] is False
+    return meta["total"]
+
+
+def _create(client: Any, headers: dict[str, str], i: int) -> int:
+    response = client.post(
+        "/api/products/",
+        json={"url": f"https://example.com/count-cache/{i}", "product_tag": TAG},
+        headers=headers,
+    )
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+@pytest.fixture
+def exact_counts(monkeypatch: pytest.MonkeyPatch) -> list[Any]:
+    """记录实际执行的 COUNT 查询"""
+    from app.routers import products
+
+    calls: list[Any] = []
+    real = products._exact_count
+
+    def counting(db: Any, params: Any) -> int:
+        calls.append(params)
+        return real(db, params)
+
+    monkeypatch.setattr(products, "_exact_count", counting)
+    return calls
+
+
+def test_cached_count_invalidated_by_writes(
+    client: Any, admin_headers: dict[str, str], exact_counts: list[Any]
+) -> None:
+    from sqlalchemy import text
+
+    from app.db import SessionLocal
+
+    first = _create(client, admin_headers, 0)
+    assert _total(client, admin_headers) == 1
+    assert _total(client, admin_headers) == 1
+    assert len(exact_counts) == 1
+
+    # 经接口写入
+    _create(client, admin_headers, 1)
+    assert _total(client, admin_headers) == 2
+    assert len(exact_counts) == 2
+
+    # 绕过 ORM 的写入同样使缓存失效（版本由数据库触发器维护）
+    with SessionLocal() as db:
+        db.execute(
+            text(
+                "INSERT INTO products (url, product_tag, image_count, created_at) "
+                "VALUES (:url, :tag, 0, CURRENT_TIMESTAMP)"
+            ),
+            {"url": "https://example.com/count-cache/raw", "tag": TAG},
+        )
+        db.commit()
+    assert _total(client, admin_headers) == 3
+    assert len(exact_counts) == 3
+
+    # 图片写入也使缓存失效：has_images 的计数随之变化
+    assert _total(client, admin_headers, has_images=True) == 0
+    response = client.post(
+        f"/api/images/upload/{first}",
+        files={"file": ("count.jpg", b"count-cache-image", "image/jpeg")},
+        headers=admin_headers,
+    )
+    assert response.status_code == 200, response.text
+    assert _total(client, admin_headers, has_images=True) == 1
+    assert _total(client, admin_headers, has_images=True) == 1
+    assert len(exact_counts) == 5
+
+
+def test_estimated_count_falls_back_to_cached_on_sqlite(
+    client: Any, admin_headers: dict[str, str]
+) -> None:
+    from app.db import dialect_name
+
+    if dialect_name() != "sqlite":
+        pytest.skip("Postgres 上 estimated 使用查询计划的估算")
+    response = client.get(
+        "/api/products",
+        params={"tag": TAG, "count_mode": "estimated", "page_size": 1},
+        headers=admin_headers,
+    )
+    assert response.status_code == 200, response.text
+    meta = response.json()["meta"]
+    assert meta["total_estimated"] is False
+    assert meta["total"] == _total(client, admin_headers)
@@ -0,0 +1,115 @@
+"""游标分页：NULL 排在最后（升序与降序都是），逐页翻完与一次排序的结果一致，游标可跨过 NULL 边界"""
+
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+
+TAG = "cursor-test"
+# (price, release_date)：含重复值与 NULL
+PRODUCTS = [
+    ("3000円", "2024-03"),
+    (None, None),
+    ("1000円", "2023-11"),
+    ("3000円", None),
+    (None, "2024-03"),
+    ("2000円", "2024-01"),
+    (None, None),
+]
+SORT_VALUES = {
+    "price": lambda price, release: int(price[:-1]) if price else None,
+    "release_date": lambda price, release: release,
+}
+
+
+@pytest.fixture(scope="module")
+def products(client: Any, admin_headers: dict[str, str]) -> dict[int, tuple[Any, Any]]:
+    created = {}
+    for i, (price, release) in enumerate(PRODUCTS):
+        response = client.post(
+            "/api/products/",
+            json={
+                "url": f"https://example.com/cursor/{i}",
+                "product_tag": TAG,
+                "price": price,
+                "release_date": release,
+            },
+            headers=admin_headers,
+        )
+        assert response.status_code == 200, response.text
+        created[response.json()["id"]] = (price, release)
+    return created
+
+
+def _expected(products: dict[int, tuple[Any, Any]], sort_by: str, desc: bool) -> list[int]:
+    value = {pid: SORT_VALUES[sort_by](*row) for pid, row in products.items()}
+    present = sorted(
+        (pid for pid in products if value[pid] is not None), key=lambda p: (value[p], p)
+    )
+    missing = sorted(pid for pid in products if value[pid] is None)
+    if desc:
+        present.reverse()
+        missing.reverse()
+    return present + missing
+
+
+def _walk(
+    client: Any, headers: dict[str, str], params: dict[str, Any]
+) -> tuple[list[int], list[Any]]:
+    """按 next_cursor 翻完所有页，返回 (id 顺序, 每页末行的排序值)"""
+    ids: list[int] = []
+    page_ends: list[Any] = []
+    cursor = None
+    while True:
+        query = {**params, "use_cursor": True, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/api/products", params=query, headers=headers)
+        assert response.status_code == 200, response.text
+        data = response.json()
+        assert data["meta"]["total"] is None
+        ids.extend(item["id"] for item in data["items"])
+        cursor = data["meta"]["next_cursor"]
+        if cursor is None:
+            return ids, page_ends
+        page_ends.append(data["items"][-1])
+        assert len(ids) <= len(PRODUCTS), "游标分页没有结束"
+
+
+@pytest.mark.parametrize("page_size", [2, 3])
+@pytest.mark.parametrize("sort_order", ["asc", "desc"])
+@pytest.mark.parametrize("sort_by", ["price", "release_date"])
+def test_cursor_pages_match_single_sort(
+    client: Any,
+    admin_headers: dict[str, str],
+    products: dict[int, tuple[Any, Any]],
+    sort_by: str,
+    sort_order: str,
+    page_size: int,
+) -> None:
+    params = {"tag": TAG, "sort_by": sort_by, "sort_order": sort_order, "page_size": page_size}
+    ids, page_ends = _walk(client, admin_headers, params)
+
+    assert ids == _expected(products, sort_by, sort_order == "desc")
+    # 至少有一个游标停在 NULL 上，下一页仍从该行之后继续
+    assert any(item[sort_by] is None for item in page_ends)
+
+
+def test_cursor_from_another_sort_is_rejected(
+    client: Any, admin_headers: dict[str, str], products: dict[int, tuple[Any, Any]]
+) -> None:
+    first = client.get(
+        "/api/products",
+        params={"tag": TAG, "sort_by": "price", "use_cursor": True, "page_size": 2},
+        headers=admin_headers,
+    ).json()
+    response = client.get(
+        "/api/products",
+        params={
+            "tag": TAG,
+            "sort_by": "price",
+            "sort_order": "asc",
+            "cursor": first["meta"]["next_cursor"],
+        },
+        headers=admin_headers,
+    )
+    assert response.status_code == 400
@@ -0,0 +1,87 @@
+"""流式导出：NDJSON 与 CSV 按 id 顺序包含全部符合筛选的产品，跨越多个读取批次，字段可选"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+from typing import Any
+
+import pytest
+
+TAG = "export-test"
+NAMES = ["ガンダム", 'RX-78 "Ver.Ka", 1/100', "改行\nを含む", None, "ザク"]
+
+
+@pytest.fixture(scope="module")
+def product_ids(client: Any, admin_headers: dict[str, str]) -> list[int]:
+    ids = []
+    for i, name in enumerate(NAMES):
+        response = client.post(
+            "/api/products/",
+            json={
+                "url": f"https://example.com/export/{i}",
+                "product_name": name,
+                "product_tag": TAG,
+                "price": f"{(i + 1) * 1000}円" if i % 2 == 0 else None,
+                "article_content": f"記事{i}",
+            },
+            headers=admin_headers,
+        )
+        assert response.status_code == 200, response.text
+        ids.append(response.json()["id"])
+    return ids
+
+
+@pytest.fixture(autouse=True)
+def small_batches(monkeypatch: pytest.MonkeyPatch) -> None:
+    """每批 2 行，5 个产品分 3 批读取与写出"""
+    from app.routers import products
+
+    monkeypatch.setattr(products, "EXPORT_BATCH_SIZE", 2)
+
+
+def _export(client: Any, **params: Any) -> Any:
+    response = client.get("/api/products/export", params={"tag": TAG, **params})
+    assert response.status_code == 200, response.text
+    return response
+
+
+def test_ndjson_export(client: Any, product_ids: list[int]) -> None:
+    response = _export(client)
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.headers["content-disposition"] == 'attachment; filename="products.ndjson"'
+    assert response.text.endswith("\n")
+
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["id"] for row in rows] == product_ids
+    assert [row["product_name"] for row in rows] == NAMES
+    assert rows[1]["price"] is None and rows[2]["price"] == "3000円"
+    # 默认不导出大字段
+    assert "article_content" not in rows[0]
+    assert "created_at" in rows[0]
+
+
+def test_ndjson_selected_fields(client: Any, product_ids: list[int]) -> None:
+    response = _export(client, fields="product_name,article_content")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert rows[0] == {"id": product_ids[0], "product_name": NAMES[0], "article_content": "記事0"}
+
+
+def test_csv_export(client: Any, product_ids: list[int]) -> None:
+    response = _export(client, format="csv", fields="product_name,price")
+    assert response.headers["content-type"] == "text/csv; charset=utf-8"
+    assert response.text.startswith("\ufeff")
+
+    rows = list(csv.reader(io.StringIO(response.text[1:])))
+    assert rows[0] == ["id", "product_name", "price"]
+    # 含引号、逗号与换行的值原样往返；NULL 为空串
+    assert rows[1:] == [
+        [str(pid), name or "", f"{(i + 1) * 1000}円" if i % 2 == 0 else ""]
+        for i, (pid, name) in enumerate(zip(product_ids, NAMES))
+    ]
+
+
+def test_export_rejects_unknown_field_and_format(client: Any) -> None:
+    assert client.get("/api/products/export", params={"fields": "password"}).status_code == 400
+    assert client.get("/api/products/export", params={"format": "xml"}).status_code == 422
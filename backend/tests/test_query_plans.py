@@ -0,0 +1,185 @@
+"""
+查询计划回归检查：对产品列表支持的每种筛选 × 排序组合（分页与游标两种模式）、总数查询和图片查询
+执行 EXPLAIN，出现全表扫描即失败
+
+默认在测试用的 SQLite 上执行；设置 TEST_DATABASE_URL 时在该 Postgres 上执行（见 conftest.py）。
+
+判定：
+- SQLite（EXPLAIN QUERY PLAN）：不带索引的 SCAN products/images；或按索引顺序的整体扫描，
+  但语句没有 LIMIT、或之后还要用临时 B 树排序（按索引顺序读到 LIMIT 行即停止的扫描不算）
+- Postgres（EXPLAIN (FORMAT JSON)，enable_seqscan=off，避免小表上按成本选择顺序扫描）：
+  Seq Scan；或没有索引条件的整体索引扫描，且语句没有 LIMIT 或之后还要 Sort
+按设计不在检查范围内：少于 3 个字符的关键词（回退 ILIKE）、
+无筛选条件的总数与分面计数（本身需要读取全部行）。
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from datetime import date, datetime
+from typing import Any, Iterator
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from app.db import SessionLocal
+from app.models import Image, Product
+from app.product_images import cover_image_subquery
+from app.routers.products import (
+    _SORT_COLUMNS,
+    _apply_filters,
+    _apply_keyset,
+    _apply_where,
+    _encode_cursor,
+)
+from app.schemas import ProductQuery
+
+TABLES = ("products", "images")
+
+# 每种筛选条件单独检查，另加几组常见组合；关键词不少于 3 个字符（走 FTS5 / pg_trgm）
+FILTERS: dict[str, dict[str, Any]] = {
+    "none": {},
+    "q": {"q": "ガンダム"},
+    "name": {"name": "ガンダム"},
+    "tag": {"tag": "premium"},
+    "series": {"series": "gunpla"},
+    "price": {"price_min": 1000, "price_max": 5000},
+    "release": {"release_from": date(2024, 1, 1), "release_to": date(2024, 12, 31)},
+    "created": {"created_from": datetime(2024, 1, 1), "created_to": datetime(2024, 12, 31)},
+    "has_images": {"has_images": True},
+    "no_images": {"has_images": False},
+    "tag+price": {"tag": "premium", "price_min": 1000},
+    "tag+series": {"tag": "premium", "series": "gunpla"},
+    "q+tag": {"q": "ガンダム", "tag": "premium"},
+}
+
+# 游标分页中上一页末行的排序值
+CURSOR_VALUES: dict[str, Any] = {
+    "created_at": datetime(2024, 6, 1),
+    "price": 3000,
+    "release_date": date(2024, 6, 1),
+    "product_name": "HG",
+    "image_count": 1,
+}
+
+
+class _Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement: Any) -> None:
+        self.statement = statement
+
+
+@compiles(_Explain)
+def _compile_explain(element: _Explain, compiler: Any, **kw: Any) -> str:
+    prefix = (
+        "EXPLAIN QUERY PLAN " if compiler.dialect.name == "sqlite" else "EXPLAIN (FORMAT JSON) "
+    )
+    return prefix + compiler.process(element.statement, **kw)
+
+
+def iter_queries() -> Iterator[tuple[str, Any]]:
+    """(名称, 语句)：与接口实际执行的语句一致"""
+    for fname, filters in FILTERS.items():
+        sorts = [*_SORT_COLUMNS, *(["relevance"] if "q" in filters else [])]
+        for sort_by in sorts:
+            for order in ("asc", "desc"):
+                params = ProductQuery(sort_by=sort_by, sort_order=order, **filters)
+                yield f"list {fname} sort={sort_by} {order}", _apply_filters(
+                    select(Product), params
+                ).limit(20).offset(40)
+                if sort_by == "relevance":
+                    continue
+                yield f"cursor {fname} sort={sort_by} {order} first", _apply_keyset(
+                    select(Product), params, None
+                ).limit(21)
+                cursor = _encode_cursor(sort_by, order == "desc", CURSOR_VALUES[sort_by], 100)
+                yield f"cursor {fname} sort={sort_by} {order} next", _apply_keyset(
+                    select(Product), params, cursor
+                ).limit(21)
+        if filters:
+            yield f"count {fname}", _apply_where(
+                select(func.count()).select_from(Product), ProductQuery(**filters)
+            )
+
+    yield "images by product", select(Image).where(Image.product_id == 1).order_by(
+        Image.created_at.desc()
+    )
+    yield "image cover", select(Product.id, cover_image_subquery()).where(Product.id.in_([1, 2, 3]))
+    yield "image hash", select(Image).where(Image.image_hash == "0" * 32)
+    yield "recent products", select(Product).order_by(Product.created_at.desc()).limit(10)
+
+
+def _sqlite_problems(rows: list[tuple[Any, ...]], limited: bool) -> list[str]:
+    details = [row[-1] for row in rows]
+    sorts_after = any(d.startswith("USE TEMP B-TREE FOR ORDER BY") for d in details)
+    problems = []
+    for detail in details:
+        m = re.match(rf"SCAN ({'|'.join(TABLES)})\b(?!_)(.*)", detail)
+        if not m:
+            continue
+        if "USING" not in m.group(2):
+            problems.append(detail)
+        elif not limited or sorts_after:
+            problems.append(
+                detail + (" + USE TEMP B-TREE FOR ORDER BY" if sorts_after else " (no LIMIT)")
+            )
+    return problems
+
+
+def _pg_problems(plan: dict[str, Any], limited: bool, under_sort: bool = False) -> list[str]:
+    problems = []
+    node = plan["Node Type"]
+    relation = plan.get("Relation Name")
+    if relation in TABLES:
+        if node == "Seq Scan":
+            problems.append(f"Seq Scan on {relation}")
+        elif (
+            node in ("Index Scan", "Index Only Scan")
+            and "Index Cond" not in plan
+            and (under_sort or not limited)
+        ):
+            reason = "+ Sort" if under_sort else "(no LIMIT)"
+            problems.append(
+                f"{node} on {relation} using {plan.get('Index Name')} without Index Cond {reason}"
+            )
+    for child in plan.get("Plans", []):
+        problems.extend(_pg_problems(child, limited, under_sort or node == "Sort"))
+    return problems
+
+
+def explain(db: Session, statement: Any) -> tuple[list[str], str]:
+    """返回 (问题列表, 可读的计划)"""
+    limited = getattr(statement, "_limit_clause", None) is not None
+    result = db.execute(_Explain(statement))
+    if db.get_bind().dialect.name == "sqlite":
+        rows = [tuple(r) for r in result]
+        return _sqlite_problems(rows, limited), "\n".join(r[-1] for r in rows)
+    plan = result.scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return _pg_problems(plan[0]["Plan"], limited), json.dumps(
+        plan[0]["Plan"], ensure_ascii=False, indent=1
+    )
+
+
+QUERIES = dict(iter_queries())
+
+
+@pytest.fixture
+def plan_db(client: Any) -> Iterator[Session]:
+    with SessionLocal() as db:
+        if db.get_bind().dialect.name == "postgresql":
+            db.execute(select(func.set_config("enable_seqscan", "off", True)))
+        yield db
+        db.rollback()
+
+
+@pytest.mark.parametrize("name", list(QUERIES))
+def test_no_full_scan(plan_db: Session, name: str) -> None:
+    problems, plan = explain(plan_db, QUERIES[name])
+    assert not problems, "; ".join(problems) + "\n" + plan
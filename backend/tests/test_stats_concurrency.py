@@ -0,0 +1,85 @@
+"""导入、上传图片与统计核对并发执行：都成功，统计汇总表始终与实际数据一致（Postgres 上不死锁）"""
+
+from __future__ import annotations
+
+import io
+import json
+import threading
+import zipfile
+from typing import Any
+
+PRODUCTS = 20
+STATS_FIELDS = ("products_total", "by_tag", "by_series", "with_images", "without_images")
+
+
+def _zip(images: int, seed: str) -> bytes:
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        for i in range(PRODUCTS):
+            prefix = f"root/p{i}/"
+            details = {
+                "product_name": f"ガンダム{i}",
+                "url": f"https://example.com/p/{i}",
+                "product_tag": f"tag{i % 3}",
+                "series": f"series{i % 2}",
+            }
+            zf.writestr(prefix + "product_details.json", json.dumps(details))
+            zf.writestr(prefix + f"cover{i}.jpg", f"cover-{i}")
+            for j in range(images):
+                zf.writestr(prefix + f"images/{j:02d}.jpg", f"{seed}-{i}-{j}")
+    return buf.getvalue()
+
+
+def _import(client: Any, headers: dict[str, str], data: bytes) -> dict[str, Any]:
+    response = client.post(
+        "/api/import/zip", files={"file": ("a.zip", data, "application/zip")}, headers=headers
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_import_and_upload_run_concurrently(
+    client: Any, admin_headers: dict[str, str], storage: Any, clean_db: None
+) -> None:
+    first = _import(client, admin_headers, _zip(1, "a"))
+    assert first["errors"] == []
+    items = client.get("/api/products", params={"page_size": 100}, headers=admin_headers).json()[
+        "items"
+    ]
+    product_ids = [item["id"] for item in items]
+    assert len(product_ids) == PRODUCTS
+
+    # 再次导入同一批产品（UPSERT 产品后写图片），同时给这些产品上传图片（写图片后更新产品）
+    storage.put_delay = 0.005
+    result: dict[str, Any] = {}
+    thread = threading.Thread(
+        target=lambda: result.update(_import(client, admin_headers, _zip(3, "b")))
+    )
+    thread.start()
+    statuses = []
+    corrected = []
+    n = 0
+    while n < len(product_ids) or thread.is_alive():
+        response = client.post(
+            f"/api/images/upload/{product_ids[n % len(product_ids)]}",
+            files={"file": (f"upload{n}.jpg", f"upload-{n}".encode(), "image/jpeg")},
+            headers=admin_headers,
+        )
+        statuses.append((response.status_code, response.text))
+        if n % 5 == 0:
+            # 核对与写入交错：计数不应有偏差
+            corrected.append(client.post("/api/stats/reconcile", headers=admin_headers).json())
+        n += 1
+    thread.join()
+    storage.put_delay = 0.0
+
+    assert [s for s in statuses if s[0] != 200] == []
+    assert all(c == {"corrected": 0} for c in corrected), corrected
+    assert result["errors"] == []
+    assert result["images_added"] == PRODUCTS * 2
+
+    overview = client.get("/api/stats/overview", headers=admin_headers).json()
+    fresh = client.get("/api/stats/overview", params={"fresh": True}, headers=admin_headers).json()
+    assert {k: overview[k] for k in STATS_FIELDS} == {k: fresh[k] for k in STATS_FIELDS}
+    assert fresh["products_total"] == PRODUCTS and fresh["with_images"] == PRODUCTS
+    assert client.post("/api/stats/reconcile", headers=admin_headers).json() == {"corrected": 0}
@@ -0,0 +1,152 @@
+"""翻译客户端：按行打包与拆分、行数不一致时逐条回退、429/5xx 退避重试、令牌桶限速（本地替身接口）"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from typing import Any, Callable, Iterator
+
+import pytest
+
+from app import translation
+from app.translation import VolcanoTranslator, _TokenBucket
+
+# 替身接口的应答：(状态码, 响应头, 译文)
+Reply = tuple[int, dict[str, str], str]
+
+
+def _translated(text: str) -> Reply:
+    return 200, {}, "\n".join(f"译{line}" for line in text.split("\n"))
+
+
+class StubApi:
+    """记录收到的原文，按 respond 返回应答"""
+
+    def __init__(self) -> None:
+        self.texts: list[str] = []
+        self.respond: Callable[[str], Reply] = _translated
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                text = body["input"][0]["content"][0]["text"]
+                with stub._lock:
+                    stub.texts.append(text)
+                    status, headers, output = stub.respond(text)
+                payload = json.dumps({"output": [{"content": [{"text": output}]}]}).encode()
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/api/v3/responses"
+
+
+@pytest.fixture
+def stub_api() -> Iterator[StubApi]:
+    stub = StubApi()
+    thread = threading.Thread(target=stub.server.serve_forever, daemon=True)
+    thread.start()
+    yield stub
+    stub.server.shutdown()
+    stub.server.server_close()
+
+
+@pytest.fixture
+def sleeps(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    """记录重试等待的秒数，不实际等待"""
+    recorded: list[float] = []
+    # 只替换 translation 模块引用的 time，不影响其他线程
+    monkeypatch.setattr(
+        translation, "time", SimpleNamespace(monotonic=time.monotonic, sleep=recorded.append)
+    )
+    return recorded
+
+
+def _translator(stub: StubApi, batch_size: int = 20, max_retries: int = 3) -> VolcanoTranslator:
+    return VolcanoTranslator(
+        api_url=stub.url,
+        batch_size=batch_size,
+        concurrency=2,
+        rate_limit=0,
+        max_retries=max_retries,
+        timeout=5,
+    )
+
+
+def test_batch_packs_lines_and_splits_results(stub_api: StubApi) -> None:
+    texts = ["HG", "MG", "RG", "多行\n文本", "PG"]
+    result = _translator(stub_api, batch_size=2).translate_batch(texts)
+
+    assert result == ["译HG", "译MG", "译RG", "译多行\n译文本", "译PG"]
+    # 每包最多 2 条；含换行的文本单独成包
+    assert sorted(stub_api.texts) == sorted(["HG\nMG", "RG\nPG", "多行\n文本"])
+
+
+def test_line_count_mismatch_falls_back_to_single_items(stub_api: StubApi) -> None:
+    # 打包的请求只返回一行，逐条请求正常返回
+    stub_api.respond = lambda text: (200, {}, "合并") if "\n" in text else _translated(text)
+    result = _translator(stub_api).translate_batch(["HG", "MG", "RG"])
+
+    assert result == ["译HG", "译MG", "译RG"]
+    assert stub_api.texts[0] == "HG\nMG\nRG"
+    assert sorted(stub_api.texts[1:]) == ["HG", "MG", "RG"]
+
+
+def test_429_waits_for_retry_after(stub_api: StubApi, sleeps: list[float]) -> None:
+    replies = iter([(429, {"Retry-After": "3"}, ""), (429, {"Retry-After": "1"}, "")])
+    stub_api.respond = lambda text: next(replies, None) or _translated(text)
+
+    assert _translator(stub_api).translate("HG") == "译HG"
+    assert stub_api.texts == ["HG"] * 3
+    # 按 Retry-After 等待，另加不超过 0.1 秒的随机抖动
+    assert sleeps == pytest.approx([3.05, 1.05], abs=0.051)
+
+
+def test_5xx_backs_off_exponentially_then_gives_up(stub_api: StubApi, sleeps: list[float]) -> None:
+    stub_api.respond = lambda text: (503, {}, "")
+
+    assert _translator(stub_api, max_retries=3).translate("HG") is None
+    assert len(stub_api.texts) == 4
+    assert sleeps == pytest.approx([0.55, 1.05, 2.05], abs=0.051)
+
+
+def test_token_bucket_limits_rate(monkeypatch: pytest.MonkeyPatch) -> None:
+    clock = [0.0]
+    monkeypatch.setattr(
+        translation,
+        "time",
+        SimpleNamespace(
+            monotonic=lambda: clock[0],
+            sleep=lambda seconds: clock.__setitem__(0, clock[0] + seconds),
+        ),
+    )
+    bucket = _TokenBucket(rate=4, capacity=2)
+
+    granted = []
+    for _ in range(6):
+        bucket.acquire()
+        granted.append(clock[0])
+    # 先用掉 2 个突发令牌，之后每 0.25 秒一个（取二进制可精确表示的间隔，模拟时钟不累积误差）
+    assert granted == [0.0, 0.0, 0.25, 0.5, 0.75, 1.0]
+
+
+def test_token_bucket_disabled_when_rate_is_zero(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(
+        translation, "time", SimpleNamespace(monotonic=time.monotonic, sleep=pytest.fail)
+    )
+    bucket = _TokenBucket(rate=0, capacity=1)
+    for _ in range(100):
+        bucket.acquire()